@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Asynchronous LLM calls for the agents
+One asyncio loop on its own thread runs every OpenAI request, so transcription
+and the command loop never wait on a chat completion
+"""
+
+import asyncio
+import importlib
+import json
+import os
+import re
+import threading
+import time
+import logging
+from llm_cache import ResponseCache, request_key
+
+logger = logging.getLogger(__name__)
+
+class AgentExecutor:
+    """
+    Runs agent jobs (coroutines that call chat() and emit their own results)
+    on a private event loop.
+    submit(replace=True) cancels the still-running job of the same kind, which
+    is how stale sales suggestions are dropped when newer context arrives;
+    serial=True runs jobs of a kind one after another (rolling summaries).
+    Both apply within a ``group`` (the session), so one meeting never cancels
+    or waits for another's jobs.
+    The OpenAI base URL follows OPENAI_BASE_URL, so a local stub server
+    (openai_stub.py) can stand in for the API. Identical requests are
+    answered from ``cache``. Call latency and token usage go to ``metrics``
+    (a metrics.Metrics) when one is given.
+    """
+
+    def __init__(self, model="gpt-4o", base_url=None, cache=None, metrics=None):
+        self.model = model
+        self.base_url = base_url or os.environ.get("OPENAI_BASE_URL")
+        self.client = None
+        self.cache = cache or ResponseCache()
+        self.metrics = metrics
+
+        self.lock = threading.Lock()
+        self.latest = {}        # (kind, group) -> Future of the most recent job
+        self.serial_locks = {}  # (kind, group) -> asyncio.Lock, only touched on the loop thread
+        self.stats_by_kind = {}
+
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.run_loop, name="agent-loop")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def set_api_key(self, api_key):
+        openai = importlib.import_module("openai")
+        self.client = openai.AsyncOpenAI(api_key=api_key, base_url=self.base_url)
+
+    async def chat(self, messages, **options):
+        """One chat completion; returns the stripped message text"""
+        key = request_key(self.model, messages, options)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        if self.client is None:
+            raise RuntimeError("OpenAI API key not set")
+        started = time.perf_counter()
+        response = await self.client.chat.completions.create(
+            model=self.model, messages=messages, **options
+        )
+        self.record_call("complete", started, response.usage)
+        text = response.choices[0].message.content.strip()
+        self.cache.put(key, text)
+        return text
+
+    async def chat_stream(self, messages, on_delta, **options):
+        """Streamed chat completion: ``on_delta(text)`` per received piece; returns the full stripped text"""
+        key = request_key(self.model, messages, options)
+        cached = self.cache.get(key)
+        if cached is not None:
+            on_delta(cached)  # one piece: the whole answer
+            return cached
+        if self.client is None:
+            raise RuntimeError("OpenAI API key not set")
+        started = time.perf_counter()
+        # include_usage adds a final chunk with the token counts (and no choices)
+        stream = await self.client.chat.completions.create(
+            model=self.model, messages=messages, stream=True, stream_options={"include_usage": True}, **options
+        )
+        parts = []
+        usage = None
+        # The context manager closes the HTTP response if the job is cancelled mid-stream
+        async with stream:
+            async for chunk in stream:
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    on_delta(delta)
+        self.record_call("stream", started, usage)
+        text = "".join(parts).strip()
+        self.cache.put(key, text)
+        return text
+
+    def record_call(self, mode, started, usage):
+        """Latency and token counts of one finished OpenAI request"""
+        if self.metrics is None:
+            return
+        self.metrics.observe("llm_seconds", time.perf_counter() - started, mode=mode)
+        if usage is not None:
+            self.metrics.inc("llm_tokens", usage.prompt_tokens or 0, type="prompt")
+            self.metrics.inc("llm_tokens", usage.completion_tokens or 0, type="completion")
+            self.metrics.observe("llm_prompt_tokens", usage.prompt_tokens or 0)
+
+    def submit(self, kind, job, replace=False, serial=False, group=None):
+        """Schedule ``job()`` (a coroutine function) on the loop; returns a concurrent Future"""
+        with self.lock:
+            stats = self.stats_by_kind.setdefault(kind, {
+                "submitted": 0, "completed": 0, "cancelled": 0, "failed": 0, "total_seconds": 0.0,
+                "first_output_count": 0, "first_output_total": 0.0, "first_output_max": 0.0,
+            })
+            stats["submitted"] += 1
+            previous = self.latest.get((kind, group))
+            if replace and previous is not None and previous.cancel():
+                stats["cancelled"] += 1
+                logger.info(f"Cancelled stale {kind} request")
+            future = asyncio.run_coroutine_threadsafe(self.run_job((kind, group), job, serial), self.loop)
+            self.latest[(kind, group)] = future
+
+        started = time.time()
+        future.add_done_callback(lambda f: self.job_done(kind, f, started))
+        return future
+
+    async def run_job(self, key, job, serial):
+        if not serial:
+            return await job()
+        lock = self.serial_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            return await job()
+
+    def job_done(self, kind, future, started):
+        if future.cancelled():
+            return
+        with self.lock:
+            stats = self.stats_by_kind[kind]
+            if future.exception() is not None:
+                stats["failed"] += 1
+                logger.error(f"Agent {kind} job failed: {future.exception()}")
+            else:
+                stats["completed"] += 1
+                stats["total_seconds"] += time.time() - started
+        if self.metrics is not None and future.exception() is None:
+            self.metrics.observe("agent_job_seconds", time.time() - started, kind=kind)
+
+    def record_first_output(self, kind, seconds):
+        """Time from the context arriving to the first usable output (token or suggestion)"""
+        with self.lock:
+            stats = self.stats_by_kind[kind]
+            stats["first_output_count"] += 1
+            stats["first_output_total"] += seconds
+            stats["first_output_max"] = max(stats["first_output_max"], seconds)
+        logger.info(f"Agent {kind} first output after {seconds * 1000:.0f}ms")
+
+    def stats(self):
+        with self.lock:
+            return {
+                kind: {
+                    "submitted": s["submitted"],
+                    "completed": s["completed"],
+                    "cancelled": s["cancelled"],
+                    "failed": s["failed"],
+                    "avg_latency_ms": round(s["total_seconds"] / s["completed"] * 1000, 1) if s["completed"] else 0.0,
+                    "avg_first_output_ms": round(s["first_output_total"] / s["first_output_count"] * 1000, 1)
+                    if s["first_output_count"] else 0.0,
+                    "max_first_output_ms": round(s["first_output_max"] * 1000, 1),
+                }
+                for kind, s in self.stats_by_kind.items()
+            }
+
+    def shutdown(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.cache.flush()
+
+class SuggestionStream:
+    """
+    Incremental parser for a streamed JSON array (the sales agent's suggestions).
+    feed() returns each top-level element as soon as it is complete; anything
+    before the first '[' (a ```json fence, a {"suggestions": wrapper) is skipped.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.current = None  # characters of the element being read
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+
+    def feed(self, text):
+        items = []
+        for ch in text:
+            if not self.started:
+                self.started = ch == "["
+                continue
+            if self.current is None:
+                # Between elements: commas, whitespace and the closing bracket
+                if ch == "{":
+                    self.current, self.depth = [ch], 1
+                elif ch == '"':
+                    self.current, self.in_string = [ch], True
+                continue
+
+            self.current.append(ch)
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    if self.depth == 0:
+                        self.finish(items)
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    self.finish(items)
+        return items
+
+    def finish(self, items):
+        text = "".join(self.current)
+        self.current = None
+        try:
+            items.append(json.loads(text))
+        except ValueError:
+            # The prompt's example has trailing commas, and the model copies them
+            try:
+                items.append(json.loads(re.sub(r",\s*([}\]])", r"\1", text)))
+            except ValueError:
+                logger.warning(f"Skipping unparsable suggestion: {text[:80]}")
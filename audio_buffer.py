@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Preallocated ring buffer for live audio
+Shared by the Electron backend and the transcription test scripts
+"""
+
+import threading
+from math import gcd
+import numpy as np
+
+
+def decimation_taps(factor):
+    """Windowed-sinc low-pass at the Nyquist frequency of the decimated rate"""
+    half = 16 * factor
+    taps = np.sinc(np.arange(-half, half + 1) / factor) * np.hamming(2 * half + 1)
+    return (taps / taps.sum()).astype(np.float32)
+
+
+def resample(audio, from_rate, to_rate):
+    """Resample float32 mono audio (e.g. 48 kHz system audio down to Whisper's 16 kHz)"""
+    if from_rate == to_rate:
+        return audio
+    if from_rate % to_rate == 0:
+        # Integer decimation needs no scipy: low-pass, then keep every factor-th sample
+        factor = from_rate // to_rate
+        return np.convolve(audio, decimation_taps(factor), mode="same")[::factor].astype(np.float32)
+    from scipy.signal import resample_poly
+    factor = gcd(from_rate, to_rate)
+    return resample_poly(audio, to_rate // factor, from_rate // factor).astype(np.float32)
+
+
+
+class StreamingResampler:
+    """
+    resample() for a stream that arrives in pieces.
+    Keeps the filter history and decimation phase between calls so the output
+    is the same as resampling the whole stream at once.
+    """
+
+    def __init__(self, from_rate, to_rate):
+        self.from_rate = from_rate
+        self.to_rate = to_rate
+        self.integer = from_rate % to_rate == 0
+        if self.integer and from_rate != to_rate:
+            self.factor = from_rate // to_rate
+            self.taps = decimation_taps(self.factor)
+            self.half = len(self.taps) // 2
+            self.pending = np.zeros(self.half, dtype=np.float32)  # left context
+
+    def process(self, audio):
+        if self.from_rate == self.to_rate:
+            return audio
+        if not self.integer:
+            # Rare (e.g. 44.1 kHz); per-piece polyphase resampling is close enough for speech
+            return resample(audio, self.from_rate, self.to_rate)
+
+        # pending[half] is the centre of the next output sample
+        data = np.concatenate([self.pending, audio])
+        count = max(0, (len(data) - 2 * self.half - 1) // self.factor + 1)
+        if count == 0:
+            self.pending = data
+            return np.zeros(0, dtype=np.float32)
+        filtered = np.convolve(data[:(count - 1) * self.factor + 2 * self.half + 1], self.taps, mode="valid")
+        self.pending = data[count * self.factor:]
+        return filtered[::self.factor].astype(np.float32)
+
+
+class AudioRingBuffer:
+    """
+    Fixed-size float32 ring buffer for one writer thread and one reader thread.
+
+    Every sample is stored twice, at ``i`` and ``i + capacity``, so any window of
+    up to ``capacity`` samples is one contiguous slice and can be handed out as a
+    numpy view without copying. The writer only ever moves ``write_pos`` and the
+    reader only ever moves ``read_pos``, so neither side takes a lock on the data.
+
+    A view stays valid until the writer has wrapped around onto it. The reader
+    keeps the unread backlog below ``max_lag`` samples (half the capacity by
+    default), which leaves at least that much headroom for a window in use.
+    """
+
+    def __init__(self, capacity, max_lag=None):
+        self.capacity = int(capacity)
+        self.max_lag = int(max_lag) if max_lag is not None else self.capacity // 2
+        self._data = np.zeros(2 * self.capacity, dtype=np.float32)
+        self._write_pos = 0  # total samples ever written, only the writer moves it
+        self._read_pos = 0  # total samples ever consumed, only the reader moves it
+        self._data_ready = threading.Event()
+        self.dropped_samples = 0
+        self.window_pos = 0  # stream position of the last window handed out, for timestamps
+        self.wanted = 0  # unread samples the reader last waited for, so a paced writer knows its need
+        self._reader_waiting = False
+
+    @property
+    def write_pos(self):
+        return self._write_pos
+
+    @property
+    def read_pos(self):
+        return self._read_pos
+
+    def write(self, samples):
+        """Copy a block of samples in (writer side, e.g. the audio callback)"""
+        n = len(samples)
+        if n == 0:
+            return
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+            n = self.capacity
+
+        start = self._write_pos % self.capacity
+        first = min(n, self.capacity - start)
+        data = self._data
+        data[start:start + first] = samples[:first]
+        data[start + self.capacity:start + self.capacity + first] = samples[:first]
+        if first < n:
+            rest = n - first
+            data[:rest] = samples[first:]
+            data[self.capacity:self.capacity + rest] = samples[first:]
+
+        # Publish only after the samples are in place
+        self._write_pos += n
+        self._data_ready.set()
+
+    def available(self):
+        """Number of samples written but not yet consumed"""
+        return self._write_pos - self._read_pos
+
+    def _drop_backlog(self):
+        backlog = self._write_pos - self._read_pos
+        if backlog > self.max_lag:
+            self.dropped_samples += backlog - self.max_lag
+            self._read_pos = self._write_pos - self.max_lag
+
+    def peek(self, size):
+        """View of the oldest ``size`` unread samples, or None if not enough yet
+
+        If the backlog is past ``max_lag``, the oldest samples are dropped first
+        and the view is shorter than ``size`` (what remains).
+        """
+        if self.available() < size:
+            return None
+        self._drop_backlog()
+        size = min(size, self.available())
+        self.window_pos = self._read_pos
+        start = self._read_pos % self.capacity
+        return self._data[start:start + size]
+
+    def consume(self, n):
+        """Mark ``n`` samples as read"""
+        self._read_pos += min(n, self.available())
+
+    def next_window(self, size, hop):
+        """View of the next ``size`` samples, advancing by ``hop`` for overlap"""
+        window = self.peek(size)
+        if window is not None:
+            self.consume(hop)
+        return window
+
+    def read(self, max_samples=None):
+        """View of everything unread (up to ``max_samples``), consuming it"""
+        self._drop_backlog()
+        size = self.available()
+        if max_samples is not None:
+            size = min(size, max_samples)
+        self.window_pos = self._read_pos
+        start = self._read_pos % self.capacity
+        window = self._data[start:start + size]
+        self._read_pos += size
+        return window
+
+    def wait(self, samples, timeout=None):
+        """Block until at least ``samples`` are unread or the timeout expires"""
+        self.wanted = samples
+        if self.available() >= samples:
+            return True
+        self._data_ready.clear()
+        # Re-check after clearing so a write in between is not missed
+        if self.available() >= samples:
+            return True
+        self._reader_waiting = True
+        try:
+            self._data_ready.wait(timeout)
+        finally:
+            self._reader_waiting = False
+        return self.available() >= samples
+
+    def reader_idle(self):
+        """True while the reader is blocked in wait() for more than is buffered"""
+        return self._reader_waiting and self.available() < self.wanted
+
+    def reset(self):
+        """Discard all audio (only while neither side is running)"""
+        self._write_pos = 0
+        self._read_pos = 0
+        self.dropped_samples = 0
+        self.window_pos = 0
+        self.wanted = 0
+        self._data_ready.clear()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Audio sources for the mic path of ElectronBackend
+A source is built by a factory ``factory(callback, sample_rate, block_size)``
+and has start/stop/close, like sounddevice's InputStream; it calls
+``callback(indata, frames, time, status)`` with float32 blocks of shape
+(frames, 1). Besides the microphone there are file/array replay and a
+synthetic multi-speaker generator, so the live pipeline runs headless
+"""
+
+import abc
+import importlib
+import threading
+import time
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def sounddevice_source(callback, sample_rate, block_size):
+    """The default input device"""
+    sd = importlib.import_module("sounddevice")
+    return sd.InputStream(callback=callback, channels=1, samplerate=sample_rate, dtype=np.float32, blocksize=block_size)
+
+class BlockSource(abc.ABC):
+    """
+    Pushes audio from its own thread in ``block_size`` blocks. ``speed`` 1 is
+    wall clock, N is N times faster; 0 is as fast as possible, or, with
+    ``backlog`` (samples beyond what the reader last waited for), whenever the
+    backend is waiting for more. Subclasses yield arrays of any
+    length from chunks(). Handover times are kept for latency measurements.
+    """
+
+    def __init__(self, callback, sample_rate, block_size, speed=1.0, backlog=None):
+        self.callback = callback
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.speed = speed
+        self.backlog = backlog
+        self.position = 0  # samples handed over so far
+        self.block_ends = []  # sample index at the end of each block
+        self.block_times = []  # perf_counter when it was handed over
+        self.done = threading.Event()
+        self.running = False
+        self.thread = None
+
+    @abc.abstractmethod
+    def chunks(self):
+        """Audio to hand over, as float32 arrays of any length"""
+
+    def blocks(self):
+        """chunks() cut (and joined) into block_size pieces; the last one may be short"""
+        pending = []
+        size = 0
+        for chunk in self.chunks():
+            pending.append(np.asarray(chunk, dtype=np.float32))
+            size += len(chunk)
+            if size < self.block_size:
+                continue
+            data = np.concatenate(pending)
+            whole = len(data) - len(data) % self.block_size
+            for start in range(0, whole, self.block_size):
+                yield data[start:start + self.block_size]
+            pending, size = [data[whole:]], len(data) - whole
+        if size:
+            yield np.concatenate(pending)
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, name=f"{type(self).__name__}")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            for block in self.blocks():
+                if not self.running:
+                    break
+                if self.speed > 0:
+                    due = started + self.position / self.sample_rate / self.speed
+                    time.sleep(max(0.0, due - time.perf_counter()))
+                elif self.backlog is not None:
+                    while self.running and self.backlog() >= 0:
+                        time.sleep(0.002)
+                self.callback(block.reshape(-1, 1), len(block), None, None)
+                self.position += len(block)
+                self.block_ends.append(self.position)
+                self.block_times.append(time.perf_counter())
+        except Exception as e:
+            logger.error(f"Audio source failed: {e}")
+        finally:
+            self.done.set()
+
+    def written_at(self, seconds):
+        """When the audio at ``seconds`` into the source had been handed to the callback"""
+        index = np.searchsorted(self.block_ends, seconds * self.sample_rate)
+        return self.block_times[min(index, len(self.block_times) - 1)]
+
+    def stop(self):
+        self.running = False
+
+    def close(self):
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join()
+
+class ReplaySource(BlockSource):
+    """A recording (array at ``sample_rate``, or a file path), optionally looped until stopped"""
+
+    def __init__(self, audio, callback, sample_rate, block_size, speed=1.0, backlog=None, loop=False):
+        super().__init__(callback, sample_rate, block_size, speed, backlog)
+        if isinstance(audio, str):
+            decode_audio = importlib.import_module("faster_whisper.audio").decode_audio
+            audio = decode_audio(audio, sampling_rate=sample_rate)
+        self.audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        self.loop = loop
+
+    def chunks(self):
+        while True:
+            yield self.audio
+            if not self.loop:
+                return
+
+class SyntheticSpeechSource(BlockSource):
+    """
+    Deterministic speech-like audio: speakers with their own pitch take turns
+    of syllable trains (harmonics under moving formants, ~4-6 syllables/s),
+    with pauses between words and turns over a faint noise floor. It passes
+    energy VAD and loads the decoder like real speech, though Whisper will
+    not find words in it. Turns are generated one at a time, so an endless
+    (``duration`` None) source uses constant memory.
+    """
+
+    def __init__(self, callback, sample_rate, block_size, speakers=2, duration=None, speed=1.0, backlog=None, seed=0):
+        super().__init__(callback, sample_rate, block_size, speed, backlog)
+        self.speakers = speakers
+        self.duration = duration
+        self.rng = np.random.RandomState(seed)
+        self.pitches = [110.0 * 1.22 ** i for i in range(speakers)]  # 110, 134, 164, 200 Hz ...
+
+    def syllable(self, pitch):
+        n = int(self.sample_rate * self.rng.uniform(0.12, 0.28))
+        t = np.arange(n) / self.sample_rate
+        f0 = pitch * (1 + 0.08 * np.sin(2 * np.pi * self.rng.uniform(1, 3) * t))  # intonation
+        phase = 2 * np.pi * np.cumsum(f0) / self.sample_rate
+        formants = (self.rng.uniform(300, 900), self.rng.uniform(900, 2500))
+        signal = np.zeros(n)
+        for k in range(1, 25):
+            frequency = pitch * k
+            if frequency > self.sample_rate / 2 - 500:
+                break
+            gain = sum(np.exp(-((frequency - f) / 150.0) ** 2) for f in formants) + 0.05
+            signal += gain / k * np.sin(k * phase)
+        envelope = np.sin(np.pi * np.arange(n) / n) ** 0.5
+        return signal * envelope * self.rng.uniform(0.08, 0.2)
+
+    def turn(self, speaker):
+        """One speaker's turn (2-8 s of words) followed by a pause"""
+        pitch = self.pitches[speaker]
+        pieces = []
+        length = self.rng.uniform(2.0, 8.0) * self.sample_rate
+        size = 0
+        while size < length:
+            for _ in range(self.rng.randint(1, 4)):
+                pieces.append(self.syllable(pitch))
+            pieces.append(np.zeros(int(self.sample_rate * self.rng.uniform(0.03, 0.15))))  # between words
+            size = sum(len(p) for p in pieces)
+        pieces.append(np.zeros(int(self.sample_rate * self.rng.uniform(0.3, 1.5))))  # between turns
+        audio = np.concatenate(pieces)
+        return (audio + self.rng.randn(len(audio)) * 0.002).astype(np.float32)
+
+    def chunks(self):
+        remaining = None if self.duration is None else int(self.duration * self.sample_rate)
+        speaker = 0
+        while remaining is None or remaining > 0:
+            audio = self.turn(speaker)
+            if remaining is not None:
+                audio = audio[:remaining]
+                remaining -= len(audio)
+            yield audio
+            # Mostly alternate, sometimes someone else cuts in
+            step = 1 if self.speakers < 3 or self.rng.rand() < 0.7 else self.rng.randint(1, self.speakers)
+            speaker = (speaker + step) % self.speakers
+
+def synthetic_speech(duration, sample_rate=16000, speakers=2, seed=0):
+    """``duration`` seconds of SyntheticSpeechSource audio as one array, without a thread"""
+    source = SyntheticSpeechSource(None, sample_rate, sample_rate, speakers=speakers, duration=duration, seed=seed)
+    return np.concatenate(list(source.chunks()))
+
+def parse_speed(text):
+    return 0.0 if text == "max" else float(text.rstrip("x"))
+
+def source_factory(spec):
+    """
+    Factory for a source spec: ``sounddevice``, ``replay:<file>[@speed]`` or
+    ``synthetic[:<speakers>][@speed]``, speed being a factor or ``max``
+    (e.g. ``replay:call.wav@4x``, ``synthetic:3@max``)
+    """
+    spec = spec.strip()
+    speed = 1.0
+    if "@" in spec:
+        spec, _, speed_text = spec.rpartition("@")
+        speed = parse_speed(speed_text)
+    kind, _, argument = spec.partition(":")
+    if kind == "sounddevice":
+        return sounddevice_source
+    if kind == "replay" and argument:
+        return lambda callback, sample_rate, block_size: ReplaySource(argument, callback, sample_rate, block_size, speed)
+    if kind == "synthetic":
+        speakers = int(argument) if argument else 2
+        return lambda callback, sample_rate, block_size: SyntheticSpeechSource(callback, sample_rate, block_size,
+                                                                               speakers=speakers, speed=speed)
+    raise ValueError(f"Unknown audio source: {spec} (sounddevice, replay:<file>[@speed], synthetic[:n][@speed])")
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Host calibration and live tuning for the Electron backend
+Picks the most accurate model/compute type/beam size this machine can run in
+real time, caches the answer on disk and watches live load during a session
+"""
+
+import json
+import os
+import platform
+import tempfile
+import time
+import wave
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cognition", "calibration.json")
+CACHE_MAX_AGE = 30 * 24 * 3600  # recalibrate monthly even if nothing changed
+SYNTHETIC_AUDIO = "synthetic-speech"  # calibration_audio of results timed on generated speech
+
+# Most accurate first; calibration stops at the first config that fits
+CPU_CANDIDATES = {
+    "model_sizes": ["small", "base", "tiny"],
+    "compute_types": ["int8"],
+    "beam_sizes": [5, 2, 1],
+}
+CUDA_CANDIDATES = {
+    "model_sizes": ["medium", "small", "base", "tiny"],
+    "compute_types": ["float16", "int8_float16"],
+    "beam_sizes": [5, 2, 1],
+}
+
+def write_synthetic_speech(duration=10, sample_rate=16000):
+    """Temporary WAV of generated multi-speaker speech (audio_sources.SyntheticSpeechSource)"""
+    from audio_sources import synthetic_speech
+
+    audio = synthetic_speech(duration, sample_rate)
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+        path = temp_file.name
+    with wave.open(path, 'wb') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes((np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes())
+    return path
+
+def host_fingerprint(device):
+    """Identifies the machine a calibration result is valid for"""
+    return {
+        "node": platform.node(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "device": device,
+    }
+
+class AutoTuner:
+    """
+    Startup calibration.
+    Runs a short benchmark per candidate config (via benchmark_test.benchmark_model)
+    and returns the most accurate one whose real-time factor stays under
+    target_rtf, leaving headroom for streaming re-decodes and system audio.
+    Timed on generated speech (turns of syllables and pauses) unless a
+    recording is given with ``audio_file`` or COGNITION_CALIBRATION_AUDIO.
+    """
+
+    def __init__(self, device="cpu", target_rtf=0.5, cache_path=DEFAULT_CACHE_PATH,
+                 candidates=None, audio_file=None, iterations=2):
+        self.device = device
+        self.target_rtf = target_rtf
+        self.cache_path = cache_path
+        self.candidates = candidates or (CUDA_CANDIDATES if device == "cuda" else CPU_CANDIDATES)
+        self.audio_file = audio_file or os.environ.get("COGNITION_CALIBRATION_AUDIO")
+        self.iterations = iterations
+
+    def load_cached(self):
+        """Cached result for this host and target, or None"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if cached.get("fingerprint") != host_fingerprint(self.device):
+            return None
+        if cached.get("target_rtf") != self.target_rtf or cached.get("candidates") != self.candidates:
+            return None
+        if cached.get("calibration_audio") != (self.audio_file or SYNTHETIC_AUDIO):
+            return None
+        if time.time() - cached.get("timestamp", 0) > CACHE_MAX_AGE:
+            return None
+        return cached
+
+    def save(self, result):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2)
+        except OSError as e:
+            logger.error(f"Could not save calibration to {self.cache_path}: {e}")
+
+    def calibrate(self, force=False):
+        """Return {"model_size", "compute_type", "beam_size", "rtf", ...}, benchmarking if needed"""
+        if not force:
+            cached = self.load_cached()
+            if cached:
+                logger.info(f"Using cached calibration from {self.cache_path}")
+                return cached
+
+        # Imported here so the backend does not pay for it unless calibrating
+        from faster_whisper import WhisperModel
+        from benchmark_test import benchmark_model
+
+        audio_file = self.audio_file
+        cleanup_audio = audio_file is None
+        if cleanup_audio:
+            audio_file = write_synthetic_speech(duration=10)
+
+        measurements = []
+        chosen = None
+        try:
+            for model_size in self.candidates["model_sizes"]:
+                for compute_type in self.candidates["compute_types"]:
+                    try:
+                        model = WhisperModel(model_size, device=self.device, compute_type=compute_type)
+                    except Exception as e:
+                        logger.warning(f"Skipping {model_size}/{compute_type}: {e}")
+                        continue
+                    # One untimed pass so kernel setup is not counted
+                    list(model.transcribe(audio_file, beam_size=1, vad_filter=False)[0])
+                    for beam_size in self.candidates["beam_sizes"]:
+                        # VAD off: calibration must time the decoder, not the silence filter
+                        result = benchmark_model(
+                            model_size, self.device, compute_type, audio_file,
+                            beam_size=beam_size, vad_filter=False,
+                            iterations=self.iterations, model=model
+                        )
+                        measurements.append({
+                            "model_size": model_size,
+                            "compute_type": compute_type,
+                            "beam_size": beam_size,
+                            "rtf": round(result['rtf'], 3),
+                        })
+                        if result['rtf'] <= self.target_rtf:
+                            chosen = measurements[-1]
+                            break
+                    del model
+                    if chosen:
+                        break
+                if chosen:
+                    break
+        finally:
+            if cleanup_audio:
+                os.unlink(audio_file)
+
+        if chosen is None:
+            # Nothing met the target; take whatever was fastest
+            if not measurements:
+                raise RuntimeError("Calibration could not load any model")
+            chosen = min(measurements, key=lambda m: m["rtf"])
+            logger.warning(f"No config reached RTF {self.target_rtf}; using fastest ({chosen['rtf']})")
+
+        result = dict(chosen)
+        result.update({
+            "device": self.device,
+            "target_rtf": self.target_rtf,
+            "candidates": self.candidates,
+            "calibration_audio": self.audio_file or SYNTHETIC_AUDIO,
+            "measurements": measurements,
+            "fingerprint": host_fingerprint(self.device),
+            "timestamp": time.time(),
+        })
+        self.save(result)
+        logger.info(f"Calibrated: {chosen['model_size']}/{chosen['compute_type']} beam {chosen['beam_size']} (RTF {chosen['rtf']})")
+        return result
+
+class LiveRTFMonitor:
+    """
+    Live real-time factor during a session.
+    Sampled periodically with the inference scheduler's cumulative busy time:
+    decode seconds per wall-clock second is the RTF of the live stream as a
+    whole (mic plus system audio, including streaming re-decodes).
+    """
+
+    def __init__(self, high=0.85, low=0.35, sustain=3, smoothing=0.5):
+        self.high = high
+        self.low = low
+        self.sustain = sustain  # consecutive samples before acting
+        self.smoothing = smoothing
+        self.reset()
+
+    def reset(self):
+        self.rtf = 0.0
+        self.last_busy = None
+        self.last_time = None
+        self.high_count = 0
+        self.low_count = 0
+
+    def sample(self, busy_seconds):
+        """Update from the cumulative busy time; returns "down", "up" or None"""
+        now = time.time()
+        if self.last_busy is None:
+            self.last_busy, self.last_time = busy_seconds, now
+            return None
+        elapsed = now - self.last_time
+        if elapsed <= 0:
+            return None
+        instant = (busy_seconds - self.last_busy) / elapsed
+        self.last_busy, self.last_time = busy_seconds, now
+        self.rtf = self.smoothing * self.rtf + (1 - self.smoothing) * instant
+
+        self.high_count = self.high_count + 1 if self.rtf > self.high else 0
+        self.low_count = self.low_count + 1 if self.rtf < self.low else 0
+        if self.high_count >= self.sustain:
+            self.high_count = 0
+            return "down"
+        if self.low_count >= self.sustain * 4:
+            self.low_count = 0
+            return "up"
+        return None
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Overload handling for the transcription pipeline
+Decides what to do when decoding falls behind real time and reports it to Electron
+"""
+
+import json
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# drop_oldest: skip stale audio and jump back to live
+# merge: decode the whole backlog as one longer window
+# degrade: step down to cheaper decode settings (beam size, then model size)
+OVERLOAD_POLICIES = ("drop_oldest", "merge", "degrade")
+
+# Largest to smallest; "degrade" only ever moves towards the end
+MODEL_LADDER = ["large-v3", "large-v2", "large", "medium", "small", "base", "tiny"]
+BEAM_LADDER = [5, 2, 1]
+
+def build_degrade_ladder(beam_size, model_size):
+    """Decode configs from the configured one down to the cheapest, one step apart"""
+    ladder = [(beam_size, model_size)]
+    for beam in BEAM_LADDER:
+        if beam < beam_size:
+            ladder.append((beam, model_size))
+    floor_beam = ladder[-1][0]
+
+    suffix = ".en" if model_size.endswith(".en") else ""
+    base_name = model_size[:-len(suffix)] if suffix else model_size
+    if base_name in MODEL_LADDER:
+        for smaller in MODEL_LADDER[MODEL_LADDER.index(base_name) + 1:]:
+            if suffix and smaller.startswith("large"):
+                continue
+            ladder.append((floor_beam, smaller + suffix))
+    return ladder
+
+class BackpressureController:
+    """
+    Tracks how far behind real time the pipeline is.
+    observe() is fed the current lag; the controller reports state changes as
+    BACKPRESSURE: events and, for the "degrade" policy, walks a ladder of
+    decode configs down while lagging and back up once it has been calm.
+    """
+
+    def __init__(self, emit, policy="merge", beam_size=5, model_size="base",
+                 lag_threshold=3.0, recover_threshold=1.0, recover_after=30.0,
+                 degrade_cooldown=10.0, report_interval=5.0):
+        if policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown overload policy: {policy}")
+        self.emit = emit
+        self.policy = policy
+        self.lag_threshold = lag_threshold
+        self.recover_threshold = recover_threshold
+        self.recover_after = recover_after
+        self.degrade_cooldown = degrade_cooldown
+        self.report_interval = report_interval
+
+        self.ladder = build_degrade_ladder(beam_size, model_size)
+        self.level = 0
+        self.reset()
+
+    def reset(self):
+        self.lagging = False
+        self.last_report = 0.0
+        self.last_degrade = 0.0
+        self.calm_since = None
+        self.source_lag = {}
+        self.max_lag = 0.0
+        self.dropped_seconds = 0.0
+        self.merged_windows = 0
+
+    def set_policy(self, policy):
+        if policy not in OVERLOAD_POLICIES:
+            raise ValueError(f"Unknown overload policy: {policy}")
+        self.policy = policy
+
+    def set_base_config(self, beam_size, model_size):
+        """Rebuild the ladder from a new starting config (e.g. after calibration)"""
+        self.ladder = build_degrade_ladder(beam_size, model_size)
+        self.level = 0
+
+    def current_config(self):
+        """(beam_size, model_size) for the current degrade level"""
+        return self.ladder[self.level]
+
+    def observe(self, lag_seconds, queue_depth=0, source="MIC"):
+        """Record the current lag; returns True when the pipeline is overloaded"""
+        now = time.time()
+        self.max_lag = max(self.max_lag, lag_seconds)
+        # Mic and system audio lag independently; the worst one decides the state
+        self.source_lag[source] = lag_seconds
+        lag_seconds = max(self.source_lag.values())
+
+        if lag_seconds > self.lag_threshold:
+            self.calm_since = None
+            if not self.lagging or now - self.last_report >= self.report_interval:
+                self.lagging = True
+                self.report("lagging", lag_seconds, queue_depth, source)
+            return True
+
+        if lag_seconds < self.recover_threshold:
+            if self.lagging:
+                self.lagging = False
+                self.report("recovered", lag_seconds, queue_depth, source)
+            if self.calm_since is None:
+                self.calm_since = now
+        return False
+
+    def record_drop(self, seconds, source="MIC"):
+        self.dropped_seconds += seconds
+        logger.warning(f"Backpressure: dropped {seconds:.1f}s of stale {source} audio")
+        self.report("dropped", 0.0, 0, source, dropped=round(seconds, 2))
+
+    def record_merge(self, seconds, source="MIC"):
+        self.merged_windows += 1
+        self.report("merged", seconds, 0, source, window_seconds=round(seconds, 2))
+
+    def step_down(self):
+        """Move one rung down the ladder if the cooldown allows; returns the new config or None"""
+        now = time.time()
+        if self.level >= len(self.ladder) - 1 or now - self.last_degrade < self.degrade_cooldown:
+            return None
+        self.level += 1
+        self.last_degrade = now
+        self.report("degraded", 0.0, 0, None)
+        return self.current_config()
+
+    def step_up(self, require_calm=True):
+        """Move one rung back up after a calm period; returns the new config or None"""
+        now = time.time()
+        if self.level == 0:
+            return None
+        if require_calm and (self.calm_since is None or now - self.calm_since < self.recover_after):
+            return None
+        self.level -= 1
+        self.calm_since = now
+        self.report("restored", 0.0, 0, None)
+        return self.current_config()
+
+    def report(self, state, lag_seconds, queue_depth, source, **extra):
+        self.last_report = time.time()
+        beam_size, model_size = self.current_config()
+        event = {
+            "state": state,
+            "policy": self.policy,
+            "source": source,
+            "lag_seconds": round(lag_seconds, 2),
+            "queue_depth": queue_depth,
+            "dropped_seconds": round(self.dropped_seconds, 2),
+            "beam_size": beam_size,
+            "model_size": model_size,
+        }
+        event.update(extra)
+        self.emit("BACKPRESSURE", json.dumps(event))
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Offline batch transcription for archives of recorded calls
+Each file is cut into speech segments by the VAD gate and the segments are
+decoded in batches; files are spread over a pool of worker processes, each
+with its own model, and transcripts are written as JSON lines.
+Batched decodes give one timestamp span per speech piece (up to
+MAX_SEGMENT_SECONDS); ``--timestamps segment`` decodes each piece on its own
+for Whisper's segment timestamps instead, at the cost of batching
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".opus", ".webm", ".aac")
+
+# Whisper sees 30 s at a time; longer segments are split, short neighbours joined
+MAX_SEGMENT_SECONDS = 28.0
+SAMPLE_RATE = 16000
+
+def collect_files(paths, extensions=AUDIO_EXTENSIONS):
+    """Audio files named on the command line, directories searched recursively, sorted"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in names if name.lower().endswith(extensions))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            logger.warning(f"Skipping {path}: no such file or directory")
+    return sorted(files)
+
+def plan_segments(speech, max_segment, max_gap):
+    """Join speech ranges closer than ``max_gap`` samples into pieces of at most ``max_segment`` samples"""
+    pieces = []
+    for start, end in speech:
+        if pieces and start - pieces[-1][1] <= max_gap and end - pieces[-1][0] <= max_segment:
+            pieces[-1][1] = end
+            continue
+        # One long utterance becomes several pieces
+        while end - start > max_segment:
+            pieces.append([start, start + max_segment])
+            start += max_segment
+        pieces.append([start, end])
+    return [(start, end) for start, end in pieces if end > start]
+
+# Per-process state, set up once by init_worker
+worker = {}
+
+def init_worker(model_size, device, compute_type, cpu_threads, num_workers, batch_size, vad_mode, beam_size,
+                timestamps="piece"):
+    """Load the model once per worker process"""
+    from faster_whisper import WhisperModel
+    from inference import InferenceScheduler
+    from vad import VoiceActivityGate
+
+    logging.basicConfig(level=logging.WARNING)
+    model = WhisperModel(model_size, device=device, compute_type=compute_type,
+                         cpu_threads=cpu_threads, num_workers=num_workers)
+    VoiceActivityGate(SAMPLE_RATE, mode=vad_mode).load_model()  # Silero loads once per process
+    worker["scheduler"] = InferenceScheduler(model, max_queue=1 << 16, max_batch=batch_size,
+                                             batch_window=0, num_workers=num_workers)
+    worker["vad_mode"] = vad_mode
+    worker["beam_size"] = beam_size
+    worker["timestamps"] = timestamps
+
+def transcribe_file(path):
+    """One file -> transcript record (runs in a worker process)"""
+    from faster_whisper.audio import decode_audio
+    from vad import VoiceActivityGate
+
+    started = time.perf_counter()
+    audio = decode_audio(path, sampling_rate=SAMPLE_RATE)
+    # A fresh gate per file, so one recording's noise floor does not carry over to the next
+    gate = VoiceActivityGate(SAMPLE_RATE, mode=worker["vad_mode"])
+    pieces = plan_segments(gate.speech_segments(audio), int(MAX_SEGMENT_SECONDS * SAMPLE_RATE), gate.min_silence * 2)
+
+    options = dict(
+        beam_size=worker["beam_size"],
+        language="en",
+        condition_on_previous_text=False,
+        vad_filter=False,  # already segmented
+        temperature=0.0,
+    )
+    if worker["timestamps"] == "segment":
+        # Not a batchable option: each piece gets the full transcribe() and its segment timestamps
+        options["without_timestamps"] = False
+    # Everything goes in at once so the scheduler can fill its batches
+    futures = [worker["scheduler"].submit(audio[start:end], **options) for start, end in pieces]
+    segments = []
+    for (start, _), future in zip(pieces, futures):
+        decoded, _ = future.result()
+        offset = start / SAMPLE_RATE
+        for segment in decoded:
+            text = segment.text.strip()
+            if text:
+                segments.append({"start": round(offset + segment.start, 2),
+                                 "end": round(offset + segment.end, 2), "text": text})
+
+    return {
+        "file": path,
+        "duration": round(len(audio) / SAMPLE_RATE, 2),
+        "speech_seconds": round(sum(end - start for start, end in pieces) / SAMPLE_RATE, 2),
+        "decode_seconds": round(time.perf_counter() - started, 2),
+        "timestamps": worker["timestamps"],  # "piece": one span per speech piece, "segment": Whisper's segments
+        "segments": segments,
+        "text": " ".join(segment["text"] for segment in segments),
+    }
+
+def run_batch(files, output, processes, worker_args):
+    """Transcribe ``files`` over the pool, writing one JSON line per file as it finishes; returns the totals"""
+    started = time.perf_counter()
+    audio_seconds = 0.0
+    failed = 0
+    with ProcessPoolExecutor(max_workers=processes, initializer=init_worker, initargs=worker_args) as pool:
+        futures = {pool.submit(transcribe_file, path): path for path in files}
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                failed += 1
+                logger.error(f"Could not transcribe {path}: {e}")
+                record = {"file": path, "error": str(e)}
+            else:
+                audio_seconds += record["duration"]
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+            logger.info(f"[{done}/{len(files)}] {path}")
+
+    wall_seconds = time.perf_counter() - started
+    return {
+        "files": len(files),
+        "failed": failed,
+        "processes": processes,
+        "audio_hours": round(audio_seconds / 3600, 3),
+        "wall_hours": round(wall_seconds / 3600, 4),
+        "audio_hours_per_wall_hour": round(audio_seconds / wall_seconds, 1) if wall_seconds else 0.0,
+    }
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Transcribe recorded meetings to JSONL")
+    parser.add_argument("paths", nargs="+", help="audio files and/or directories")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default stdout)")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--device", default="cpu", help="cpu or cuda")
+    parser.add_argument("--compute-type", default="int8", help="CTranslate2 compute type")
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=8, help="segments per batched decode")
+    parser.add_argument("--cpu-threads", type=int, default=min(4, cpu_count), help="CTranslate2 threads per process")
+    parser.add_argument("--num-workers", type=int, default=1, help="concurrent decodes per process")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="worker processes (default: cores / cpu-threads; 1 on cuda)")
+    parser.add_argument("--vad", default="model", choices=("model", "energy"), help="speech segmentation")
+    parser.add_argument("--timestamps", default="piece", choices=("piece", "segment"),
+                        help=f"piece: batched, one span per speech piece (up to {MAX_SEGMENT_SECONDS:.0f}s); "
+                             "segment: Whisper's segment timestamps, decoded without batching")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    files = collect_files(args.paths)
+    if not files:
+        parser.error("no audio files found")
+    processes = args.processes or (1 if args.device == "cuda" else max(1, cpu_count // args.cpu_threads))
+    processes = min(processes, len(files))
+    worker_args = (args.model, args.device, args.compute_type, args.cpu_threads, args.num_workers,
+                   args.batch_size, args.vad, args.beam_size, args.timestamps)
+    logger.info(f"Transcribing {len(files)} files with {processes} processes x {args.cpu_threads} threads")
+
+    if args.output == "-":
+        totals = run_batch(files, sys.stdout, processes, worker_args)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            totals = run_batch(files, output, processes, worker_args)
+    # Totals go to stderr so stdout stays pure JSONL
+    print(json.dumps(totals), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
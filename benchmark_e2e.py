@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+End-to-end benchmark over recorded speech fixtures
+Replays each fixture into the real ElectronBackend mic pipeline (at wall-clock
+speed, N times faster, or as fast as decoding allows) and measures decode
+time, capture-to-output latency, WER against the reference transcript, CPU
+and memory; results are written as JSON so runs can be diffed
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import platform
+import resource
+import argparse
+import threading
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = (".wav", ".flac", ".mp3", ".m4a", ".ogg")
+SAMPLE_RATE = 16000
+
+def load_fixtures(paths):
+    """(name, audio path, reference text) for every audio file with a same-named .txt next to it"""
+    candidates = []
+    for path in paths:
+        if os.path.isdir(path):
+            candidates.extend(os.path.join(path, name) for name in sorted(os.listdir(path)))
+        else:
+            candidates.append(path)
+    fixtures = []
+    for audio_path in candidates:
+        stem, extension = os.path.splitext(audio_path)
+        if extension.lower() not in AUDIO_EXTENSIONS:
+            continue
+        if not os.path.exists(stem + ".txt"):
+            logger.warning(f"Skipping {audio_path}: no reference transcript {stem}.txt")
+            continue
+        with open(stem + ".txt", 'r', encoding='utf-8') as f:
+            fixtures.append((os.path.basename(stem), audio_path, f.read()))
+    return fixtures
+
+def normalize_words(text):
+    """Lowercase words without punctuation, as WER is usually scored"""
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance (substitutions + deletions + insertions) and the reference length"""
+    ref, hyp = normalize_words(reference), normalize_words(hypothesis)
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1], len(ref)
+
+def percentiles(values, scale=1000.0):
+    """p50/p95/p99/max/mean of ``values`` (seconds, reported in ms by default)"""
+    if not values:
+        return {"count": 0}
+    values = np.asarray(values, dtype=np.float64) * scale
+    return {
+        "count": int(len(values)),
+        "mean": round(float(values.mean()), 1),
+        "p50": round(float(np.percentile(values, 50)), 1),
+        "p95": round(float(np.percentile(values, 95)), 1),
+        "p99": round(float(np.percentile(values, 99)), 1),
+        "max": round(float(values.max()), 1),
+    }
+
+def current_rss():
+    """Resident memory in bytes (Linux /proc; elsewhere the peak so far)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+class ResourceMonitor:
+    """CPU time and resident memory of this process over a measured interval"""
+
+    def __init__(self, interval=0.25):
+        self.interval = interval
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        self.cpu_start = usage.ru_utime + usage.ru_stime
+        self.wall_start = time.perf_counter()
+        self.rss_samples = [current_rss()]
+        self.running = True
+        self.thread = threading.Thread(target=self.sample, name="resource-monitor")
+        self.thread.daemon = True
+        self.thread.start()
+
+    def sample(self):
+        while self.running:
+            time.sleep(self.interval)
+            self.rss_samples.append(current_rss())
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        cpu = usage.ru_utime + usage.ru_stime - self.cpu_start
+        wall = time.perf_counter() - self.wall_start
+        return {
+            "cpu_seconds": round(cpu, 2),
+            "cpu_utilization": round(cpu / wall, 2) if wall else 0.0,  # cores busy on average
+            "rss_mb_mean": round(float(np.mean(self.rss_samples)) / 2**20, 1),
+            "rss_mb_peak": round(max(self.rss_samples) / 2**20, 1),
+        }
+
+def make_backend(model_size, device, compute_type, beam_size, speed):
+    """An ElectronBackend whose mic replays ``fixture_audio`` and whose transcriptions are recorded"""
+    from audio_sources import ReplaySource
+    from electron_backend import ElectronBackend
+
+    class BenchmarkBackend(ElectronBackend):
+        def __init__(self):
+            super().__init__(model_size=model_size, device=device, compute_type=compute_type,
+                             beam_size=beam_size, stdio=False, audio_source=self.replay_source)
+            self.fixture_audio = None
+            self.replay = None
+            self.outputs = []  # (perf_counter, text, start, end) per TRANSCRIPTION message
+            self.decode_times = []
+            self.inference.listeners.append(
+                lambda batch, seconds: self.decode_times.extend([seconds] * len(batch)))
+
+        def replay_source(self, callback, sample_rate, block_size):
+            self.replay = ReplaySource(self.fixture_audio, callback, sample_rate, block_size, speed)
+            return self.replay
+
+        def emit(self, tag, payload=None, session=None, **meta):
+            if tag == "TRANSCRIPTION":
+                self.outputs.append((time.perf_counter(), payload, meta.get("start"), meta.get("end")))
+            super().emit(tag, payload, session=session, **meta)
+
+    return BenchmarkBackend()
+
+def run_fixture(backend, name, audio_path, reference):
+    """Replay one fixture (a path, or audio already at 16 kHz) and score it"""
+    if isinstance(audio_path, str):
+        from faster_whisper.audio import decode_audio
+        audio = decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+    else:
+        audio = audio_path
+    backend.fixture_audio = audio
+    backend.outputs = []
+    backend.decode_times = []
+    monitor = ResourceMonitor()
+    logger.info(f"Replaying {name} ({len(audio) / SAMPLE_RATE:.1f}s)")
+
+    monitor.start()
+    started = time.perf_counter()
+    backend.start_listening()
+    backend.replay.done.wait()
+    # Let decoding catch up with the end of the fixture (the mic loop is left waiting
+    # for audio that will not come), then STOP flushes the tail
+    while not backend.audio_buffer.reader_idle():
+        time.sleep(0.05)
+    backend.stop_listening()
+    wall = time.perf_counter() - started
+    resources = monitor.stop()
+
+    # Latency: output time minus the time the end of that speech was captured
+    latencies = [emitted - backend.replay.written_at(end) for emitted, _, _, end in backend.outputs if end is not None]
+    hypothesis = " ".join(turn.text for turn in sorted(backend.session.transcript.turns(), key=lambda t: t.start))
+    errors, reference_words = word_errors(reference, hypothesis)
+    duration = len(audio) / SAMPLE_RATE
+    return {
+        "fixture": name,
+        "audio_seconds": round(duration, 2),
+        "wall_seconds": round(wall, 2),
+        "rtf": round(wall / duration, 3) if duration else 0.0,
+        "turns": len(backend.outputs),
+        "word_errors": errors,
+        "reference_words": reference_words,
+        "wer": round(errors / reference_words, 4) if reference_words else 0.0,
+        "latency_ms": percentiles(latencies),
+        "decode_ms": percentiles(backend.decode_times),
+        **resources,
+        "hypothesis": hypothesis,
+    }, latencies
+
+def run_suite(fixtures, model_size="base", device="cpu", compute_type="int8", beam_size=5, speed=1.0):
+    """Replay every fixture through one backend (one model load); returns the results document"""
+    backend = make_backend(model_size, device, compute_type, beam_size, speed)
+    backend.session.agent = "none"  # transcription only; no LLM calls in the numbers
+    if not backend.ready.wait(600):
+        raise RuntimeError("Model did not load within 10 minutes")
+
+    results, all_latencies, all_decodes = [], [], []
+    for name, audio_path, reference in fixtures:
+        result, latencies = run_fixture(backend, name, audio_path, reference)
+        results.append(result)
+        all_latencies.extend(latencies)
+        all_decodes.extend(backend.decode_times)
+        logger.info(f"{name}: WER {result['wer']:.3f}, latency p95 {result['latency_ms'].get('p95')}ms")
+
+    errors = sum(r["word_errors"] for r in results)
+    words = sum(r["reference_words"] for r in results)
+    audio_seconds = sum(r["audio_seconds"] for r in results)
+    return {
+        "config": {
+            "model_size": backend.model_size,
+            "compute_type": backend.compute_type,
+            "device": device,
+            "beam_size": backend.beam_size,
+            "transcription_mode": backend.transcription_mode,
+            "vad": backend.vad_mode,
+            "speed": speed,
+        },
+        "host": {
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+        },
+        "startup": backend.startup_timings,
+        "summary": {
+            "fixtures": len(results),
+            "audio_seconds": round(audio_seconds, 1),
+            "wer": round(errors / words, 4) if words else 0.0,
+            "latency_ms": percentiles(all_latencies),
+            "decode_ms": percentiles(all_decodes),
+            "rtf": round(sum(r["wall_seconds"] for r in results) / audio_seconds, 3) if audio_seconds else 0.0,
+            "rss_mb_peak": max((r["rss_mb_peak"] for r in results), default=0.0),
+        },
+        "fixtures": results,
+    }
+
+def check(model_size="base", device="cpu", compute_type="int8", beam_size=5, timeout=300.0):
+    """
+    Replay 20 s of synthetic speech at speed 0 in windowed mode with the energy
+    VAD, where one speech window can need up to 10 s of audio: the replay must
+    be paced by what the VAD waits for, not stall at a chunk's worth. True if
+    the whole fixture went through within ``timeout``.
+    """
+    from audio_sources import synthetic_speech
+
+    os.environ["COGNITION_TRANSCRIPTION_MODE"] = "windowed"
+    os.environ["COGNITION_VAD"] = "energy"
+    backend = make_backend(model_size, device, compute_type, beam_size, speed=0.0)
+    backend.session.agent = "none"
+    if not backend.ready.wait(600):
+        raise RuntimeError("Model did not load within 10 minutes")
+    audio = synthetic_speech(20.0, SAMPLE_RATE)
+    replay = threading.Thread(target=run_fixture, args=(backend, "synthetic", audio, ""), daemon=True)
+    replay.start()
+    replay.join(timeout)
+    finished = not replay.is_alive() and backend.replay.position == len(audio)
+    print(f"windowed speed-0 replay: {'ok' if finished else 'stalled'} "
+          f"({backend.replay.position / SAMPLE_RATE:.1f}s of {len(audio) / SAMPLE_RATE:.0f}s replayed, "
+          f"{len(backend.outputs)} turns)")
+    return finished
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end latency/WER benchmark over speech fixtures")
+    parser.add_argument("fixtures", nargs="*", help="fixture directories or audio files (reference: same name, .txt)")
+    parser.add_argument("-o", "--output", default="-", help="JSON results file (default stdout)")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--device", default="cpu", help="cpu or cuda")
+    parser.add_argument("--compute-type", default="int8", help="CTranslate2 compute type")
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="replay speed: 1 = wall clock, N = N x faster, 0 = as fast as decoding allows")
+    parser.add_argument("--mode", choices=("streaming", "windowed"), default=None, help="transcription mode")
+    parser.add_argument("--vad", choices=("model", "energy", "off"), default=None, help="VAD gating mode")
+    parser.add_argument("--check", action="store_true",
+                        help="replay synthetic speech at speed 0 in windowed mode and exit non-zero if it stalls")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    if args.check:
+        sys.exit(0 if check(args.model, args.device, args.compute_type, args.beam_size) else 1)
+    # The backend reads these when it is constructed
+    if args.mode:
+        os.environ["COGNITION_TRANSCRIPTION_MODE"] = args.mode
+    if args.vad:
+        os.environ["COGNITION_VAD"] = args.vad
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        parser.error("no fixtures found (each audio file needs a reference .txt with the same name)")
+    results = run_suite(fixtures, args.model, args.device, args.compute_type, args.beam_size, args.speed)
+    text = json.dumps(results, indent=2, sort_keys=True)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+        logger.info(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
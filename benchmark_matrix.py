@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Decode parameter matrix for faster-whisper
+Times every combination of the sweep axes (beam size, best_of, threads,
+workers, compute type, chunk duration, VAD) after warm-ups, reports means
+with 95% confidence intervals, and compares against a stored baseline so a
+slowdown beyond the threshold fails the run
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+def default_axes():
+    """The full sweep; any axis can be narrowed on the command line with --set"""
+    cores = os.cpu_count() or 1
+    return {
+        "compute_type": ["int8", "int8_float32", "float32"],
+        "cpu_threads": sorted({max(1, cores // 2), cores}),
+        "num_workers": [1, 2],
+        "beam_size": [1, 5],  # 1 = transcribe_file, 5 = the live chunk path
+        "best_of": [1, 5],  # candidates when decoding falls back to sampling
+        "chunk_duration": [1.0, 3.0],
+        "vad": [True, False],
+    }
+
+# Parameters fixed when the model is loaded; configs that share them share one model
+MODEL_AXES = ("compute_type", "cpu_threads", "num_workers")
+
+# Two-sided 95% Student t critical values by degrees of freedom (1..30)
+T_95 = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+        2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+        2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+
+def confidence_interval(samples):
+    """Half-width of the 95% confidence interval of the mean"""
+    if len(samples) < 2:
+        return 0.0
+    df = len(samples) - 1
+    t = T_95[df - 1] if df <= len(T_95) else 1.96
+    return t * float(np.std(samples, ddof=1)) / len(samples) ** 0.5
+
+def config_key(config):
+    """Stable name of a configuration, used to match it against the baseline"""
+    return " ".join(f"{axis}={config[axis]}" for axis in sorted(config))
+
+def parse_axis(text, axes):
+    """``beam_size=1,5`` -> ("beam_size", [1, 5]), values typed like the defaults"""
+    axis, _, values = text.partition("=")
+    if axis not in axes or not values:
+        raise ValueError(f"Unknown axis or no values: {text} (axes: {', '.join(axes)})")
+    kind = type(axes[axis][0])
+    if kind is bool:
+        return axis, [value.strip().lower() in ("1", "true", "on", "yes") for value in values.split(",")]
+    return axis, [kind(value) for value in values.split(",")]
+
+def expand(axes):
+    """Every combination, ordered so configs sharing a model are adjacent"""
+    names = list(MODEL_AXES) + [axis for axis in axes if axis not in MODEL_AXES]
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[axis] for axis in names))]
+
+def measure(model, audio, config, warmup, iterations):
+    """Time decoding one chunk on each of num_workers threads at once (so workers are exercised)"""
+    chunk = audio[:int(config["chunk_duration"] * SAMPLE_RATE)]
+    options = dict(
+        beam_size=config["beam_size"],
+        best_of=config["best_of"],
+        language="en",
+        condition_on_previous_text=False,
+        vad_filter=config["vad"],
+        vad_parameters=dict(min_silence_duration_ms=500),
+    )
+
+    def decode():
+        segments, info = model.transcribe(chunk, **options)
+        list(segments)
+
+    workers = config["num_workers"]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        def run_round():
+            start = time.perf_counter()
+            for future in [pool.submit(decode) for _ in range(workers)]:
+                future.result()
+            return time.perf_counter() - start
+
+        for _ in range(warmup):
+            run_round()
+        times = [run_round() for _ in range(iterations)]
+
+    times_ms = [t * 1000 for t in times]
+    mean = float(np.mean(times_ms))
+    return {
+        "config": config,
+        "mean_ms": round(mean, 2),
+        "std_ms": round(float(np.std(times_ms, ddof=1)) if len(times_ms) > 1 else 0.0, 2),
+        "ci95_ms": round(confidence_interval(times_ms), 2),
+        "min_ms": round(min(times_ms), 2),
+        # Audio seconds decoded per round = chunk_duration x workers
+        "rtf": round(mean / 1000 / (len(chunk) / SAMPLE_RATE * workers), 4),
+        "samples_ms": [round(t, 2) for t in times_ms],
+    }
+
+def run_matrix(model_size, device, axes, audio, warmup=2, iterations=10):
+    """Results document: {"configs": {key: result}, ...}; each model loads once per group"""
+    from faster_whisper import WhisperModel
+    from autotune import host_fingerprint
+
+    configs = expand(axes)
+    results = {}
+    for load_params, group in itertools.groupby(configs, key=lambda c: tuple(c[a] for a in MODEL_AXES)):
+        group = list(group)
+        compute_type, cpu_threads, num_workers = load_params
+        logger.info(f"Loading {model_size} ({compute_type}, {cpu_threads} threads, {num_workers} workers)")
+        try:
+            model = WhisperModel(model_size, device=device, compute_type=compute_type,
+                                 cpu_threads=cpu_threads, num_workers=num_workers)
+        except Exception as e:
+            logger.error(f"Could not load {model_size} with {compute_type}: {e}")
+            for config in group:
+                results[config_key(config)] = {"config": config, "error": str(e)}
+            continue
+
+        for config in group:
+            key = config_key(config)
+            try:
+                results[key] = measure(model, audio, config, warmup, iterations)
+                logger.info(f"{key}: {results[key]['mean_ms']:.1f} ± {results[key]['ci95_ms']:.1f}ms")
+            except Exception as e:
+                logger.error(f"Failed {key}: {e}")
+                results[key] = {"config": config, "error": str(e)}
+        del model
+
+    return {
+        "model_size": model_size,
+        "device": device,
+        "warmup": warmup,
+        "iterations": iterations,
+        "host": host_fingerprint(device),
+        "configs": results,
+    }
+
+def find_regressions(document, baseline, threshold):
+    """
+    Configs whose time grew by more than ``threshold`` (a fraction) over the
+    baseline mean. The lower end of the current confidence interval has to be
+    past the limit, so run-to-run noise alone does not fail the gate.
+    """
+    regressions = []
+    for key, current in document["configs"].items():
+        base = baseline.get("configs", {}).get(key)
+        if not base or "mean_ms" not in base or "mean_ms" not in current:
+            continue
+        limit = base["mean_ms"] * (1 + threshold)
+        if current["mean_ms"] - current["ci95_ms"] > limit:
+            regressions.append({
+                "config": key,
+                "baseline_ms": base["mean_ms"],
+                "current_ms": current["mean_ms"],
+                "ci95_ms": current["ci95_ms"],
+                "change": round(current["mean_ms"] / base["mean_ms"] - 1, 3),
+            })
+    return regressions
+
+def print_table(document):
+    print("\n📊 Decode Matrix")
+    print("=" * 50)
+    rows = sorted(document["configs"].items(), key=lambda item: item[1].get("mean_ms", float("inf")))
+    for key, result in rows:
+        if "error" in result:
+            print(f"  {'failed':>20}  {key}")
+        else:
+            print(f"  {result['mean_ms']:>9.1f} ± {result['ci95_ms']:<6.1f}ms  RTF {result['rtf']:<6.3f} {key}")
+
+def load_audio(path, duration):
+    """Benchmark audio: a real recording if given, else synthetic multi-speaker speech
+
+    Speech-like audio (not tones) so the VAD and beam axes time real decoding.
+    """
+    if path:
+        from faster_whisper.audio import decode_audio
+        return decode_audio(path, sampling_rate=SAMPLE_RATE)
+    from audio_sources import synthetic_speech
+    return synthetic_speech(duration, SAMPLE_RATE)
+
+def main():
+    axes = default_axes()
+    parser = argparse.ArgumentParser(description="Sweep faster-whisper decode parameters with regression gating")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--device", default="cpu", help="cpu or cuda")
+    parser.add_argument("--audio", help="speech recording to decode (default: synthetic speech)")
+    parser.add_argument("--set", action="append", default=[], metavar="AXIS=V1,V2",
+                        help=f"replace an axis' values (axes: {', '.join(axes)})")
+    parser.add_argument("--warmup", type=int, default=2, help="untimed rounds per config")
+    parser.add_argument("--iterations", type=int, default=10, help="timed rounds per config")
+    parser.add_argument("-o", "--output", help="write the results JSON here")
+    parser.add_argument("--baseline", help="baseline results JSON to compare against")
+    parser.add_argument("--save-baseline", help="write these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown vs baseline (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    for text in args.set:
+        try:
+            axis, values = parse_axis(text, axes)
+        except ValueError as e:
+            parser.error(str(e))
+        axes[axis] = values
+
+    audio = load_audio(args.audio, max(axes["chunk_duration"]))
+    document = run_matrix(args.model, args.device, axes, audio, args.warmup, args.iterations)
+    print_table(document)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(document, f, indent=2, sort_keys=True)
+                f.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get("host") != document["host"]:
+            logger.warning("Baseline was recorded on a different host; timings may not be comparable")
+        regressions = find_regressions(document, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} configuration(s) regressed more than {args.threshold:.0%}")
+            for regression in regressions:
+                print(f"  {regression['config']}: {regression['baseline_ms']:.1f}ms -> "
+                      f"{regression['current_ms']:.1f} ± {regression['ci95_ms']:.1f}ms ({regression['change']:+.0%})")
+            sys.exit(1)
+        print(f"\n✅ No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
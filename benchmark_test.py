@@ -44,13 +44,15 @@ def create_test_audio(duration=10, sample_rate=16000):
     
     return temp_filename
 
-def benchmark_model(model_size, device="cpu", compute_type="int8", audio_file=None):
-    """Benchmark a specific model configuration"""
-    logger.info(f"Benchmarking {model_size} model on {device} with {compute_type}")
+def benchmark_model(model_size, device="cpu", compute_type="int8", audio_file=None,
+                    beam_size=5, vad_filter=True, iterations=3, model=None):
+    """Benchmark a specific model configuration (pass an already loaded model to skip loading)"""
+    logger.info(f"Benchmarking {model_size} model on {device} with {compute_type} (beam {beam_size})")
     
     # Load model
     start_time = time.time()
-    model = WhisperModel(model_size, device=device, compute_type=compute_type)
+    if model is None:
+        model = WhisperModel(model_size, device=device, compute_type=compute_type)
     load_time = time.time() - start_time
     
     # Create test audio if not provided
@@ -62,15 +64,15 @@ def benchmark_model(model_size, device="cpu", compute_type="int8", audio_file=No
     
     # Test transcription
     transcription_times = []
-    for i in range(3):  # Run 3 times for average
+    for i in range(iterations):  # Run several times for average
         start_time = time.time()
         
         segments, info = model.transcribe(
             audio_file,
-            beam_size=5,
+            beam_size=beam_size,
             language="en",
             condition_on_previous_text=False,
-            vad_filter=True
+            vad_filter=vad_filter
         )
         
         # Force transcription to complete
@@ -101,6 +103,7 @@ def benchmark_model(model_size, device="cpu", compute_type="int8", audio_file=No
         'model_size': model_size,
         'device': device,
         'compute_type': compute_type,
+        'beam_size': beam_size,
         'load_time': load_time,
         'avg_transcription_time': avg_transcription_time,
         'std_transcription_time': std_transcription_time,
@@ -109,6 +112,196 @@ def benchmark_model(model_size, device="cpu", compute_type="int8", audio_file=No
         'transcription_times': transcription_times
     }
 
+def benchmark_chunk_input(model_size="base", device="cpu", compute_type="int8", chunk_duration=3.0, iterations=10):
+    """Compare the temp-WAV and in-memory paths for a single live chunk"""
+    logger.info(f"Benchmarking chunk input paths with {model_size} model ({chunk_duration}s chunks)")
+    
+    model = WhisperModel(model_size, device=device, compute_type=compute_type)
+    
+    # Build one chunk as process_audio would hand it over: float32, shape (samples, 1)
+    sample_rate = 16000
+    test_file = create_test_audio(duration=chunk_duration, sample_rate=sample_rate)
+    with wave.open(test_file, 'rb') as wav_file:
+        frames = wav_file.readframes(wav_file.getnframes())
+    os.unlink(test_file)
+    audio_data = (np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32767).reshape(-1, 1)
+    
+    decode_options = dict(
+        beam_size=5,
+        language="en",
+        condition_on_previous_text=False,
+        vad_filter=True,
+        vad_parameters=dict(min_silence_duration_ms=500)
+    )
+    
+    def wav_path():
+        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
+            temp_filename = temp_file.name
+        with wave.open(temp_filename, 'wb') as wav_file:
+            wav_file.setnchannels(1)
+            wav_file.setsampwidth(2)
+            wav_file.setframerate(sample_rate)
+            wav_file.writeframes((audio_data * 32767).astype(np.int16).tobytes())
+        segments, info = model.transcribe(temp_filename, **decode_options)
+        list(segments)
+        os.unlink(temp_filename)
+    
+    def memory_path():
+        segments, info = model.transcribe(audio_data.reshape(-1), **decode_options)
+        list(segments)
+    
+    # Warm up both paths so the first-call overhead is not attributed to either
+    wav_path()
+    memory_path()
+    
+    wav_times = []
+    memory_times = []
+    for i in range(iterations):
+        start_time = time.perf_counter()
+        wav_path()
+        wav_times.append(time.perf_counter() - start_time)
+        
+        start_time = time.perf_counter()
+        memory_path()
+        memory_times.append(time.perf_counter() - start_time)
+    
+    result = {
+        'model_size': model_size,
+        'chunk_duration': chunk_duration,
+        'iterations': iterations,
+        'wav_avg_ms': np.mean(wav_times) * 1000,
+        'memory_avg_ms': np.mean(memory_times) * 1000,
+    }
+    result['saved_ms'] = result['wav_avg_ms'] - result['memory_avg_ms']
+    
+    print("\n⚡ Chunk Input Path")
+    print("=" * 40)
+    print(f"  Temp WAV file: {result['wav_avg_ms']:.1f}ms per chunk")
+    print(f"  In-memory:     {result['memory_avg_ms']:.1f}ms per chunk")
+    print(f"  Saved:         {result['saved_ms']:.1f}ms per chunk")
+    
+    return result
+
+def benchmark_ipc(messages=20000, audio_chunks=200, chunk_duration=3.0):
+    """Throughput of the text line protocol vs length-prefixed frames over a socket pair"""
+    import socket
+    import threading
+    from framing import FrameDecoder, decode_pcm, encode_frame, message_header
+    
+    logger.info(f"Benchmarking IPC: {messages} text messages, {audio_chunks} x {chunk_duration}s audio chunks")
+    text = "So the main thing we need from your side is the updated pricing sheet by Friday."
+    
+    def run(send, receive, count):
+        """Time ``count`` messages from a sender thread to a receiving reader"""
+        left, right = socket.socketpair()
+        
+        def sender_main():
+            try:
+                send(left, count)
+            finally:
+                left.shutdown(socket.SHUT_WR)
+        
+        sender = threading.Thread(target=sender_main)
+        start_time = time.perf_counter()
+        sender.start()
+        received, nbytes = receive(right)
+        sender.join()
+        elapsed = time.perf_counter() - start_time
+        left.close()
+        right.close()
+        assert received == count, f"received {received} of {count}"
+        return {'per_second': count / elapsed, 'mb_per_second': nbytes / elapsed / 1e6}
+    
+    def receive_lines(conn):
+        received = nbytes = 0
+        with conn.makefile('rb') as reader:
+            for line in reader:
+                tag, _, payload = line.decode('utf-8').rstrip('\n').partition(':')
+                received += 1
+                nbytes += len(line)
+        return received, nbytes
+    
+    def receive_frames(conn, on_frame=None):
+        decoder = FrameDecoder()
+        received = nbytes = 0
+        while True:
+            data = conn.recv(1 << 16)
+            if not data:
+                return received, nbytes
+            nbytes += len(data)
+            for header, payload in decoder.feed(data):
+                if on_frame:
+                    on_frame(header, payload)
+                received += 1
+    
+    # Text: transcription-sized messages
+    def send_lines(conn, count):
+        for _ in range(count):
+            conn.sendall(f"TRANSCRIPTION_SYS:{text}\n".encode('utf-8'))
+    
+    def send_text_frames(conn, count):
+        for i in range(count):
+            conn.sendall(encode_frame(message_header("TRANSCRIPTION_SYS", i, text)))
+    
+    # Audio: what the recorder produces (48 kHz stereo int16)
+    sample_rate, channels = 48000, 2
+    pcm = (np.random.randn(int(sample_rate * chunk_duration) * channels) * 3000).astype(np.int16).tobytes()
+    temp_dir = tempfile.mkdtemp()
+    
+    def send_wav_paths(conn, count):
+        # Old path: a 16 kHz mono WAV on disk per chunk, the path sent as a line
+        for i in range(count):
+            path = os.path.join(temp_dir, f"chunk-{i}.wav")
+            audio = decode_pcm(pcm, {"encoding": "s16le", "channels": channels, "sample_rate": sample_rate})
+            with wave.open(path, 'wb') as wav_file:
+                wav_file.setnchannels(1)
+                wav_file.setsampwidth(2)
+                wav_file.setframerate(16000)
+                wav_file.writeframes((audio * 32767).astype(np.int16).tobytes())
+            conn.sendall(f"TRANSCRIBE_SYS:{path}\n".encode('utf-8'))
+    
+    def receive_wav_paths(conn):
+        received = nbytes = 0
+        with conn.makefile('rb') as reader:
+            for line in reader:
+                path = line.decode('utf-8').strip().split(':', 1)[1]
+                with wave.open(path, 'rb') as wav_file:
+                    frames = wav_file.readframes(wav_file.getnframes())
+                np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+                os.unlink(path)
+                received += 1
+                nbytes += len(frames)
+        return received, nbytes
+    
+    def send_audio_frames(conn, count):
+        for i in range(count):
+            header = message_header("AUDIO", i, source="SYS", sample_rate=sample_rate,
+                                    channels=channels, encoding="s16le")
+            conn.sendall(encode_frame(header, pcm))
+    
+    def receive_audio_frames(conn):
+        return receive_frames(conn, lambda header, payload: decode_pcm(payload, header))
+    
+    try:
+        result = {
+            'text_lines': run(send_lines, receive_lines, messages),
+            'text_frames': run(send_text_frames, receive_frames, messages),
+            'audio_wav_files': run(send_wav_paths, receive_wav_paths, audio_chunks),
+            'audio_frames': run(send_audio_frames, receive_audio_frames, audio_chunks),
+        }
+    finally:
+        os.rmdir(temp_dir)
+    
+    print("\n🔌 IPC Throughput")
+    print("=" * 40)
+    print(f"  Text, line protocol:   {result['text_lines']['per_second']:,.0f} msg/s")
+    print(f"  Text, framed:          {result['text_frames']['per_second']:,.0f} msg/s")
+    print(f"  Audio, WAV file paths: {result['audio_wav_files']['per_second']:,.1f} chunks/s")
+    print(f"  Audio, framed PCM:     {result['audio_frames']['per_second']:,.1f} chunks/s "
+          f"({result['audio_frames']['mb_per_second']:.1f} MB/s)")
+    
+    return result
+
 def run_benchmarks():
     """Run comprehensive benchmarks"""
     print("🚀 Faster Whisper Benchmark Suite")
@@ -210,10 +403,13 @@ def test_with_real_audio():
         print(f"  Audio duration: {result['audio_duration']:.2f}s")
         print(f"  Transcription time: {result['avg_transcription_time']:.2f}s")
         print(f"  Real-time factor: {result['rtf']:.2f}")
-        print(f"  Speed: {'Real-time' if result['rtf'] < 1 else f'{result['rtf']:.1f}x slower'}")
+        speed_desc = "Real-time" if result['rtf'] < 1 else f"{result['rtf']:.1f}x slower"
+        print(f"  Speed: {speed_desc}")
     else:
         print("No test audio files found. Run with synthetic audio only.")
 
 if __name__ == "__main__":
     run_benchmarks()
+    benchmark_chunk_input()
+    benchmark_ipc()
     test_with_real_audio() 
\ No newline at end of file
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Long-lived backend daemon
+Serves one ElectronBackend (and its loaded model) over a Unix domain socket so
+Electron windows can come and go without reloading Whisper
+"""
+
+import os
+import socket
+import tempfile
+import threading
+import time
+import itertools
+import logging
+from collections import deque
+from framing import FRAMED_HANDSHAKE, FrameError, command_line, encode_frame, message_header, read_frame
+
+logger = logging.getLogger(__name__)
+
+# A client with this much output still unsent is disconnected rather than waited for
+MAX_PENDING_BYTES = 8 * 2**20
+
+def default_socket_path():
+    """Per-user socket in the temp dir; main.js derives the same path"""
+    return os.environ.get("COGNITION_SOCKET") or os.path.join(
+        tempfile.gettempdir(), f"cognition-{os.getuid()}.sock"
+    )
+
+class BackendClient:
+    """
+    One connected Electron window; emit() fans protocol messages out to all of them.
+    send() only queues: a writer thread per client does the socket writes, so
+    a slow or stalled window never holds up emit() (and with it the decode and
+    audio threads). A client that falls MAX_PENDING_BYTES behind is dropped.
+    """
+
+    def __init__(self, conn, client_id):
+        self.conn = conn
+        self.client_id = client_id
+        self.framed = False  # switched on by the PROTOCOL:framed handshake
+        self.message_ids = itertools.count(1)
+        self.pending = deque()
+        self.pending_bytes = 0
+        self.condition = threading.Condition()
+        self.closed = False
+        self.writer = threading.Thread(target=self.write_loop, name=f"client-{client_id}-writer")
+        self.writer.daemon = True
+        self.writer.start()
+
+    def send(self, tag, payload=None, **meta):
+        """Text clients get ``TAG:payload`` lines; framed clients also get ids, timestamps and ``meta``"""
+        if self.framed:
+            data = encode_frame(message_header(tag, next(self.message_ids), payload, **meta))
+        else:
+            # Messages of a non-default session are prefixed with its ID, as on stdout
+            prefix = f"@{meta['session']} " if meta.get("session") else ""
+            data = (prefix + (tag if payload is None else f"{tag}:{payload}") + "\n").encode("utf-8")
+        with self.condition:
+            if self.closed:
+                raise OSError(f"Client {self.client_id} is closed")
+            if self.pending_bytes + len(data) > MAX_PENDING_BYTES:
+                self.closed = True
+                self.pending.clear()
+                self.condition.notify()
+                behind = self.pending_bytes
+            else:
+                self.pending.append(data)
+                self.pending_bytes += len(data)
+                self.condition.notify()
+                return
+        # Wakes the reader thread, which removes and closes the client
+        self.shutdown()
+        raise OSError(f"Client {self.client_id} fell behind ({behind} bytes unsent), disconnecting")
+
+    def write_loop(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                data = self.pending.popleft()
+                self.pending_bytes -= len(data)
+            try:
+                self.conn.sendall(data)
+            except OSError as e:
+                logger.warning(f"Client {self.client_id} write failed: {e}")
+                with self.condition:
+                    self.closed = True
+                    self.pending.clear()
+                self.shutdown()
+                return
+
+    def shutdown(self):
+        try:
+            self.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def close(self, timeout=1.0):
+        """Send what is still queued (for up to ``timeout`` s), then close the socket"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        if self.writer is not threading.current_thread():
+            self.writer.join(timeout)
+        self.shutdown()
+        self.conn.close()
+
+class BackendDaemon:
+    """
+    Accept loop for the Unix socket.
+    Clients speak the stdin/stdout line protocol, or send PROTOCOL:framed as
+    their first line and switch to length-prefixed frames (framing.py), which
+    can also carry raw PCM. Commands from any client drive the shared backend
+    (an ``@<session> `` prefix or a ``session`` header field picks the meeting);
+    QUIT only disconnects the sender, SHUTDOWN stops the daemon.
+    """
+
+    def __init__(self, backend, path=None):
+        self.backend = backend
+        self.path = path or default_socket_path()
+        self.server = None
+        self.running = False
+        self.next_client_id = 1
+
+    def bind(self):
+        if os.path.exists(self.path):
+            # A live daemon answers; a leftover socket file from a crash does not
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.path)
+                probe.close()
+                raise RuntimeError(f"Another backend is already listening on {self.path}")
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(self.path)
+            finally:
+                probe.close()
+
+        self.server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.server.bind(self.path)
+        os.chmod(self.path, 0o600)  # only this user's apps may drive the mic
+        self.server.listen()
+        self.running = True
+        logger.info(f"Backend daemon listening on {self.path}")
+
+    def serve_forever(self):
+        if self.server is None:
+            self.bind()
+        try:
+            while self.running:
+                try:
+                    conn, _ = self.server.accept()
+                except OSError:
+                    break
+                if not self.running:
+                    conn.close()
+                    break
+                client = BackendClient(conn, self.next_client_id)
+                self.next_client_id += 1
+                thread = threading.Thread(target=self.handle_client, args=(client,),
+                                          name=f"client-{client.client_id}")
+                thread.daemon = True
+                thread.start()
+        finally:
+            self.close()
+
+    def handle_client(self, client):
+        logger.info(f"Client {client.client_id} connected")
+        try:
+            with client.conn.makefile("rb") as reader:
+                # The first line decides the protocol, so nothing is sent before it
+                first = reader.readline().decode("utf-8").strip()
+                client.framed = first == FRAMED_HANDSHAKE
+                self.backend.add_client(client)
+                if client.framed:
+                    self.read_frames(reader)
+                else:
+                    self.read_lines(reader, first)
+        except (OSError, FrameError, ValueError) as e:
+            logger.warning(f"Client {client.client_id} connection error: {e}")
+        finally:
+            self.backend.remove_client(client)
+            client.close()
+            logger.info(f"Client {client.client_id} disconnected")
+
+    def read_lines(self, reader, first):
+        command = first
+        while True:
+            if command and not self.handle_command(command):
+                return
+            line = reader.readline()
+            if not line:
+                return
+            command = line.decode("utf-8").strip()
+
+    def read_frames(self, reader):
+        while True:
+            frame = read_frame(reader)
+            if frame is None:
+                return
+            header, payload = frame
+            # Same-host clock, so send-to-receive time is the transport latency
+            latency = time.time() - header["ts"] if "ts" in header else None
+            self.backend.ipc_stats.record(header.get("type"), len(payload), latency)
+            if header.get("type") == "AUDIO":
+                self.backend.receive_audio(header, payload)
+            elif not self.handle_command(command_line(header)):
+                return
+
+    def handle_command(self, command):
+        """Returns False when the client's connection should end"""
+        if command == "QUIT":
+            return False
+        if command == "SHUTDOWN":
+            self.shutdown()
+            return False
+        self.backend.dispatch_command(command)
+        return True
+
+    def shutdown(self):
+        if not self.running:
+            return
+        self.running = False
+        # Wake the blocking accept() (closing the socket alone does not on every platform)
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as wake:
+                wake.connect(self.path)
+        except OSError:
+            pass
+
+    def close(self):
+        self.running = False
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
@@ -5,19 +5,50 @@ Handles real-time transcription using faster-whisper
 Communicates with Electron via stdin/stdout
 """
 
-import sys
 import time
+PROCESS_START = time.perf_counter()
+
+import sys
+import atexit
+import signal
+import asyncio
+import argparse
+import importlib
 import threading
+import itertools
 import queue
-import tempfile
 import wave
 import json
 import numpy as np
-import sounddevice as sd
-from faster_whisper import WhisperModel
 import logging
 import os
-import openai
+import tempfile
+from audio_buffer import AudioRingBuffer
+from inference import InferenceScheduler
+from backpressure import BackpressureController
+from autotune import AutoTuner, LiveRTFMonitor
+from vad import VoiceActivityGate
+from framing import ProtocolStats, decode_pcm, split_session
+from agent_executor import AgentExecutor, SuggestionStream
+from sales_context import TokenCounter
+from prompts import PromptRegistry
+from session import DEFAULT_SESSION, Session
+from metrics import Metrics, MetricsServer, RTF_BUCKETS, TOKEN_BUCKETS
+from profiler import SamplingProfiler
+from audio_sources import BlockSource, source_factory, sounddevice_source
+
+# openai, sounddevice and faster_whisper are imported on first use (timed_import)
+# so the command loop is up before the heavy dependencies load
+import_times = {"backend_modules": round(time.perf_counter() - PROCESS_START, 3)}
+
+def timed_import(name):
+    """Import a module on first use and record how long it took"""
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    import_times[name] = round(time.perf_counter() - start, 3)
+    return module
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -27,87 +58,428 @@ logger = logging.getLogger(__name__)
 # OPENAI_KEY = "sk-proj-..."
 # client = openai.OpenAI(api_key=OPENAI_KEY)
 
-client = None  # Will be set when user provides key via settings
+# The AsyncOpenAI client lives in AgentExecutor and is set when the user provides a key via settings
+
+SENTENCE_ENDINGS = ('.', '?', '!')
+
+def default_profile_path():
+    return os.path.join(tempfile.gettempdir(), f"cognition-profile-{time.strftime('%Y%m%d-%H%M%S')}.json")
+
+def normalize_word(word):
+    """Lowercase a word and strip punctuation so decodes can be compared"""
+    return word.strip().strip('.,?!:;"\'').lower()
+
+class HypothesisBuffer:
+    """
+    LocalAgreement-2 bookkeeping for streaming transcription.
+    A word is confirmed once two consecutive decodes of the growing audio
+    buffer agree on it; everything after the agreed prefix stays tentative.
+    Words are (start, end, text) tuples in absolute session seconds.
+    """
 
-class ElectronBackend:
     def __init__(self):
-        """Initialize the backend"""
-        self.model_size = "base"
-        self.device = "cpu"
-        self.compute_type = "int8"
+        self.committed_in_buffer = []  # confirmed words whose audio is still buffered
+        self.previous = []  # tentative words from the previous decode
+        self.current = []  # words from the latest decode, not yet compared
+        self.last_committed_time = 0.0
+
+    def insert(self, words, offset):
+        """Add the words from a new decode of audio starting at ``offset`` seconds"""
+        words = [(start + offset, end + offset, text) for start, end, text in words]
+        self.current = [w for w in words if w[0] > self.last_committed_time - 0.1]
+
+        # The decode restarts at the buffer start, so it usually repeats the last
+        # few confirmed words; drop the longest such n-gram (up to 5 words)
+        if self.current and self.committed_in_buffer and abs(self.current[0][0] - self.last_committed_time) < 1:
+            max_n = min(len(self.committed_in_buffer), len(self.current), 5)
+            for n in range(max_n, 0, -1):
+                tail = [normalize_word(w[2]) for w in self.committed_in_buffer[-n:]]
+                head = [normalize_word(w[2]) for w in self.current[:n]]
+                if tail == head:
+                    self.current = self.current[n:]
+                    break
+
+    def flush(self):
+        """Confirm the prefix shared by the last two decodes and return it"""
+        confirmed = []
+        while self.current and self.previous:
+            if normalize_word(self.current[0][2]) != normalize_word(self.previous[0][2]):
+                break
+            word = self.current.pop(0)
+            self.previous.pop(0)
+            confirmed.append(word)
+            self.last_committed_time = word[1]
+        self.previous = self.current
+        self.current = []
+        self.committed_in_buffer.extend(confirmed)
+        return confirmed
+
+    def drop_before(self, cut_time):
+        """Forget confirmed words whose audio has been trimmed away"""
+        while self.committed_in_buffer and self.committed_in_buffer[0][1] <= cut_time:
+            self.committed_in_buffer.pop(0)
+
+    def tentative(self):
+        return self.previous
+
+    def reset(self):
+        self.committed_in_buffer = []
+        self.previous = []
+        self.current = []
+        self.last_committed_time = 0.0
+
+class StreamingTranscriber:
+    """
+    Incremental transcription over a growing audio buffer.
+    Each call to process_iter re-decodes everything buffered since the last
+    trim, confirms words via LocalAgreement and trims the buffer at the end of
+    a confirmed sentence once it grows past trim_seconds.
+    """
+
+    def __init__(self, model, sample_rate=16000, min_chunk=1.0, trim_seconds=15.0, max_buffer_seconds=30.0, beam_size=5):
+        self.model = model
+        self.sample_rate = sample_rate
+        self.min_chunk_size = int(sample_rate * min_chunk)
+        self.trim_seconds = trim_seconds
+        self.beam_size = beam_size
+
+        # Whisper only looks at 30 s of audio at a time, so that bounds the buffer
+        self.audio = np.zeros(int(sample_rate * max_buffer_seconds), dtype=np.float32)
+        self.audio_length = 0
+        self.buffer_offset = 0.0  # session time of self.audio[0], in seconds
+
+        self.hypothesis = HypothesisBuffer()
+        self.committed = []  # confirmed words, trimmed to what the prompt needs
+        self.last_words = []  # words behind the text the last process_iter/skip/finish returned
+
+    def reset(self):
+        self.audio_length = 0
+        self.buffer_offset = 0.0
+        self.hypothesis.reset()
+        self.committed = []
+
+    def buffer_duration(self):
+        return self.audio_length / self.sample_rate
+
+    def insert_audio(self, samples):
+        """Append captured samples, forcing a trim if the buffer would overflow"""
+        n = len(samples)
+        if self.audio_length + n > len(self.audio):
+            overflow = self.audio_length + n - len(self.audio)
+            self.trim_to(self.buffer_offset + max(overflow, self.min_chunk_size) / self.sample_rate)
+        self.audio[self.audio_length:self.audio_length + n] = samples
+        self.audio_length += n
+
+    def trim_to(self, cut_time):
+        """Discard buffered audio before ``cut_time`` (session seconds)"""
+        cut = int(round((cut_time - self.buffer_offset) * self.sample_rate))
+        cut = max(0, min(cut, self.audio_length))
+        if cut == 0:
+            return
+        remaining = self.audio_length - cut
+        self.audio[:remaining] = self.audio[cut:self.audio_length]
+        self.audio_length = remaining
+        self.buffer_offset += cut / self.sample_rate
+        self.hypothesis.drop_before(self.buffer_offset)
+
+    def prompt(self):
+        """Confirmed text that has scrolled out of the buffer, as decoding context"""
+        words = [w[2] for w in self.committed if w[1] <= self.buffer_offset]
+        return "".join(words)[-200:].strip()
+
+    def process_iter(self):
+        """Decode the buffer; returns (confirmed_text, tentative_text)"""
+        if self.audio_length == 0:
+            self.last_words = []
+            return "", ""
+
+        segments, info = self.model.transcribe(
+            self.audio[:self.audio_length],
+            beam_size=self.beam_size,
+            language="en",
+            condition_on_previous_text=False,
+            initial_prompt=self.prompt() or None,
+            word_timestamps=True,
+            vad_filter=True,
+            vad_parameters=dict(min_silence_duration_ms=500)
+        )
+        words = []
+        for segment in segments:
+            for word in segment.words or []:
+                words.append((word.start, word.end, word.word))
+
+        self.hypothesis.insert(words, self.buffer_offset)
+        confirmed = self.hypothesis.flush()
+        self.last_words = confirmed
+        self.committed.extend(confirmed)
+        self.committed = self.committed[-100:]
+
+        if self.buffer_duration() > self.trim_seconds:
+            self.trim_at_sentence()
+
+        return self.join_words(confirmed), self.join_words(self.hypothesis.tentative())
+
+    def trim_at_sentence(self):
+        """Cut the buffer after the last confirmed word that ends a sentence"""
+        for start, end, text in reversed(self.hypothesis.committed_in_buffer):
+            if text.strip().endswith(SENTENCE_ENDINGS):
+                self.trim_to(end)
+                return
+        # No sentence boundary yet; once the buffer is nearly full fall back to
+        # cutting after the last confirmed word so it can never stall
+        if self.buffer_duration() > len(self.audio) / self.sample_rate - 5 and self.hypothesis.committed_in_buffer:
+            self.trim_to(self.hypothesis.committed_in_buffer[-1][1])
+        elif not self.hypothesis.committed_in_buffer and not self.hypothesis.tentative():
+            # Nothing but silence buffered; keep only the last second
+            self.trim_to(self.buffer_offset + self.buffer_duration() - 1.0)
+
+    def skip(self, seconds):
+        """Drop the buffer plus ``seconds`` of unread audio and resume live; returns the tentative text"""
+        words = self.hypothesis.tentative()
+        text = self.join_words(words)
+        resume_at = self.buffer_offset + self.buffer_duration() + seconds
+        self.reset()
+        self.buffer_offset = resume_at
+        self.hypothesis.last_committed_time = resume_at
+        self.last_words = words
+        return text
+
+    def finish(self):
+        """Confirm whatever is still tentative (end of stream) and reset"""
+        words = self.hypothesis.tentative()
+        text = self.join_words(words)
+        self.reset()
+        self.last_words = words
+        return text
+
+    @staticmethod
+    def join_words(words):
+        return "".join(w[2] for w in words).strip()
+
+class ElectronBackend:
+    def __init__(self, model_size="base", device="cpu", compute_type="int8", beam_size=5, autotune=False, stdio=True,
+                 metrics_port=None, profile=None, audio_source=None):
+        """Initialize the backend (stdio=False when served by BackendDaemon instead of stdin/stdout)
+        
+        ``audio_source`` is a factory for the mic stream (see audio_sources);
+        COGNITION_AUDIO_SOURCE gives one as a spec, sounddevice by default.
+        """
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.beam_size = beam_size
+        
+        # Let a (cached) calibration pick the model and beam this host can keep up with;
+        # it runs on the loader thread, before the model is loaded
+        self.autotune = autotune
+        self.calibration = None
+        self.rtf_monitor = LiveRTFMonitor()
+        self.rtf_sample_interval = 2.0
         
         # Audio settings
         self.sample_rate = 16000
         self.chunk_duration = 3.0
         self.chunk_size = int(self.sample_rate * self.chunk_duration)
         
+        # Set COGNITION_DEBUG_AUDIO_DIR to keep a WAV copy of every transcribed chunk
+        self.debug_audio_dir = os.environ.get("COGNITION_DEBUG_AUDIO_DIR")
+        self.debug_chunk_index = 0
+        
+        # Capture buffer: the audio callback writes straight into it and
+        # process_audio reads overlapping windows back out as views
+        self.block_size = int(self.sample_rate * 0.5)
+        self.audio_buffer = AudioRingBuffer(self.sample_rate * 60)
+        if audio_source is None:
+            try:
+                audio_source = source_factory(os.environ.get("COGNITION_AUDIO_SOURCE", "sounddevice"))
+            except ValueError as e:
+                logger.error(f"{e}; using the microphone")
+                audio_source = sounddevice_source
+        self.audio_source = audio_source
+        
+        # "streaming" confirms words incrementally (LocalAgreement); "windowed"
+        # is the original fixed 3 s windows with 50% overlap
+        self.transcription_mode = os.environ.get("COGNITION_TRANSCRIPTION_MODE", "streaming")
+        self.stream_step = 1.0  # seconds of new audio between streaming decodes
+        self.max_merge_duration = 30.0  # longest window the "merge" policy will decode
+        
+        # What to do when decoding falls behind real time: drop_oldest, merge or degrade
+        self.overload_policy = os.environ.get("COGNITION_OVERLOAD_POLICY", "merge")
+        
+        # Silence is gated out before it reaches the decoder: "model" (energy, then
+        # Silero), "energy" or "off"
+        self.vad_mode = os.environ.get("COGNITION_VAD", "model")
+        self.max_speech_window = 10.0  # force a cut if nobody pauses for this long
+        
+        # Serialises protocol lines written from different threads
+        self.output_lock = threading.Lock()
+        self.stdio = stdio
+        self.clients = []  # daemon connections; emit() writes to each of them
+        self.startup_status = None  # last LOADING/READY message, replayed to late clients
+        self.ipc_stats = ProtocolStats()  # frames received from framed daemon clients
+        
+        # Stage latencies, queue depths and drops; sent as METRICS lines every
+        # metrics_interval seconds while listening, and served as Prometheus
+        # text when a metrics port is set
+        self.metrics = Metrics()
+        self.metrics.define("decode_rtf", RTF_BUCKETS)
+        self.metrics.define("batch_size", (1, 2, 3, 4, 6, 8, 16))
+        self.metrics.define("llm_prompt_tokens", TOKEN_BUCKETS)
+        self.metrics_interval = float(os.environ.get("COGNITION_METRICS_INTERVAL", "10"))
+        metrics_port = metrics_port or os.environ.get("COGNITION_METRICS_PORT")
+        self.metrics_server = None
+        if metrics_port:
+            try:
+                self.metrics_server = MetricsServer(self.metrics, int(metrics_port))
+                self.metrics_server.start()
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not serve metrics on port {metrics_port}: {e}")
+        
+        # Sampled stacks of every thread plus stage spans, written as a Chrome
+        # trace; on from startup with --profile, or between PROFILE_START/STOP
+        self.profiler = SamplingProfiler()
+        if profile:
+            self.profiler.start(profile)
+        
         # Queues
-        self.audio_queue = queue.Queue()
         self.command_queue = queue.Queue()
         
         # Control flags
         self.is_listening = False
         self.is_processing = False
         
-        # Initialize Whisper model
-        logger.info(f"Loading {self.model_size} model on {self.device}")
-        self.model = WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type)
-        logger.info("Model loaded successfully!")
-        
-        # Start command listener
-        self.command_thread = threading.Thread(target=self.listen_for_commands)
-        self.command_thread.daemon = True
-        self.command_thread.start()
-        
-        self.agent = "general"  # default
-        self.transcription_buffer = []
-        self.last_agent_output = ""
-        self.agent_output_lock = threading.Lock()
-        self.agent_output_thread = threading.Thread(target=self.agent_output_loop)
+        # The model loads in the background (load_model); decodes queue in the
+        # scheduler until it is ready
+        self.model = None
+        self.ready = threading.Event()
+        self.startup_lock = threading.Lock()
+        self.deferred_commands = []  # file transcriptions and audio frames received while loading
+        self.startup_timings = {}
+        
+        # All decodes, mic and system audio, go through one scheduler
+        self.inference = InferenceScheduler(None)
+        self.inference.listeners.append(self.record_decode)
+        self.streamer = StreamingTranscriber(self.inference, sample_rate=self.sample_rate, min_chunk=self.stream_step, beam_size=self.beam_size)
+        self.backpressure = BackpressureController(
+            self.emit, policy=self.overload_policy, beam_size=self.beam_size, model_size=self.model_size
+        )
+        self.model_swap_thread = None
+        
+        # The mic has its own gate; each session's system audio has one too, so
+        # every stream keeps its own noise floor and stats
+        self.mic_vad = VoiceActivityGate(self.sample_rate, mode=self.vad_mode)
+        
+        self.agent_output_thread = threading.Thread(target=self.agent_output_loop, name="agent-output")
         self.agent_output_thread.daemon = True
         self.agent_output_thread.start()
+        # OpenAI calls run on the executor's event loop, never on the transcription path
+        self.agents = AgentExecutor(metrics=self.metrics)
+        self.counter = TokenCounter()
+        # Prompt files are loaded once and reloaded when edited
+        self.prompts = PromptRegistry(counter=self.counter)
+        
+        # Meetings by session ID, all sharing the model, scheduler and agent executor.
+        # The default session is the Electron window's meeting and owns the mic;
+        # commands prefixed "@<id> " drive the others (see split_session)
+        self.sessions_lock = threading.Lock()
+        self.sessions = {}
+        self.session = self.get_session(DEFAULT_SESSION)
+        self.register_gauges()
+        self.metrics_thread = threading.Thread(target=self.metrics_loop, name="metrics")
+        self.metrics_thread.daemon = True
+        self.metrics_thread.start()
         
-        self.sales_summary = []  # running summary bullets
-        self.sales_metadata = {}  # optional metadata
-        self.sales_last_utterances = []  # buffer for last 10 seconds
-        self.sales_suggestion_interval = 10  # seconds
-        self.sales_last_suggestion_time = 0
+        # Accept commands right away, then load the model behind them
+        if self.stdio:
+            self.command_thread = threading.Thread(target=self.listen_for_commands, name="commands")
+            self.command_thread.daemon = True
+            self.command_thread.start()
         
-        # AI Summary tracking
-        self.ai_summary = ""  # current AI-generated summary
-        self.summary_update_interval = 30  # seconds
-        self.summary_last_update_time = 0
-        self.last_summary_transcription_count = 0  # Track how many transcriptions were in last summary
+        self.loader_thread = threading.Thread(target=self.load_model, name="model-loader")
+        self.loader_thread.daemon = True
+        self.loader_thread.start()
+    
+    def load_model(self):
+        """Background startup: calibrate, load and warm up the model, then report READY"""
+        try:
+            self.emit("LOADING", json.dumps({"stage": "imports"}))
+            WhisperModel = timed_import("faster_whisper").WhisperModel
+            
+            if self.autotune:
+                self.emit("LOADING", json.dumps({"stage": "calibrating"}))
+                start = time.perf_counter()
+                try:
+                    self.calibration = AutoTuner(device=self.device).calibrate()
+                    self.model_size = self.calibration["model_size"]
+                    self.compute_type = self.calibration["compute_type"]
+                    self.beam_size = self.calibration["beam_size"]
+                    self.streamer.beam_size = self.beam_size
+                    self.backpressure.set_base_config(self.beam_size, self.model_size)
+                    self.emit("AUTOTUNE", json.dumps({
+                        "model_size": self.model_size,
+                        "compute_type": self.compute_type,
+                        "beam_size": self.beam_size,
+                        "rtf": self.calibration["rtf"],
+                    }))
+                except Exception as e:
+                    logger.error(f"Calibration failed, using {self.model_size}/{self.compute_type}: {e}")
+                self.startup_timings["calibration"] = round(time.perf_counter() - start, 3)
+            
+            self.emit("LOADING", json.dumps({"stage": "model", "model_size": self.model_size}))
+            logger.info(f"Loading {self.model_size} model on {self.device}")
+            start = time.perf_counter()
+            model = WhisperModel(self.model_size, device=self.device, compute_type=self.compute_type)
+            self.startup_timings["model_load"] = round(time.perf_counter() - start, 3)
+            
+            self.emit("LOADING", json.dumps({"stage": "warmup"}))
+            start = time.perf_counter()
+            self.warm_up(model)
+            self.startup_timings["warmup"] = round(time.perf_counter() - start, 3)
+            
+            start = time.perf_counter()
+            self.mic_vad.load_model()
+            for session in self.list_sessions():
+                session.sys_vad.load_model()
+            self.startup_timings["vad_load"] = round(time.perf_counter() - start, 3)
+            
+            self.model = model
+            self.inference.set_model(model)
+            logger.info("Model loaded successfully!")
+        except Exception as e:
+            logger.error(f"Could not load the model: {e}")
+            self.emit("LOADING", json.dumps({"stage": "error", "error": str(e)}))
+            return
         
+        with self.startup_lock:
+            self.ready.set()
+            deferred, self.deferred_commands = self.deferred_commands, []
+        for command in deferred:
+            # Lines from stdin/clients, or queued audio frames
+            if callable(command):
+                command()
+            else:
+                self.handle_command(command)
+        
+        self.startup_timings["total"] = round(time.perf_counter() - PROCESS_START, 3)
+        self.emit("READY", json.dumps({
+            "model_size": self.model_size,
+            "compute_type": self.compute_type,
+            "beam_size": self.beam_size,
+        }))
+        self.emit("STARTUP_STATS", json.dumps({"imports": import_times, "stages": self.startup_timings}))
+    
+    def warm_up(self, model):
+        """One throwaway decode so the first real chunk does not pay for kernel setup"""
+        noise = (np.random.randn(self.sample_rate) * 0.01).astype(np.float32)
+        segments, info = model.transcribe(noise, beam_size=self.beam_size, language="en", vad_filter=False)
+        list(segments)
+    
     def listen_for_commands(self):
         """Listen for commands from Electron"""
         while True:
             try:
                 command = input().strip()
-                if command.startswith("AGENT:"):
-                    self.agent = command.split(":", 1)[1].strip()
-                    logger.info(f"Agent set to: {self.agent}")
-                    print(f"AGENT_SET:{self.agent}")  # Send confirmation to frontend
-                    sys.stdout.flush()
-                elif command == "START":
-                    self.start_listening()
-                elif command == "STOP":
-                    self.stop_listening()
-                elif command.startswith("TRANSCRIBE_MIC:"):
-                    audio_file = command.split(":", 1)[1].strip()
-                    self.transcribe_file(audio_file, "MIC")
-                elif command.startswith("TRANSCRIBE_SYS:"):
-                    audio_file = command.split(":", 1)[1].strip()
-                    self.transcribe_file(audio_file, "SYS")
-                elif command.startswith("OPENAI_KEY:"):
-                    new_key = command.split(":", 1)[1].strip()
-                    if new_key.startswith("sk-"):
-                        global client
-                        client = openai.OpenAI(api_key=new_key)
-                        logger.info("OpenAI API key updated via settings.")
-                        print("OPENAI_KEY_SET")
-                        sys.stdout.flush()
-                elif command == "QUIT":
+                if not self.dispatch_command(command):
                     break
             except EOFError:
                 break
@@ -115,40 +487,230 @@ class ElectronBackend:
                 logger.error(f"Error reading command: {e}")
                 break
     
-    def start_listening(self):
-        """Start listening for audio"""
+    def dispatch_command(self, command):
+        """Run a command from stdin or a daemon client; returns False on QUIT"""
+        # File decodes need the model's VAD and decoder; hold them until it is loaded
+        if split_session(command)[1].startswith(("TRANSCRIBE_MIC:", "TRANSCRIBE_SYS:")):
+            with self.startup_lock:
+                if not self.ready.is_set():
+                    self.deferred_commands.append(command)
+                    return True
+        return self.handle_command(command)
+    
+    def add_client(self, client):
+        """Register a daemon connection and bring it up to date"""
+        with self.output_lock:
+            self.clients.append(client)
+        try:
+            if self.startup_status:
+                client.send(*self.startup_status)
+            client.send("SESSION", json.dumps({
+                "listening": self.is_listening,
+                "agent": self.session.agent,
+                "sessions": [session.describe() for session in self.list_sessions()],
+            }))
+        except OSError:
+            self.remove_client(client)
+    
+    def remove_client(self, client):
+        with self.output_lock:
+            if client in self.clients:
+                self.clients.remove(client)
+    
+    def get_session(self, session_id=None, create=True):
+        """The session with this ID (the default one for None), created on first use"""
+        session_id = session_id or DEFAULT_SESSION
+        with self.sessions_lock:
+            session = self.sessions.get(session_id)
+            if session is None and create:
+                session = Session(session_id, self.agents, self.prompts, self.counter,
+                                  sample_rate=self.sample_rate, vad_mode=self.vad_mode)
+                self.sessions[session_id] = session
+                logger.info(f"Session {session_id} created")
+        if session is not None and create and self.ready.is_set():
+            session.sys_vad.load_model()
+        return session
+    
+    def list_sessions(self):
+        with self.sessions_lock:
+            return list(self.sessions.values())
+    
+    def close_session(self, session):
+        """Forget a finished non-default session; its late results still reach clients"""
+        if session.is_default:
+            return
+        with self.sessions_lock:
+            if self.sessions.get(session.session_id) is session:
+                del self.sessions[session.session_id]
+        logger.info(f"Session {session.session_id} closed")
+    
+    def handle_command(self, command):
+        """Run one command line; returns False on QUIT
+        
+        Meeting commands apply to the session named by an ``@<id> `` prefix
+        (the default session without one); the others are process-wide.
+        """
+        session_id, command = split_session(command)
+        if command.startswith("AGENT:"):
+            session = self.get_session(session_id)
+            session.agent = command.split(":", 1)[1].strip()
+            logger.info(f"Agent set to: {session.agent} (session {session.session_id})")
+            if session.agent == "general":
+                # Catch the notes up on what was said under another agent
+                session.feed_notes()
+            self.emit("AGENT_SET", session.agent, session=session)  # Send confirmation to frontend
+        elif command == "START":
+            self.start_listening(self.get_session(session_id))
+        elif command == "STOP":
+            session = self.get_session(session_id, create=False)
+            if session is not None:
+                self.stop_listening(session)
+        elif command.startswith("TRANSCRIBE_MIC:"):
+            audio_file = command.split(":", 1)[1].strip()
+            self.transcribe_file(audio_file, "MIC", self.get_session(session_id))
+        elif command.startswith("TRANSCRIBE_SYS:"):
+            audio_file = command.split(":", 1)[1].strip()
+            self.transcribe_file(audio_file, "SYS", self.get_session(session_id))
+        elif command.startswith("SYS_STREAM_FILE:"):
+            # Next recorder file; read on from where the previous one ended
+            self.get_session(session_id).sys_capture.add_file(command.split(":", 1)[1].strip())
+        elif command == "SYS_STREAM_STOP":
+            session = self.get_session(session_id, create=False)
+            if session is not None:
+                session.sys_capture.stop()
+        elif command.startswith("TRANSCRIPT:"):
+            # TRANSCRIPT:<from>,<to> in session seconds -> the turns overlapping that range
+            session = self.get_session(session_id, create=False)
+            try:
+                start, end = (float(t) for t in command.split(":", 1)[1].split(","))
+            except ValueError:
+                logger.error(f"Bad transcript range: {command}")
+            else:
+                turns = session.transcript.between(start, end) if session else []
+                self.emit("TRANSCRIPT", json.dumps([turn.as_dict() for turn in turns]), session=session)
+        elif command == "SESSIONS":
+            self.emit("SESSIONS", json.dumps([session.describe() for session in self.list_sessions()]))
+        elif command.startswith("OPENAI_KEY:"):
+            new_key = command.split(":", 1)[1].strip()
+            if new_key.startswith("sk-"):
+                timed_import("openai")
+                self.agents.set_api_key(new_key)
+                logger.info("OpenAI API key updated via settings.")
+                self.emit("OPENAI_KEY_SET")
+        elif command.startswith("OVERLOAD_POLICY:"):
+            policy = command.split(":", 1)[1].strip()
+            try:
+                self.backpressure.set_policy(policy)
+                logger.info(f"Overload policy set to: {policy}")
+            except ValueError as e:
+                logger.error(str(e))
+        elif command == "STATS":
+            self.emit("INFERENCE_STATS", json.dumps(self.inference.stats()))
+            self.emit_vad_stats()
+            self.emit("IPC_STATS", json.dumps(self.ipc_stats.snapshot()))
+            self.emit("AGENT_STATS", json.dumps(self.agents.stats()))
+            for session in self.list_sessions():
+                self.emit("CONTEXT_STATS", json.dumps(session.sales_context.stats()), session=session)
+                self.emit("TRANSCRIPT_STATS", json.dumps(session.transcript.stats()), session=session)
+            self.emit("CACHE_STATS", json.dumps(self.agents.cache.stats()))
+            self.emit("PROMPT_STATS", json.dumps(self.prompts.stats()))
+            self.emit("METRICS", json.dumps(self.metrics.snapshot()))
+        elif command == "METRICS":
+            self.emit("METRICS", json.dumps(self.metrics.snapshot()))
+        elif command.startswith("PROFILE_START"):
+            # PROFILE_START or PROFILE_START:<trace path>
+            path = command.split(":", 1)[1].strip() if ":" in command else ""
+            if self.profiler.start(path or default_profile_path()):
+                self.emit("PROFILE_STARTED", self.profiler.path)
+        elif command == "PROFILE_STOP":
+            try:
+                path = self.profiler.stop()
+            except OSError as e:
+                logger.error(f"Could not write the profile: {e}")
+            else:
+                if path:
+                    self.emit("PROFILE_SAVED", path)
+        elif command == "QUIT":
+            return False
+        return True
+    
+    def start_listening(self, session=None):
+        """Start listening for audio (a non-default session only takes system audio)"""
+        session = session or self.session
+        if not session.is_default:
+            if not session.listening:
+                session.reset()
+                self.start_system_audio(session)
+                logger.info(f"Session {session.session_id} started")
+            return
         if not self.is_listening:
             self.is_listening = True
             self.is_processing = True
-            self.transcription_buffer = []  # Reset buffer on start
-            self.sales_summary = []
-            self.sales_metadata = {}
-            self.sales_last_utterances = []
-            self.sales_last_suggestion_time = 0
-            self.ai_summary = ""  # Reset AI summary
-            self.summary_last_update_time = 0
-            self.last_summary_transcription_count = 0  # Reset transcription count
+            session.reset()  # Reset buffers and the AI summary on start
+            self.agents.cache.reset_stats()
+            self.audio_buffer.reset()
+            self.streamer.reset()
+            self.backpressure.reset()
+            self.mic_vad.reset()
+            self.metrics.reset()
             
             # Start audio processing thread
-            self.audio_thread = threading.Thread(target=self.process_audio)
+            self.audio_thread = threading.Thread(target=self.process_audio, name="mic-audio")
             self.audio_thread.daemon = True
             self.audio_thread.start()
             
-            # Start audio capture
-            self.audio_stream = sd.InputStream(
-                callback=self.audio_callback,
-                channels=1,
-                samplerate=self.sample_rate,
-                dtype=np.float32,
-                blocksize=int(self.sample_rate * 0.5)
-            )
+            self.start_system_audio(session)
+            
+            if self.autotune:
+                self.rtf_monitor.reset()
+                self.monitor_thread = threading.Thread(target=self.monitor_rtf, name="rtf-monitor")
+                self.monitor_thread.daemon = True
+                self.monitor_thread.start()
+            
+            # Start audio capture (capture runs while the model is still loading;
+            # the ring buffer holds the audio until decoding can start)
+            self.audio_stream = self.open_mic_stream()
             self.audio_stream.start()
             
             logger.info("Started listening")
     
-    def stop_listening(self):
-        """Stop listening for audio"""
-        if self.is_listening:
+    def open_mic_stream(self):
+        """The capture stream that feeds audio_callback (anything with start/stop/close)"""
+        stream = self.audio_source(self.audio_callback, self.sample_rate, self.block_size)
+        if isinstance(stream, BlockSource) and stream.speed <= 0 and stream.backlog is None:
+            # Max speed means decode pace; flooding the ring buffer would only drop audio.
+            # The reader's last wait() says what it needs (a VAD window waits for a pause
+            # or up to max_speech_window, far more than one chunk)
+            stream.backlog = lambda: self.audio_buffer.available() - self.audio_buffer.wanted
+        return stream
+    
+    def start_system_audio(self, session):
+        session.listening = True
+        session.sys_thread = threading.Thread(target=self.process_system_audio, args=(session,),
+                                              name=f"system-audio-{session.session_id}")
+        session.sys_thread.daemon = True
+        session.sys_thread.start()
+    
+    def stop_system_audio(self, session):
+        # Drain the recorder file into the stream before its window loop winds down
+        session.sys_capture.stop()
+        session.listening = False
+        # The ring buffer has a single reader, so let the old window loop
+        # finish before a later START resets the buffer
+        if session.sys_thread:
+            session.sys_thread.join(timeout=5)
+            session.sys_thread = None
+    
+    def stop_listening(self, session=None):
+        """Stop listening for audio and write the minutes of a general-agent meeting
+        
+        A non-default session is finished even if it was never started (files
+        only), and is forgotten afterwards.
+        """
+        session = session or self.session
+        if session.is_default:
+            if not self.is_listening:
+                return
             self.is_listening = False
             self.is_processing = False
             
@@ -156,153 +718,496 @@ class ElectronBackend:
                 self.audio_stream.stop()
                 self.audio_stream.close()
             
-            # On stop, if agent is general, send buffer to OpenAI
-            logger.info(f"Stopping listening. Current agent: {self.agent}")
-            if self.agent == "general" and self.transcription_buffer:
-                text = " ".join(self.transcription_buffer)
-                logger.info("Sending meeting transcript to OpenAI (gpt-4o)...")
-                response = self.query_openai_general(text)
-                self.last_agent_output = response
-                print(f"AGENT_OUTPUT:{response}")
-                sys.stdout.flush()
-                self.transcription_buffer = []
-            
-            logger.info("Stopped listening")
+            if hasattr(self, 'audio_thread'):
+                self.audio_thread.join(timeout=5)
+        self.stop_system_audio(session)
+        self.emit_vad_stats(session)
+        
+        # On stop, if agent is general, send buffer to OpenAI
+        logger.info(f"Stopping listening. Current agent: {session.agent} (session {session.session_id})")
+        with session.lock:
+            # Decodes still queued for this meeting belong in its minutes
+            pending = list(session.decodes)
+        if session.agent == "general" and (len(session.transcript) or pending):
+            logger.info("Merging meeting notes into the minutes (gpt-4o)...")
+            session.feed_notes()
+            requested = time.time()
+            self.agents.submit("general", lambda: self.general_summary_job(session, session.meeting_notes, pending, requested),
+                               group=session.session_id)
+        # Calls answered from the cache or skipped during this meeting
+        self.emit("CACHE_STATS", json.dumps(self.agents.cache.stats()), session=session)
+        self.close_session(session)
+        
+        logger.info("Stopped listening")
     
     def audio_callback(self, indata, frames, time, status):
         """Callback for audio input"""
         if status:
             logger.warning(f"Audio callback status: {status}")
+            self.metrics.inc("audio_callback_status", source="MIC")
+            if getattr(status, "input_overflow", False):
+                # The device dropped input before we got it
+                self.metrics.inc("dropped_blocks", source="MIC")
         
         if self.is_listening:
-            audio_data = indata.copy().astype(np.float32)
-            self.audio_queue.put(audio_data)
+            # indata is already float32 mono; copy it straight into the ring buffer
+            self.audio_buffer.write(indata[:, 0])
     
     def process_audio(self):
         """Process audio chunks and transcribe"""
-        audio_buffer = []
+        # START may arrive before the model is loaded; audio keeps buffering meanwhile
+        while self.is_processing and not self.ready.wait(0.1):
+            pass
+        
+        if self.transcription_mode == "streaming":
+            self.process_audio_streaming()
+            return
+        
+        hop_size = self.chunk_size // 2  # 50% overlap between windows
         
         while self.is_processing:
             try:
-                # Get audio data from queue
-                audio_chunk = self.audio_queue.get(timeout=0.1)
-                audio_buffer.append(audio_chunk)
+                if not self.audio_buffer.wait(self.chunk_size, timeout=0.1):
+                    continue
                 
-                # Check if we have enough audio for a chunk
-                total_samples = sum(len(chunk) for chunk in audio_buffer)
+                # Anything beyond the next window is audio we are behind on
+                backlog = self.audio_buffer.available() - self.chunk_size
+                self.metrics.observe("chunk_lag_seconds", backlog / self.sample_rate, source="MIC")
+                if self.check_backpressure(backlog / self.sample_rate):
+                    window = self.relieve_windowed_backlog(hop_size)
+                elif self.vad_mode != "off":
+                    window = self.next_speech_window()
+                    if window is None:
+                        continue
+                else:
+                    window = self.audio_buffer.next_window(self.chunk_size, hop_size)
+                
+                # Transcribe the audio chunk
+                self.transcribe_chunk(window, self.audio_buffer.window_pos / self.sample_rate)
                 
-                if total_samples >= self.chunk_size:
-                    # Combine audio chunks
-                    combined_audio = np.concatenate(audio_buffer)
-                    
-                    # Keep only the last chunk_size samples
-                    if len(combined_audio) > self.chunk_size:
-                        combined_audio = combined_audio[-self.chunk_size:]
-                    
-                    # Reset buffer with overlap
-                    audio_buffer = [combined_audio[-self.chunk_size//2:]]
-                    
-                    # Transcribe the audio chunk
-                    self.transcribe_chunk(combined_audio)
-                    
-            except queue.Empty:
-                continue
             except Exception as e:
                 logger.error(f"Error processing audio: {e}")
     
-    def transcribe_chunk(self, audio_data):
-        """Transcribe a single audio chunk"""
+    def process_audio_streaming(self):
+        """Feed captured audio to the streaming transcriber and emit confirmed text"""
+        step_size = int(self.sample_rate * self.stream_step)
+        last_partial = ""
+        
+        while self.is_processing:
+            try:
+                if not self.audio_buffer.wait(step_size, timeout=0.1):
+                    continue
+                
+                # Audio that piled up during the last decode is how far behind we are
+                backlog = self.audio_buffer.available() - step_size
+                self.metrics.observe("chunk_lag_seconds", backlog / self.sample_rate, source="MIC")
+                if self.check_backpressure(backlog / self.sample_rate) and self.backpressure.policy == "drop_oldest":
+                    self.audio_buffer.consume(backlog)
+                    self.backpressure.record_drop(backlog / self.sample_rate)
+                    skipped_text = self.streamer.skip(backlog / self.sample_rate)
+                    if skipped_text:
+                        self.handle_transcription(skipped_text, "MIC", "TRANSCRIPTION", words=self.streamer.last_words)
+                
+                new_audio = self.audio_buffer.read()
+                if self.debug_audio_dir:
+                    self.dump_debug_audio(new_audio)
+                
+                seconds = len(new_audio) / self.sample_rate
+                if self.vad_mode != "off" and not self.mic_vad.is_speech(new_audio):
+                    if self.streamer.buffer_duration() > 0:
+                        # Speech just ended: decode once more, then confirm everything
+                        # instead of waiting for a second agreeing hypothesis
+                        self.mic_vad.record(seconds, skipped=False)
+                        self.streamer.insert_audio(new_audio)
+                        confirmed, _ = self.streamer.process_iter()
+                        words = self.streamer.last_words
+                        text = " ".join(t for t in (confirmed, self.streamer.skip(0)) if t)
+                        if text:
+                            self.handle_transcription(text, "MIC", "TRANSCRIPTION", words=words + self.streamer.last_words)
+                    else:
+                        self.mic_vad.record(seconds, skipped=True)
+                        self.streamer.skip(seconds)
+                    if last_partial:
+                        self.emit("TRANSCRIPTION_PARTIAL", "")
+                        last_partial = ""
+                    continue
+                
+                self.mic_vad.record(seconds, skipped=False)
+                self.streamer.insert_audio(new_audio)
+                
+                confirmed, partial = self.streamer.process_iter()
+                if confirmed:
+                    self.handle_transcription(confirmed, "MIC", "TRANSCRIPTION", words=self.streamer.last_words)
+                if partial != last_partial:
+                    self.emit("TRANSCRIPTION_PARTIAL", partial)
+                    last_partial = partial
+                
+            except Exception as e:
+                logger.error(f"Error processing audio: {e}")
+        
+        # Whatever was still tentative at STOP is final now
+        try:
+            self.streamer.insert_audio(self.audio_buffer.read())
+            confirmed, partial = self.streamer.process_iter()
+            words = self.streamer.last_words
+            remaining = " ".join(t for t in (confirmed, self.streamer.finish()) if t)
+            if remaining:
+                self.handle_transcription(remaining, "MIC", "TRANSCRIPTION", words=words + self.streamer.last_words)
+            if last_partial:
+                self.emit("TRANSCRIPTION_PARTIAL", "")
+        except Exception as e:
+            logger.error(f"Error flushing streaming transcription: {e}")
+    
+    def check_backpressure(self, lag_seconds, source="MIC"):
+        """Feed the current lag to the controller and apply degrade/restore steps"""
+        overloaded = self.backpressure.observe(lag_seconds, self.inference.queue_depth(), source)
+        if self.backpressure.policy == "degrade":
+            config = self.backpressure.step_down() if overloaded else self.backpressure.step_up()
+            if config:
+                self.apply_decode_config(*config)
+        return overloaded
+    
+    def monitor_rtf(self):
+        """Step the decode config down (or back up) when live decode load stays out of range"""
+        while self.is_listening:
+            time.sleep(self.rtf_sample_interval)
+            action = self.rtf_monitor.sample(self.inference.busy_time)
+            if action == "down":
+                config = self.backpressure.step_down()
+            elif action == "up":
+                config = self.backpressure.step_up(require_calm=False)
+            else:
+                continue
+            if config:
+                logger.info(f"Live RTF {self.rtf_monitor.rtf:.2f}, switching decode config")
+                self.apply_decode_config(*config)
+    
+    def process_system_audio(self, session):
+        """Window a session's continuous system-audio stream and queue each window for decoding"""
+        buffer = session.sys_buffer
+        while session.listening and not self.ready.wait(0.1):
+            pass
+        
+        while session.listening:
+            try:
+                if not buffer.wait(self.chunk_size, timeout=0.1):
+                    continue
+                
+                # Only the live meeting is held to real time; other sessions wait their turn
+                backlog = buffer.available() - self.chunk_size
+                self.metrics.observe("chunk_lag_seconds", backlog / self.sample_rate, source="SYS")
+                if session.is_default:
+                    lag = max(backlog / self.sample_rate, self.inference.oldest_wait("SYS", session=session.session_id))
+                    if self.check_backpressure(lag, "SYS") and self.backpressure.policy == "drop_oldest" and backlog > 0:
+                        buffer.consume(backlog)
+                        self.backpressure.record_drop(backlog / self.sample_rate, "SYS")
+                
+                if self.vad_mode != "off":
+                    window = self.next_speech_window(buffer, session.sys_vad)
+                    if window is None:
+                        continue
+                else:
+                    window = buffer.peek(self.chunk_size)
+                    buffer.consume(self.chunk_size)
+                
+                # Copy out of the ring buffer; the decode may run after it wraps
+                self.submit_transcription(np.array(window), "SYS", "stream window", gated=True, session=session,
+                                          offset=buffer.window_pos / self.sample_rate)
+            except Exception as e:
+                logger.error(f"Error processing system audio (session {session.session_id}): {e}")
+        
+        # Whatever is left at STOP goes out as one last window
+        remaining = buffer.available()
+        if remaining:
+            self.submit_transcription(np.array(buffer.peek(remaining)), "SYS", "stream tail", session=session,
+                                      offset=buffer.window_pos / self.sample_rate)
+            buffer.consume(remaining)
+    
+    def next_speech_window(self, buffer=None, vad=None):
+        """Take buffered audio up to the end of an utterance; None while there is nothing to decode yet"""
+        if buffer is None:
+            buffer, vad = self.audio_buffer, self.mic_vad
+        audio = buffer.peek(buffer.available())
+        # Shorter than what was available if the backlog was past max_lag and got dropped
+        available = len(audio)
+        started = time.perf_counter()
+        segments = vad.speech_segments(audio, position=buffer.window_pos)
+        if self.profiler.running:
+            self.profiler.span("vad", started, time.perf_counter() - started, seconds=round(available / self.sample_rate, 2))
+        
+        if not segments:
+            # Keep a short tail so a word starting right at the edge is not clipped
+            silent = max(0, available - vad.speech_pad)
+            buffer.consume(silent)
+            vad.record(silent / self.sample_rate, skipped=True)
+            buffer.wait(available + self.block_size, timeout=0.5)
+            return None
+        
+        # Leading silence never reaches the decoder
+        lead = max(0, segments[0][0] - vad.speech_pad)
+        if lead:
+            buffer.consume(lead)
+            vad.record(lead / self.sample_rate, skipped=True)
+            available -= lead
+            segments = [(start - lead, end - lead) for start, end in segments]
+        
+        cut = vad.last_boundary(segments, available)
+        max_window = int(self.sample_rate * self.max_speech_window)
+        if cut is None:
+            if available < max_window:
+                # Mid-utterance: wait for the speaker to pause
+                buffer.wait(available + self.block_size, timeout=0.5)
+                return None
+            cut = max_window
+        
+        window = buffer.peek(cut)
+        buffer.consume(cut)
+        vad.record(cut / self.sample_rate, skipped=False)
+        return window
+    
+    def record_decode(self, batch, decode_time):
+        """Scheduler listener: queue wait, decode time and RTF per decoded request"""
+        started = time.time() - decode_time
+        self.metrics.observe("batch_size", len(batch))
+        if self.profiler.running:
+            self.profiler.span("decode", time.perf_counter() - decode_time, decode_time, batch=len(batch),
+                               sources=sorted({request.source or "FILE" for request in batch}))
+        for request in batch:
+            source = request.source or "FILE"
+            self.metrics.observe("queue_wait_seconds", started - request.submitted_at, source=source)
+            self.metrics.observe("decode_seconds", decode_time, source=source)
+            if not isinstance(request.audio, str) and len(request.audio):
+                self.metrics.observe("decode_rtf", decode_time / (len(request.audio) / self.sample_rate), source=source)
+    
+    def register_gauges(self):
+        """Values already tracked elsewhere, read when a snapshot is taken"""
+        self.metrics.gauge("inference_queue_depth", self.inference.queue_depth)
+        self.metrics.gauge("capture_backlog_seconds", lambda: self.audio_buffer.available() / self.sample_rate, source="MIC")
+        self.metrics.gauge("ring_buffer_dropped_seconds", lambda: self.audio_buffer.dropped_samples / self.sample_rate, source="MIC")
+        self.metrics.gauge("backpressure_dropped_seconds", lambda: self.backpressure.dropped_seconds)
+        self.metrics.gauge("live_rtf", lambda: round(self.rtf_monitor.rtf, 3))
+        self.metrics.gauge("sessions", lambda: len(self.sessions))
+    
+    def metrics_loop(self):
+        """Periodic METRICS lines while listening (COGNITION_METRICS_INTERVAL=0 turns them off)"""
+        if self.metrics_interval <= 0:
+            return
+        while True:
+            time.sleep(self.metrics_interval)
+            if self.is_listening:
+                self.emit("METRICS", json.dumps(self.metrics.snapshot()))
+    
+    def emit_vad_stats(self, session=None):
+        session = session or self.session
+        stats = {"SYS": session.sys_vad.stats()}
+        if session.is_default:
+            stats["MIC"] = self.mic_vad.stats()
+        self.emit("VAD_STATS", json.dumps(stats), session=session)
+    
+    def relieve_windowed_backlog(self, hop_size):
+        """Take the next window under the drop_oldest or merge policy"""
+        available = self.audio_buffer.available()
+        if self.backpressure.policy == "drop_oldest":
+            stale = available - self.chunk_size
+            self.audio_buffer.consume(stale)
+            self.backpressure.record_drop(stale / self.sample_rate)
+            return self.audio_buffer.next_window(self.chunk_size, hop_size)
+        if self.backpressure.policy == "merge":
+            size = min(available, int(self.sample_rate * self.max_merge_duration))
+            window = self.audio_buffer.peek(size)
+            self.audio_buffer.consume(size - hop_size)
+            self.backpressure.record_merge(size / self.sample_rate)
+            return window
+        return self.audio_buffer.next_window(self.chunk_size, hop_size)
+    
+    def apply_decode_config(self, beam_size, model_size):
+        """Switch beam size now and, if needed, the model once it has loaded"""
+        logger.info(f"Decode config: beam_size={beam_size}, model={model_size}")
+        self.beam_size = beam_size
+        self.streamer.beam_size = beam_size
+        if model_size != self.model_size:
+            self.swap_model(model_size)
+    
+    def swap_model(self, model_size):
+        """Load another model size in the background and hand it to the scheduler"""
+        if self.model_swap_thread and self.model_swap_thread.is_alive():
+            return
+        
+        def load():
+            try:
+                logger.info(f"Loading {model_size} model on {self.device}")
+                WhisperModel = timed_import("faster_whisper").WhisperModel
+                model = WhisperModel(model_size, device=self.device, compute_type=self.compute_type)
+                self.model = model
+                self.model_size = model_size
+                self.inference.set_model(model)
+                logger.info(f"Switched to {model_size} model")
+            except Exception as e:
+                logger.error(f"Could not load {model_size} model: {e}")
+        
+        self.model_swap_thread = threading.Thread(target=load, name="model-swap")
+        self.model_swap_thread.daemon = True
+        self.model_swap_thread.start()
+    
+    def chunk_decode_options(self):
+        """Decode options shared by windowed mic chunks and system chunks
+        
+        Both are already VAD-gated and decoded without a prompt, so with equal
+        options the scheduler can batch a mic window with system chunks.
+        Streaming mic decodes need word timestamps and a prompt and are always
+        decoded on their own.
+        """
+        return dict(
+            beam_size=self.beam_size,
+            language="en",
+            condition_on_previous_text=False,
+            temperature=0.0,
+            compression_ratio_threshold=2.4,
+            log_prob_threshold=-1.0,
+        )
+    
+    def transcribe_chunk(self, audio_data, offset=0.0):
+        """Transcribe a single audio chunk that starts ``offset`` seconds into the session"""
         try:
             start_time = time.time()
             
-            # Save audio to temporary file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_filename = temp_file.name
+            # Whisper takes 16kHz mono float32 directly, so hand over a flat view
+            # of the captured buffer instead of round-tripping through a WAV file
+            audio_data = np.asarray(audio_data, dtype=np.float32).reshape(-1)
             
-            # Save as WAV file
-            with wave.open(temp_filename, 'wb') as wav_file:
-                wav_file.setnchannels(1)  # Mono
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(self.sample_rate)
-                wav_file.writeframes((audio_data * 32767).astype(np.int16).tobytes())
+            if self.debug_audio_dir:
+                self.dump_debug_audio(audio_data)
             
             # Transcribe
-            segments, info = self.model.transcribe(
-                temp_filename,
-                beam_size=5,
-                language="en",
-                condition_on_previous_text=False,
-                vad_filter=True,
-                vad_parameters=dict(min_silence_duration_ms=500)
-            )
+            options = self.chunk_decode_options()
+            if self.vad_mode == "off":
+                # Otherwise already gated by mic_vad
+                options.update(vad_filter=True, vad_parameters=dict(min_silence_duration_ms=500))
+            segments, info = self.inference.transcribe(audio_data, source="MIC", **options)
             
             # Get transcription text
+            segments = list(segments)
             transcription = " ".join([segment.text.strip() for segment in segments])
             
             # Calculate processing time
             processing_time = time.time() - start_time
+            self.metrics.observe("processing_seconds", processing_time, source="MIC")
             
             # Send transcription to Electron
             if transcription.strip():
-                print(f"TRANSCRIPTION:{transcription}")
+                self.handle_transcription(transcription, "MIC", "TRANSCRIPTION",
+                                          start=offset + segments[0].start, end=offset + segments[-1].end)
+            
+        except Exception as e:
+            logger.error(f"Error transcribing chunk: {e}")
+    
+    def emit(self, tag, payload=None, session=None, **meta):
+        """Send one protocol message to Electron (stdout and/or every daemon client)
+        
+        ``meta`` (e.g. reply_to, latency_ms) only reaches framed clients.
+        Messages of a non-default ``session`` carry its ID: an ``@<id> ``
+        line prefix, or a ``session`` field in the frame header.
+        """
+        prefix = ""
+        if session is not None and not session.is_default:
+            meta["session"] = session.session_id
+            prefix = f"@{session.session_id} "
+        with self.output_lock:
+            if tag in ("LOADING", "READY"):
+                self.startup_status = (tag, payload)
+            if self.stdio:
+                print(prefix + (tag if payload is None else f"{tag}:{payload}"))
                 sys.stdout.flush()
-                with self.agent_output_lock:
-                    # Add [Rep] label for microphone transcriptions
-                    self.transcription_buffer.append(f"[Rep] {transcription}")
-                # For sales agent, buffer utterances and send suggestions every interval
-                logger.info(f"Processing transcription. Current agent: {self.agent}")
-                if self.agent == "sales":
-                    logger.info(f"Sales agent active - processing microphone transcription")
-                    self.sales_last_utterances.append(transcription)
-                    # Keep only last 3 utterances (~9 seconds if 3s chunks)
-                    self.sales_last_utterances = self.sales_last_utterances[-3:]
-                    now = time.time()
-                    
-                    # Check if it's time for action items (every 10 seconds)
-                    if now - self.sales_last_suggestion_time > self.sales_suggestion_interval:
-                        self.sales_last_suggestion_time = now
-                        # Always use the full context for summary
-                        summary = self.generate_sales_summary(full_context=True)
-                        last_utterance = " ".join(self.sales_last_utterances)
-                        metadata = json.dumps(self.sales_metadata) if self.sales_metadata else ''
-                        response = self.query_openai_sales(summary, last_utterance, metadata)
-                        self.last_agent_output = response
-                        print(f"AGENT_OUTPUT:{response}")
-                        sys.stdout.flush()
-                    
-                    # Check if it's time for summary update (every 30 seconds)
-                    if now - self.summary_last_update_time > self.summary_update_interval:
-                        self.summary_last_update_time = now
-                        
-                        # Get only NEW transcriptions since last summary update
-                        current_transcription_count = len(self.transcription_buffer)
-                        new_transcriptions_start = self.last_summary_transcription_count
-                        new_transcriptions_end = current_transcription_count
-                        
-                        # Get only the new transcriptions (last 30 seconds worth)
-                        new_transcriptions = []
-                        if new_transcriptions_end > new_transcriptions_start:
-                            new_transcriptions = self.transcription_buffer[new_transcriptions_start:new_transcriptions_end]
-                        
-                        # Join new transcriptions into text
-                        new_transcription_text = " ".join(new_transcriptions) if new_transcriptions else ""
-                        
-                        # Only update if we have new transcriptions
-                        if new_transcription_text.strip():
-                            new_summary = self.query_openai_summary(self.ai_summary, new_transcription_text)
-                            if new_summary != self.ai_summary:
-                                self.ai_summary = new_summary
-                                print(f"SUMMARY_UPDATE:{new_summary}")
-                                sys.stdout.flush()
-                        
-                        # Update the count for next time
-                        self.last_summary_transcription_count = current_transcription_count
+            for client in list(self.clients):
+                try:
+                    client.send(tag, payload, **meta)
+                except OSError:
+                    # Gone without saying QUIT, or too far behind; its reader thread cleans up
+                    self.clients.remove(client)
+    
+    def handle_transcription(self, transcription, source, tag, meta=None, session=None, start=None, end=None, words=None):
+        """Send a transcription to Electron, store it and feed it to the session's agent
+        
+        ``start``/``end`` (or ``words``, (start, end, text) tuples) are session
+        seconds; without them the turn is placed at the current session time.
+        """
+        session = session or self.session
+        if words:
+            start, end = words[0][0], words[-1][1]
+        elif start is None:
+            start = end = session.session_time()
+        self.emit(tag, transcription, session=session, start=round(start, 2), end=round(end, 2), **(meta or {}))
+        # Capture -> emit: how long after the speech ended its text went out
+        self.metrics.observe("emit_lag_seconds", max(0.0, session.session_time() - end), source=source)
+        session.add_turn(start, end, source, transcription, words)
+        # For sales agent, buffer utterances and send suggestions every interval
+        logger.info(f"Processing transcription. Current agent: {session.agent}")
+        if session.agent == "sales":
+            logger.info(f"Sales agent active - processing {source} transcription")
+            now = time.time()
             
-            # Clean up temp file
-            os.unlink(temp_filename)
+            # Check if it's time for action items (every 10 seconds)
+            # Last 3 turns (~9 seconds if 3s chunks)
+            last_utterance = " ".join(turn.text for turn in session.transcript.latest(3))
+            if now - session.sales_last_suggestion_time > session.sales_suggestion_interval:
+                if not session.novelty.accept("sales", last_utterance):
+                    # Same utterances as last time; try again on the next transcription
+                    self.agents.cache.record_skip()
+                    logger.info("Sales suggestion skipped: nothing new since the last one")
+                else:
+                    session.sales_last_suggestion_time = now
+                    # Fixed-size context instead of the whole transcript
+                    summary = session.sales_context.build(session.ai_summary)
+                    metadata = json.dumps(session.sales_metadata) if session.sales_metadata else ''
+                    requested = time.time()
+                    # Newer context makes a suggestion still in flight stale, so it is cancelled
+                    self.agents.submit("sales", lambda: self.sales_suggestion_job(session, summary, last_utterance, metadata, requested),
+                                       replace=True, group=session.session_id)
             
+            # Check if it's time for summary update (every 30 seconds)
+            if now - session.summary_last_update_time > session.summary_update_interval:
+                session.summary_last_update_time = now
+                
+                # Get only NEW turns since last summary update (in arrival order, so
+                # system audio that was decoded late is not missed)
+                current_transcription_count = len(session.transcript)
+                new_transcriptions = session.transcript.turns(session.last_summary_transcription_count, current_transcription_count)
+                
+                # Join new transcriptions into text
+                new_transcription_text = "\n".join(turn.line() for turn in new_transcriptions)
+                
+                # Only update if we have new transcriptions
+                if new_transcription_text.strip() and not session.novelty.accept("summary", new_transcription_text):
+                    # Too little new to change the summary; keep it for the next update
+                    self.agents.cache.record_skip()
+                    logger.info("Summary update skipped: new transcript is near-duplicate")
+                else:
+                    if new_transcription_text.strip():
+                        # Each update builds on the previous summary, so these run one at a time
+                        requested = time.time()
+                        self.agents.submit("summary", lambda: self.summary_update_job(session, new_transcription_text, requested),
+                                           serial=True, group=session.session_id)
+                    
+                    # Update the count for next time
+                    session.last_summary_transcription_count = current_transcription_count
+    
+    def dump_debug_audio(self, audio_data):
+        """Write a chunk to the debug directory as a 16-bit WAV file"""
+        started = time.perf_counter()
+        try:
+            os.makedirs(self.debug_audio_dir, exist_ok=True)
+            self.debug_chunk_index += 1
+            filename = os.path.join(self.debug_audio_dir, f"chunk-{self.debug_chunk_index:05d}.wav")
+            with wave.open(filename, 'wb') as wav_file:
+                wav_file.setnchannels(1)  # Mono
+                wav_file.setsampwidth(2)  # 16-bit
+                wav_file.setframerate(self.sample_rate)
+                wav_file.writeframes((np.clip(audio_data, -1.0, 1.0) * 32767).astype(np.int16).tobytes())
+            logger.info(f"Saved debug audio chunk: {filename}")
         except Exception as e:
-            logger.error(f"Error transcribing chunk: {e}")
+            logger.error(f"Could not save debug audio chunk: {e}")
+        if self.profiler.running:
+            self.profiler.span("wav write", started, time.perf_counter() - started)
     
     def generate_placeholder_sentiment(self, text):
         """Generate placeholder sentiment analysis"""
@@ -379,39 +1284,74 @@ class ElectronBackend:
             # No periodic sending for general agent
             # Only sales agent logic is handled in transcribe_chunk
 
-    def query_openai_general(self, text):
-        prompt_template = self.read_prompt_file('prompt_general.txt')
-        prompt = prompt_template.replace('{transcript}', text)
+    def delta_sender(self, session, kind, tag, requested, field="text"):
+        """Callback emitting streamed pieces as ``tag`` events; seq 0 marks the start of a new response"""
+        seq = itertools.count()
+        def send(piece):
+            n = next(seq)
+            if n == 0:
+                self.agents.record_first_output(kind, time.time() - requested)
+            # JSON keeps newlines inside the piece off the line protocol
+            self.emit(tag, json.dumps({"seq": n, field: piece}), session=session)
+        return send
+
+    async def general_summary_job(self, session, notes, pending, requested):
+        # Chunks still decoding at STOP go into the notes before they are closed
+        if pending:
+            await asyncio.gather(*(asyncio.wrap_future(f) for f in pending), return_exceptions=True)
+        # Only the merge is left: partial notes were made while the meeting ran
+        text = await notes.final_input()
+        response = await self.query_openai_general(text, self.delta_sender(session, "general", "AGENT_OUTPUT_DELTA", requested))
+        session.last_agent_output = response
+        self.emit("AGENT_OUTPUT", response, session=session)
+
+    async def sales_suggestion_job(self, session, summary, last_utterance, metadata, requested):
+        # Each suggestion goes out as soon as its object is complete
+        on_suggestion = self.delta_sender(session, "sales", "AGENT_OUTPUT_DELTA", requested, field="suggestion")
+        response = await self.query_openai_sales(session, summary, last_utterance, metadata, on_suggestion)
+        session.last_agent_output = response
+        self.emit("AGENT_OUTPUT", response, session=session)
+
+    async def summary_update_job(self, session, new_transcript, requested):
+        # Read the summary only now: the previous update may have finished while this one queued
+        on_delta = self.delta_sender(session, "summary", "SUMMARY_DELTA", requested)
+        session.ai_summary = await self.query_openai_summary(session.ai_summary, new_transcript, on_delta)
+        # Always sent: it is also what replaces the streamed preview
+        self.emit("SUMMARY_UPDATE", session.ai_summary, session=session)
+
+    async def query_openai_general(self, text, on_delta=None):
         try:
+            prompt = self.prompts.render("general", transcript=text)
             logger.info("Calling OpenAI (gpt-4o) for meeting summary...")
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a helpful meeting assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
-            return response.choices[0].message.content.strip()
+            messages = [
+                {"role": "system", "content": "You are a helpful meeting assistant."},
+                {"role": "user", "content": prompt}
+            ]
+            if on_delta is None:
+                return await self.agents.chat(messages, temperature=0.3)
+            return await self.agents.chat_stream(messages, on_delta, temperature=0.3)
         except Exception as e:
             logger.error(f"OpenAI error (general): {e}")
             return "[Error: Could not fetch meeting summary.]"
 
-    def query_openai_sales(self, summary, last_utterance, metadata):
+    async def query_openai_sales(self, session, summary, last_utterance, metadata, on_suggestion=None):
         # Uses a prompt that instructs the model to use Jeremy Miner's NEPQ and modern consultative sales tactics, reference recent customer statements, use temporal/contextual cues, and provide specific, actionable suggestions.
-        prompt_template = self.read_prompt_file('prompt_sales.txt')
-        prompt = prompt_template.replace('{summary}', summary).replace('{last_utterance}', last_utterance).replace('{metadata}', metadata)
         try:
+            prompt = self.prompts.render("sales", summary=summary, last_utterance=last_utterance, metadata=metadata)
+            session.sales_context.record_prompt(prompt)
             logger.info("Calling OpenAI (gpt-4o) for sales agent suggestions...")
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a real-time AI sales assistant. Your job is to suggest what the rep should say next, using advanced sales tactics (like Jeremy Miner's NEPQ: problem awareness, solution awareness, consequence, commitment, etc.)."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3
-            )
-            text = response.choices[0].message.content.strip()
+            messages = [
+                {"role": "system", "content": "You are a real-time AI sales assistant. Your job is to suggest what the rep should say next, using advanced sales tactics (like Jeremy Miner's NEPQ: problem awareness, solution awareness, consequence, commitment, etc.)."},
+                {"role": "user", "content": prompt}
+            ]
+            if on_suggestion is None:
+                text = await self.agents.chat(messages, temperature=0.3)
+            else:
+                parser = SuggestionStream()
+                def on_delta(piece):
+                    for suggestion in parser.feed(piece):
+                        on_suggestion(suggestion)
+                text = await self.agents.chat_stream(messages, on_delta, temperature=0.3)
             # Try to extract JSON array
             try:
                 suggestions = json.loads(text)
@@ -422,37 +1362,24 @@ class ElectronBackend:
             logger.error(f"OpenAI error (sales): {e}")
             return "[Error: Could not fetch sales suggestions.]"
 
-    def read_prompt_file(self, filename):
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            logger.error(f"Could not read prompt file {filename}: {e}")
-            return ''
-    
-    def query_openai_summary(self, previous_summary, new_transcript):
+    async def query_openai_summary(self, previous_summary, new_transcript, on_delta=None):
         """Generate AI-powered conversation summary"""
         try:
-            prompt = self.read_prompt_file("prompt_summary.txt")
-            if not prompt:
-                logger.error("Could not read summary prompt file")
-                return previous_summary
-            
-            # Replace placeholders in prompt
-            prompt = prompt.replace("{previous_summary}", previous_summary or "No previous summary available.")
-            prompt = prompt.replace("{new_transcript}", new_transcript or "No new transcript available.")
-            
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are an expert sales conversation analyst focused on extracting customer insights and business context."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
-                temperature=0.3
+            prompt = self.prompts.render(
+                "summary",
+                previous_summary=previous_summary or "No previous summary available.",
+                new_transcript=new_transcript or "No new transcript available.",
             )
             
-            summary = response.choices[0].message.content.strip()
+            messages = [
+                {"role": "system", "content": "You are an expert sales conversation analyst focused on extracting customer insights and business context."},
+                {"role": "user", "content": prompt}
+            ]
+            if on_delta is None:
+                summary = await self.agents.chat(messages, max_tokens=500, temperature=0.3)
+            else:
+                summary = await self.agents.chat_stream(messages, on_delta, max_tokens=500, temperature=0.3)
+            
             logger.info(f"Generated AI summary: {len(summary)} characters")
             return summary
             
@@ -470,132 +1397,198 @@ class ElectronBackend:
             logger.info("Shutting down...")
             self.stop_listening()
 
-    def generate_sales_summary(self, full_context=False):
-        # If full_context is True, join all transcriptions as context
-        if full_context:
-            return '\n- '.join([''] + [b.strip() for b in self.transcription_buffer if b.strip()])
-        # Otherwise, use the first, middle, and last utterances as a simple summary
-        if not self.transcription_buffer:
-            return ""
-        bullets = []
-        if self.transcription_buffer:
-            bullets.append(self.transcription_buffer[0])
-        if len(self.transcription_buffer) > 2:
-            bullets.append(self.transcription_buffer[len(self.transcription_buffer)//2])
-        if len(self.transcription_buffer) > 1:
-            bullets.append(self.transcription_buffer[-1])
-        return '\n- '.join([''] + [b.strip() for b in bullets if b.strip()])
-
-    def transcribe_file(self, audio_file, source):
-        """Transcribe a specific audio file"""
+    def transcribe_file(self, audio_file, source, session=None):
+        """Queue a specific audio file for transcription without blocking the caller"""
+        if not os.path.exists(audio_file):
+            logger.error(f"Audio file not found: {audio_file}")
+            return
+        
+        # Decode up front so the VAD gate can look at it
+        audio = audio_file
+        if self.vad_mode != "off":
+            try:
+                audio = timed_import("faster_whisper.audio").decode_audio(audio_file, sampling_rate=self.sample_rate)
+            except Exception as e:
+                logger.error(f"Could not read {source} file {audio_file}: {e}")
+                self.remove_audio_file(audio_file)
+                return
+        
+        self.submit_transcription(audio, source, audio_file, on_done=lambda: self.remove_audio_file(audio_file),
+                                  session=session)
+    
+    def receive_audio(self, header, payload):
+        """Raw PCM from a framed client (an AUDIO frame); replies carry its id and latency"""
+        source = header.get("source", "SYS")
+        session = self.get_session(header.get("session"))
+        if header.get("stream"):
+            # A piece of the session's continuous system stream rather than a standalone chunk
+            session.sys_capture.write_pcm(payload, header.get("encoding", "f32le"),
+                                       int(header.get("sample_rate", self.sample_rate)), int(header.get("channels", 1)))
+            return
         try:
-            if not os.path.exists(audio_file):
-                logger.error(f"Audio file not found: {audio_file}")
+            audio = decode_pcm(payload, header, self.sample_rate)
+        except Exception as e:
+            logger.error(f"Bad {source} audio frame {header.get('id')}: {e}")
+            return
+        meta = {"reply_to": header.get("id")}
+        sent_at = header.get("ts", time.time())
+        
+        # Hold frames that arrive before the model is ready, as for files
+        with self.startup_lock:
+            if not self.ready.is_set():
+                self.deferred_commands.append(lambda: self.submit_transcription(
+                    audio, source, f"frame {header.get('id')}", meta=meta, start_time=sent_at, session=session))
                 return
-            
-            start_time = time.time()
-            
-            # Transcribe
-            segments, info = self.model.transcribe(
-                audio_file,
-                beam_size=1,
-                language="en",
-                condition_on_previous_text=False,
-                vad_filter=False,  # Disable VAD temporarily to test
-                temperature=0.0,
-                compression_ratio_threshold=2.4,
-                log_prob_threshold=-1.0
-            )
+        self.submit_transcription(audio, source, f"frame {header.get('id')}", meta=meta, start_time=sent_at, session=session)
+    
+    def submit_transcription(self, audio, source, label, on_done=None, meta=None, start_time=None, gated=False, session=None,
+                             offset=None):
+        """Gate (unless ``gated``), then queue one system/file chunk (array or path) on the scheduler
+        
+        ``offset`` is where the chunk starts in session seconds; chunks that are
+        not cut from a session stream (files, frames) are taken to end on arrival.
+        """
+        session = session or self.session
+        start_time = start_time or time.time()
+        arrival = session.session_time()
+        on_done = on_done or (lambda: None)
+        
+        # System chunks queue up in the scheduler rather than the ring buffer;
+        # only the live meeting is held to real time
+        if session.is_default and self.check_backpressure(
+                self.inference.oldest_wait(source, session=session.session_id), source) \
+                and self.backpressure.policy == "drop_oldest":
+            dropped = self.inference.drop_oldest(source, keep=0, session=session.session_id)
+            if dropped:
+                self.backpressure.record_drop(dropped * self.chunk_duration, source)
+        
+        # Gate the chunk here so silent system audio never enters the queue
+        if self.vad_mode != "off" and not gated and not isinstance(audio, str):
+            seconds = len(audio) / self.sample_rate
+            started = time.perf_counter()
+            segments = session.sys_vad.speech_segments(audio)
+            if self.profiler.running:
+                self.profiler.span("vad", started, time.perf_counter() - started, seconds=round(seconds, 2))
+            if not segments:
+                session.sys_vad.record(seconds, skipped=True)
+                on_done()
+                return
+            # Trim to the speech span; silence either side is skipped
+            if offset is not None:
+                offset += segments[0][0] / self.sample_rate
+            audio = audio[segments[0][0]:segments[-1][1]]
+            session.sys_vad.record(len(audio) / self.sample_rate, skipped=False)
+            session.sys_vad.record(seconds - len(audio) / self.sample_rate, skipped=True)
+        
+        try:
+            future = self.inference.submit(audio, source=source, session=session.session_id,
+                                           **self.chunk_decode_options())
+        except queue.Full:
+            logger.warning(f"Inference queue full, dropping {source} {label}")
+            on_done()
+            return
+        
+        with session.lock:
+            session.decodes.add(future)
+        future.add_done_callback(
+            lambda f: self.finish_transcription(f, source, label, start_time, on_done, meta, session, offset, arrival)
+        )
+    
+    def finish_transcription(self, future, source, label, start_time, on_done, meta, session, offset=None, arrival=None):
+        """Handle a finished system/file decode (runs on the inference worker)"""
+        try:
+            if future.cancelled():
+                # Dropped by the overload policy
+                return
+            segments, info = future.result()
             
             # Get transcription text
             transcription = " ".join([segment.text.strip() for segment in segments])
+            if segments and offset is None:
+                offset = max(0.0, (arrival or 0.0) - segments[-1].end)
             
-            # Calculate processing time
+            # Calculate processing time (including time spent queued)
             processing_time = time.time() - start_time
+            self.metrics.observe("processing_seconds", processing_time, source=source)
             
             # Send transcription to Electron with source prefix
             if transcription.strip():
-                print(f"TRANSCRIPTION_{source}:{transcription}")
-                sys.stdout.flush()
-                # Add to transcription buffer for meeting summary
-                with self.agent_output_lock:
-                    # Add [Prospect] label for system audio transcriptions
-                    self.transcription_buffer.append(f"[Prospect] {transcription}")
                 logger.info(f"{source} transcription ({processing_time:.2f}s): {transcription}")
-                
-                # For sales agent, also process system audio for suggestions and summary updates
-                if self.agent == "sales":
-                    logger.info(f"Sales agent active - processing system audio transcription")
-                    self.sales_last_utterances.append(transcription)
-                    # Keep only last 3 utterances (~9 seconds if 3s chunks)
-                    self.sales_last_utterances = self.sales_last_utterances[-3:]
-                    now = time.time()
-                    
-                    # Check if it's time for action items (every 10 seconds)
-                    if now - self.sales_last_suggestion_time > self.sales_suggestion_interval:
-                        self.sales_last_suggestion_time = now
-                        # Always use the full context for summary
-                        summary = self.generate_sales_summary(full_context=True)
-                        last_utterance = " ".join(self.sales_last_utterances)
-                        metadata = json.dumps(self.sales_metadata) if self.sales_metadata else ''
-                        response = self.query_openai_sales(summary, last_utterance, metadata)
-                        self.last_agent_output = response
-                        print(f"AGENT_OUTPUT:{response}")
-                        sys.stdout.flush()
-                    
-                    # Check if it's time for summary update (every 30 seconds)
-                    if now - self.summary_last_update_time > self.summary_update_interval:
-                        self.summary_last_update_time = now
-                        
-                        # Get only NEW transcriptions since last summary update
-                        current_transcription_count = len(self.transcription_buffer)
-                        new_transcriptions_start = self.last_summary_transcription_count
-                        new_transcriptions_end = current_transcription_count
-                        
-                        # Get only the new transcriptions (last 30 seconds worth)
-                        new_transcriptions = []
-                        if new_transcriptions_end > new_transcriptions_start:
-                            new_transcriptions = self.transcription_buffer[new_transcriptions_start:new_transcriptions_end]
-                        
-                        # Join new transcriptions into text
-                        new_transcription_text = " ".join(new_transcriptions) if new_transcriptions else ""
-                        
-                        # Only update if we have new transcriptions
-                        if new_transcription_text.strip():
-                            new_summary = self.query_openai_summary(self.ai_summary, new_transcription_text)
-                            if new_summary != self.ai_summary:
-                                self.ai_summary = new_summary
-                                print(f"SUMMARY_UPDATE:{new_summary}")
-                                sys.stdout.flush()
-                        
-                        # Update the count for next time
-                        self.last_summary_transcription_count = current_transcription_count
-            
-            # Clean up the audio file
-            try:
-                os.unlink(audio_file)
-            except:
-                pass
-                
-            # Check file size for debugging
-            try:
-                file_size = os.path.getsize(audio_file)
-                logger.info(f"{source} audio file size: {file_size} bytes")
-            except:
-                pass
-                
+                if meta is not None:
+                    meta = dict(meta, latency_ms=round(processing_time * 1000, 1))
+                words = [(offset + w.start, offset + w.end, w.word) for segment in segments for w in (segment.words or [])]
+                self.handle_transcription(transcription, source, f"TRANSCRIPTION_{source}", meta, session,
+                                          start=offset + segments[0].start, end=offset + segments[-1].end, words=words)
         except Exception as e:
-            logger.error(f"Error transcribing {source} file {audio_file}: {e}")
-            # Check file size for debugging
-            try:
-                file_size = os.path.getsize(audio_file)
-                logger.info(f"{source} audio file size: {file_size} bytes")
-            except:
-                pass
+            logger.error(f"Error transcribing {source} {label}: {e}")
+        finally:
+            with session.lock:
+                session.decodes.discard(future)
+            # Clean up the audio file
+            on_done()
+    
+    def remove_audio_file(self, audio_file):
+        try:
+            os.unlink(audio_file)
+        except:
+            pass
 
 def main():
     """Main function"""
-    backend = ElectronBackend()
+    parser = argparse.ArgumentParser(description="Cognition Electron backend")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--device", default="cpu", help="cpu or cuda")
+    parser.add_argument("--compute-type", default="int8", help="CTranslate2 compute type")
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--autotune", action="store_true",
+                        help="pick model/beam from the cached host calibration and adjust them live")
+    parser.add_argument("--calibrate", action="store_true",
+                        help="re-run the host calibration, print the result and exit")
+    parser.add_argument("--daemon", action="store_true",
+                        help="serve clients over a Unix socket instead of stdin/stdout")
+    parser.add_argument("--socket", default=None, help="socket path for --daemon")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve Prometheus metrics on 127.0.0.1:<port>/metrics")
+    parser.add_argument("--audio-source", default=None, metavar="SPEC",
+                        help="mic input: sounddevice, replay:<file>[@speed] or synthetic[:speakers][@speed] "
+                             "(speed a factor or max)")
+    parser.add_argument("--profile", nargs="?", const="", default=None, metavar="TRACE.json",
+                        help="record a sampled profile of the whole run as a Chrome trace (default: temp dir)")
+    args = parser.parse_args()
+    
+    if args.calibrate:
+        result = AutoTuner(device=args.device).calibrate(force=True)
+        print(json.dumps({k: result[k] for k in ("model_size", "compute_type", "beam_size", "rtf", "measurements")}, indent=2))
+        return
+    
+    try:
+        audio_source = source_factory(args.audio_source) if args.audio_source else None
+    except ValueError as e:
+        parser.error(str(e))
+    
+    backend = ElectronBackend(
+        model_size=args.model,
+        device=args.device,
+        compute_type=args.compute_type,
+        beam_size=args.beam_size,
+        autotune=args.autotune or os.environ.get("COGNITION_AUTOTUNE") == "1",
+        stdio=not args.daemon,
+        metrics_port=args.metrics_port,
+        profile=(args.profile or default_profile_path()) if args.profile is not None else None,
+        audio_source=audio_source,
+    )
+    # A profile still running at exit (--profile, or PROFILE_START without STOP) is
+    # written out; Electron ends the backend with SIGTERM, so that exits normally too
+    atexit.register(backend.profiler.stop)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    if args.daemon:
+        from daemon import BackendDaemon
+        try:
+            BackendDaemon(backend, args.socket).serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Shutting down...")
+        backend.stop_listening()
+        return
     backend.run()
 
 if __name__ == "__main__":
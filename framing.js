@@ -0,0 +1,58 @@
+// Length-prefixed framing for the backend socket (mirrors framing.py)
+// Frame: [header length u32 BE][payload length u32 BE][JSON header][payload]
+
+const FRAMED_HANDSHAKE = 'PROTOCOL:framed';
+const PREFIX_SIZE = 8;
+
+let nextMessageId = 1;
+
+function encodeFrame(header, payload = Buffer.alloc(0)) {
+  const headerBytes = Buffer.from(JSON.stringify(header), 'utf8');
+  const prefix = Buffer.alloc(PREFIX_SIZE);
+  prefix.writeUInt32BE(headerBytes.length, 0);
+  prefix.writeUInt32BE(payload.length, 4);
+  return Buffer.concat([prefix, headerBytes, payload]);
+}
+
+// Header for one message; ts (seconds, like Python's time.time()) lets the backend measure latency
+function messageHeader(type, data, meta = {}) {
+  const header = { type, id: nextMessageId++, ts: Date.now() / 1000, ...meta };
+  if (data !== undefined && data !== null) {
+    header.data = data;
+  }
+  return header;
+}
+
+// A text command line ("START", "AGENT:sales") as a frame
+function encodeCommand(line) {
+  const separator = line.indexOf(':');
+  if (separator === -1) {
+    return encodeFrame(messageHeader(line));
+  }
+  return encodeFrame(messageHeader(line.slice(0, separator), line.slice(separator + 1)));
+}
+
+class FrameDecoder {
+  constructor() {
+    this.buffer = Buffer.alloc(0);
+  }
+
+  // Append a chunk; returns the [{ header, payload }] frames now complete
+  push(chunk) {
+    this.buffer = this.buffer.length ? Buffer.concat([this.buffer, chunk]) : chunk;
+    const frames = [];
+    while (this.buffer.length >= PREFIX_SIZE) {
+      const headerLength = this.buffer.readUInt32BE(0);
+      const payloadLength = this.buffer.readUInt32BE(4);
+      const end = PREFIX_SIZE + headerLength + payloadLength;
+      if (this.buffer.length < end) break;
+      const header = JSON.parse(this.buffer.subarray(PREFIX_SIZE, PREFIX_SIZE + headerLength).toString('utf8'));
+      const payload = this.buffer.subarray(PREFIX_SIZE + headerLength, end);
+      this.buffer = this.buffer.subarray(end);
+      frames.push({ header, payload });
+    }
+    return frames;
+  }
+}
+
+module.exports = { FRAMED_HANDSHAKE, encodeFrame, encodeCommand, messageHeader, FrameDecoder };
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Length-prefixed framing for the Electron <-> backend socket
+Each frame is an 8-byte prefix (header length, payload length; big-endian
+uint32), a UTF-8 JSON header and an optional raw payload such as PCM audio
+"""
+
+import json
+import struct
+import threading
+import time
+import numpy as np
+from audio_buffer import resample
+
+PREFIX = struct.Struct(">II")
+MAX_HEADER = 1 << 20
+MAX_PAYLOAD = 64 << 20
+
+# Sent as a line by a client that wants frames instead of text lines
+FRAMED_HANDSHAKE = "PROTOCOL:framed"
+
+# PCM payload encodings understood by decode_pcm
+PCM_DTYPES = {"s16le": "<i2", "f32le": "<f4"}
+
+class FrameError(ValueError):
+    pass
+
+def encode_frame(header, payload=b""):
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    return PREFIX.pack(len(header_bytes), len(payload)) + header_bytes + payload
+
+def read_frame(reader):
+    """Read one frame from a binary file-like object; None at a clean EOF"""
+    prefix = reader.read(PREFIX.size)
+    if not prefix:
+        return None
+    if len(prefix) < PREFIX.size:
+        raise FrameError("Truncated frame prefix")
+    header_len, payload_len = PREFIX.unpack(prefix)
+    if header_len > MAX_HEADER or payload_len > MAX_PAYLOAD:
+        raise FrameError(f"Frame too large ({header_len} + {payload_len} bytes)")
+    header_bytes = reader.read(header_len)
+    payload = reader.read(payload_len) if payload_len else b""
+    if len(header_bytes) < header_len or len(payload) < payload_len:
+        raise FrameError("Truncated frame")
+    return json.loads(header_bytes), payload
+
+class FrameDecoder:
+    """Incremental decoder for a byte stream that arrives in arbitrary pieces"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        """Append bytes; returns the list of (header, payload) frames now complete"""
+        self.buffer += data
+        frames = []
+        while len(self.buffer) >= PREFIX.size:
+            header_len, payload_len = PREFIX.unpack_from(self.buffer)
+            if header_len > MAX_HEADER or payload_len > MAX_PAYLOAD:
+                raise FrameError(f"Frame too large ({header_len} + {payload_len} bytes)")
+            end = PREFIX.size + header_len + payload_len
+            if len(self.buffer) < end:
+                break
+            header = json.loads(bytes(self.buffer[PREFIX.size:PREFIX.size + header_len]))
+            payload = bytes(self.buffer[PREFIX.size + header_len:end])
+            del self.buffer[:end]
+            frames.append((header, payload))
+        return frames
+
+class ProtocolStats:
+    """Per message type counts, payload bytes and transport latency of received frames"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.types = {}
+
+    def record(self, message_type, nbytes, latency=None):
+        with self.lock:
+            entry = self.types.setdefault(message_type, {"count": 0, "bytes": 0, "latency_total": 0.0, "latency_max": 0.0})
+            entry["count"] += 1
+            entry["bytes"] += nbytes
+            if latency is not None:
+                entry["latency_total"] += latency
+                entry["latency_max"] = max(entry["latency_max"], latency)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                message_type: {
+                    "count": e["count"],
+                    "bytes": e["bytes"],
+                    "avg_latency_ms": round(e["latency_total"] / e["count"] * 1000, 2),
+                    "max_latency_ms": round(e["latency_max"] * 1000, 2),
+                }
+                for message_type, e in self.types.items()
+            }
+
+def message_header(message_type, message_id, data=None, **meta):
+    """Header for one protocol message; ``ts`` lets the receiver measure latency"""
+    header = {"type": message_type, "id": message_id, "ts": time.time()}
+    if data is not None:
+        header["data"] = data
+    header.update(meta)
+    return header
+
+def command_line(header):
+    """The text command a framed message stands for (``TYPE`` or ``TYPE:data``, ``@<session> `` first)"""
+    data = header.get("data")
+    command = header["type"] if data is None else f"{header['type']}:{data}"
+    return f"@{header['session']} {command}" if header.get("session") else command
+
+def split_session(line):
+    """(session ID or None, command) for a line that may start with ``@<session> ``"""
+    if line.startswith("@") and " " in line:
+        session_id, command = line[1:].split(" ", 1)
+        return session_id, command.strip()
+    return None, line
+
+def decode_pcm(payload, header, target_rate=16000):
+    """Raw PCM payload -> float32 mono at ``target_rate``"""
+    encoding = header.get("encoding", "f32le")
+    if encoding not in PCM_DTYPES:
+        raise FrameError(f"Unsupported PCM encoding: {encoding}")
+    audio = np.frombuffer(payload, dtype=PCM_DTYPES[encoding]).astype(np.float32)
+    if encoding == "s16le":
+        audio /= 32768.0
+
+    channels = int(header.get("channels", 1))
+    if channels > 1:
+        audio = audio[:len(audio) - len(audio) % channels].reshape(-1, channels).mean(axis=1)
+
+    return resample(audio, int(header.get("sample_rate", target_rate)), target_rate)
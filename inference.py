@@ -0,0 +1,382 @@
+#!/usr/bin/env python3
+"""
+Shared inference scheduler for the Electron backend
+Every decode (mic and system audio) goes through one bounded priority queue
+so callers never contend for the Whisper model directly
+"""
+
+import heapq
+import itertools
+import threading
+import time
+import wave
+from collections import Counter
+from concurrent.futures import Future
+import queue
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Lower value is served first
+PRIORITY_LIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# Whisper's window; the batched path decodes one window per request with no seeking
+MAX_BATCH_SECONDS = 30.0
+SAMPLE_RATE = 16000
+
+# Decode options the batched CTranslate2 path knows how to honour; chunks that
+# miss the compression/log-prob thresholds are decoded again on their own
+BATCHABLE_OPTIONS = {
+    "language", "beam_size", "condition_on_previous_text", "vad_filter",
+    "vad_parameters", "temperature", "compression_ratio_threshold", "log_prob_threshold",
+}
+
+class DecodedSegment:
+    """Minimal stand-in for faster-whisper's Segment from a batched decode"""
+    __slots__ = ("start", "end", "text", "words")
+
+    def __init__(self, start, end, text):
+        self.start = start
+        self.end = end
+        self.text = text
+        self.words = None
+
+class InferenceRequest:
+    __slots__ = ("audio", "options", "priority", "source", "session", "submitted_at", "future", "batch_key")
+
+    def __init__(self, audio, options, priority, source, session=None):
+        self.audio = audio
+        self.options = options
+        self.priority = priority
+        self.source = source
+        self.session = session
+        self.submitted_at = time.time()
+        self.future = Future()
+        self.batch_key = self.make_batch_key(options, audio_seconds(audio))
+
+    @staticmethod
+    def make_batch_key(options, seconds=None):
+        """
+        Requests with equal keys can share one encoder/generate call. Word
+        timestamps, prompts and audio longer than one Whisper window (or of
+        unknown length) need the full transcribe() and get None.
+        """
+        if not set(options) <= BATCHABLE_OPTIONS:
+            return None
+        if seconds is None or seconds > MAX_BATCH_SECONDS:
+            return None
+        temperature = options.get("temperature", 0.0)
+        if isinstance(temperature, (list, tuple)):
+            return None
+        vad_filter = bool(options.get("vad_filter", False))
+        return (
+            options.get("language", "en"),
+            options.get("beam_size", 5),
+            vad_filter,
+            # VAD parameters only matter when the filter runs
+            repr(sorted((options.get("vad_parameters") or {}).items())) if vad_filter else None,
+            temperature,
+            options.get("compression_ratio_threshold"),
+            options.get("log_prob_threshold"),
+        )
+
+def audio_seconds(audio):
+    """Length of an array at 16 kHz or of a WAV file; None if it cannot be told cheaply"""
+    if not isinstance(audio, str):
+        return len(audio) / SAMPLE_RATE
+    try:
+        with wave.open(audio, 'rb') as f:
+            return f.getnframes() / f.getframerate()
+    except (OSError, EOFError, wave.Error):
+        return None
+
+class InferenceScheduler:
+    """
+    Single owner of the Whisper model.
+    Callers submit audio (array or file path) with decode options and get a
+    Future back. A worker thread serves the highest priority request first and,
+    when other queued requests use compatible options, decodes them together in
+    one batched CTranslate2 call (one untimed segment per request, so only
+    chunks within one Whisper window qualify; streaming decodes, which need
+    word timestamps, never batch). Requests of equal priority from different
+    sessions are served round-robin, so a long batch session cannot starve a
+    live one; ``max_queue`` bounds each session's pending requests.
+    """
+
+    def __init__(self, model, max_queue=32, max_batch=4, batch_window=0.02, num_workers=1):
+        self.model = model
+        self.max_queue = max_queue
+        self.max_batch = max_batch
+        self.batch_window = batch_window  # how long a batchable request waits for company
+
+        self._heap = []
+        self._counter = itertools.count()
+        self._served = itertools.count()
+        self._last_served = {}  # session -> serve order of its last request
+        self._condition = threading.Condition()
+        self._running = True
+        self._model_ready = threading.Event()
+        if model is not None:
+            self._model_ready.set()
+
+        # Stats
+        self.completed = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_decode = 0.0
+        self.busy_time = 0.0  # wall time the workers spent decoding
+        self.completed_by_session = Counter()
+        # Called as listener(requests, decode_seconds) after every decode, on the worker
+        self.listeners = []
+
+        self._workers = []
+        for i in range(num_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"inference-{i}")
+            worker.daemon = True
+            worker.start()
+            self._workers.append(worker)
+
+    def set_model(self, model):
+        """Install (or swap) the model; requests queued before the first one was set start decoding"""
+        self.model = model
+        self._model_ready.set()
+
+    def submit(self, audio, priority=PRIORITY_LIVE, source=None, session=None, **options):
+        """Queue a decode; raises queue.Full when the session's queue is at capacity"""
+        request = InferenceRequest(audio, options, priority, source, session)
+        with self._condition:
+            if sum(1 for _, _, r in self._heap if r.session == session) >= self.max_queue:
+                raise queue.Full(f"Inference queue full ({self.max_queue} pending)")
+            heapq.heappush(self._heap, (priority, next(self._counter), request))
+            self._condition.notify()
+        return request.future
+
+    def transcribe(self, audio, priority=PRIORITY_LIVE, source=None, session=None, **options):
+        """Blocking drop-in for WhisperModel.transcribe; returns (segments, info)"""
+        return self.submit(audio, priority=priority, source=source, session=session, **options).result()
+
+    def queue_depth(self):
+        with self._condition:
+            return len(self._heap)
+
+    def oldest_wait(self, source=None, session=None):
+        """Seconds the oldest pending request (optionally of one source/session) has waited"""
+        with self._condition:
+            oldest = min((r.submitted_at for _, _, r in self._heap
+                          if (source is None or r.source == source)
+                          and (session is None or r.session == session)), default=None)
+        return time.time() - oldest if oldest else 0.0
+
+    def drop_oldest(self, source=None, keep=1, session=None):
+        """Cancel the oldest pending requests of a source (and session), keeping the newest ``keep``"""
+        with self._condition:
+            pending = sorted(
+                (r.submitted_at, i) for i, (_, _, r) in enumerate(self._heap)
+                if (source is None or r.source == source) and (session is None or r.session == session)
+            )
+            drop = {i for _, i in pending[:max(0, len(pending) - keep)]}
+            if not drop:
+                return 0
+            dropped = [entry[2] for i, entry in enumerate(self._heap) if i in drop]
+            self._heap = [entry for i, entry in enumerate(self._heap) if i not in drop]
+            heapq.heapify(self._heap)
+        for request in dropped:
+            request.future.cancel()
+        return len(dropped)
+
+    def stats(self):
+        with self._condition:
+            depth = len(self._heap)
+            oldest = min((r.submitted_at for _, _, r in self._heap), default=None)
+        return {
+            "queue_depth": depth,
+            "oldest_wait_ms": round((time.time() - oldest) * 1000, 1) if oldest else 0.0,
+            "completed": self.completed,
+            "avg_wait_ms": round(self.total_wait / self.completed * 1000, 1) if self.completed else 0.0,
+            "max_wait_ms": round(self.max_wait * 1000, 1),
+            "avg_decode_ms": round(self.total_decode / self.completed * 1000, 1) if self.completed else 0.0,
+            "batches": self.batches,
+            "batched_requests": self.batched_requests,
+            "busy_seconds": round(self.busy_time, 2),
+            "completed_by_session": {str(k): v for k, v in self.completed_by_session.items()},
+        }
+
+    def shutdown(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+
+    def _fair_order(self, entry):
+        """Sort key: priority, then the session served longest ago, then arrival"""
+        priority, order, request = entry
+        return priority, self._last_served.get(request.session, -1), order
+
+    def _next_batch(self):
+        """Pop the most urgent request plus any compatible ones (lock held)"""
+        entries = sorted(self._heap, key=self._fair_order)
+        request = entries[0][2]
+        batch = [request]
+        remaining = entries[1:]
+        if request.batch_key is not None and self.max_batch > 1:
+            # Companions are taken in the same fair order, so other sessions get seats first
+            remaining = []
+            for entry in entries[1:]:
+                other = entry[2]
+                if len(batch) < self.max_batch and other.batch_key == request.batch_key:
+                    batch.append(other)
+                else:
+                    remaining.append(entry)
+        for served in batch:
+            self._last_served[served.session] = next(self._served)
+        heapq.heapify(remaining)
+        self._heap = remaining
+        return batch
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                while self._running and not self._heap:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                # Mic and system chunks rarely land in the same instant; give a
+                # batchable request a few ms for a compatible one to show up
+                if self._heap[0][2].batch_key is not None and len(self._heap) == 1 and self.batch_window > 0:
+                    self._condition.wait(self.batch_window)
+                    if not self._heap:
+                        continue
+                batch = self._next_batch()
+
+            # Requests can be queued during startup, before there is a model
+            self._model_ready.wait()
+            batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            start_time = time.time()
+            for request in batch:
+                wait = start_time - request.submitted_at
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+
+            try:
+                if len(batch) == 1:
+                    results = [self._decode_single(batch[0])]
+                else:
+                    results = self._decode_batch(batch)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+                continue
+
+            decode_time = time.time() - start_time
+            self.total_decode += decode_time * len(batch)
+            self.busy_time += decode_time
+            self.completed += len(batch)
+            self.completed_by_session.update(request.session for request in batch)
+            for listener in self.listeners:
+                try:
+                    listener(batch, decode_time)
+                except Exception as e:
+                    logger.error(f"Inference listener failed: {e}")
+            for request, result in zip(batch, results):
+                request.future.set_result(result)
+
+    def _decode_single(self, request):
+        segments, info = self.model.transcribe(request.audio, **request.options)
+        # Segments are generated lazily; run the decode here, on the worker
+        return list(segments), info
+
+    def _decode_batch(self, batch):
+        """Decode several short chunks with one encoder pass and one generate call"""
+        try:
+            results = self._generate_batched(batch)
+            # Only decodes that really shared a generate call count as batched
+            self.batches += 1
+            self.batched_requests += len(batch)
+            return results
+        except Exception as e:
+            logger.warning(f"Batched decode failed, decoding one by one: {e}")
+            return [self._decode_single(request) for request in batch]
+
+    def _generate_batched(self, batch):
+        from faster_whisper.audio import decode_audio, pad_or_trim
+        from faster_whisper.tokenizer import Tokenizer
+        from faster_whisper.transcribe import get_compression_ratio
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+
+        model = self.model
+        options = batch[0].options
+        sampling_rate = model.feature_extractor.sampling_rate
+
+        audios = []
+        for request in batch:
+            audio = request.audio
+            if isinstance(audio, str):
+                audio = decode_audio(audio, sampling_rate=sampling_rate)
+            audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+            if options.get("vad_filter"):
+                vad_options = VadOptions(**(options.get("vad_parameters") or {}))
+                chunks = get_speech_timestamps(audio, vad_options)
+                audio = np.concatenate([audio[c["start"]:c["end"]] for c in chunks]) if chunks else audio[:0]
+            audios.append(audio)
+
+        # Chunks that are pure silence after VAD never reach the encoder
+        results = [([], None) for _ in batch]
+        live = [i for i, audio in enumerate(audios) if len(audio) > 0]
+        if not live:
+            return results
+
+        features = np.stack([
+            pad_or_trim(model.feature_extractor(audios[i])[..., :-1]) for i in live
+        ])
+        tokenizer = Tokenizer(
+            model.hf_tokenizer,
+            model.model.is_multilingual,
+            task="transcribe",
+            language=options.get("language", "en"),
+        )
+        prompt = model.get_prompt(tokenizer, [], without_timestamps=True)
+        encoder_output = model.encode(features)
+        outputs = model.model.generate(
+            encoder_output,
+            [list(prompt) for _ in live],
+            beam_size=options.get("beam_size", 5),
+            max_length=model.max_length,
+            suppress_blank=True,
+            suppress_tokens=[-1],
+            sampling_temperature=options.get("temperature", 0.0),
+            return_scores=True,
+            return_no_speech_prob=True,
+        )
+
+        compression_ratio_threshold = options.get("compression_ratio_threshold")
+        log_prob_threshold = options.get("log_prob_threshold")
+        fallback = []
+        for i, output in zip(live, outputs):
+            tokens = output.sequences_ids[0]
+            # Same recovery of the average log prob as faster-whisper (length_penalty 1)
+            avg_logprob = output.scores[0] * len(tokens) / (len(tokens) + 1)
+            # Silence unless the decode is confident, as in transcribe()
+            if output.no_speech_prob > 0.6 and (
+                log_prob_threshold is None or avg_logprob <= log_prob_threshold
+            ):
+                continue
+            text = tokenizer.decode(tokens).strip()
+            if (
+                compression_ratio_threshold is not None
+                and get_compression_ratio(text) > compression_ratio_threshold
+            ) or (log_prob_threshold is not None and avg_logprob < log_prob_threshold):
+                # Repetitive or unsure: let transcribe() apply its own fallback
+                fallback.append(i)
+                continue
+            if text:
+                duration = len(audios[i]) / sampling_rate
+                results[i] = ([DecodedSegment(0.0, duration, text)], None)
+        for i in fallback:
+            results[i] = self._decode_single(batch[i])
+        return results
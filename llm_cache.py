@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+LLM response cache and near-duplicate gate for the agents
+Identical requests (same model, prompt and options) are answered from the
+cache, and requests whose new transcript adds almost nothing are not made
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.path.expanduser("~/.cognition/llm_cache.json")
+
+def request_key(model, messages, options):
+    """Content hash of everything that determines the completion"""
+    payload = json.dumps({"model": model, "messages": messages, "options": options}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class ResponseCache:
+    """
+    LRU cache of completions with a TTL.
+    With ``path`` set, entries survive restarts in a JSON file; put() only
+    marks the cache dirty, and a timer thread writes it ``save_delay`` seconds
+    later (one write for a burst of entries, never on the caller's thread),
+    with a last flush() at exit. COGNITION_LLM_CACHE=1 uses
+    ~/.cognition/llm_cache.json, any other value is taken as the path.
+    """
+
+    def __init__(self, max_entries=256, ttl=3600, path=None, save_delay=5.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        if path is None:
+            setting = os.environ.get("COGNITION_LLM_CACHE")
+            path = DEFAULT_CACHE_PATH if setting == "1" else setting
+        self.path = path
+        self.save_delay = save_delay
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()  # one writer of the file at a time
+        self.entries = OrderedDict()  # key -> (timestamp, text)
+        self.dirty = False
+        self.save_timer = None
+        self.reset_stats()
+        if self.path:
+            self.load()
+            atexit.register(self.flush)
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, text):
+        with self.lock:
+            self.entries[key] = (time.time(), text)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            if not self.path:
+                return
+            self.dirty = True
+            if self.save_timer is not None:
+                return
+            self.save_timer = threading.Timer(self.save_delay, self.flush)
+            self.save_timer.daemon = True
+            self.save_timer.start()
+
+    def flush(self):
+        """Write the entries out now if any changed since the last save"""
+        with self.save_lock:
+            with self.lock:
+                if self.save_timer is not None:
+                    self.save_timer.cancel()
+                    self.save_timer = None
+                if not self.dirty:
+                    return
+                self.dirty = False
+                snapshot = list(self.entries.items())
+            self.save(snapshot)
+
+    def record_skip(self):
+        """A call the near-duplicate gate decided not to make"""
+        with self.lock:
+            self.skipped += 1
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, (timestamp, text) in stored:
+            if now - timestamp <= self.ttl:
+                self.entries[key] = (timestamp, text)
+        logger.info(f"Loaded {len(self.entries)} cached LLM responses from {self.path}")
+
+    def save(self, snapshot):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Write then rename, so a crash never leaves half a file
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            logger.error(f"Could not save LLM cache to {self.path}: {e}")
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "skipped_near_duplicates": self.skipped,
+                "calls_saved": self.hits + self.skipped,
+                "persistent": bool(self.path),
+            }
+
+def words(text):
+    # Speaker labels and turn timestamps are not content
+    return re.findall(r"[a-z0-9']+", re.sub(r"\[(rep|prospect|[\d:]+)\]", " ", text.lower()))
+
+class NoveltyGate:
+    """
+    Decides whether new transcript is worth an LLM call: at least
+    ``min_new_words`` words that were not in the text the previous call of the
+    same kind was made for (so repeated utterances and "yeah, okay" do not count).
+    """
+
+    def __init__(self, min_new_words=4):
+        self.min_new_words = min_new_words
+        self.lock = threading.Lock()
+        self.previous = {}  # kind -> set of words of the last text a call was made for
+
+    def reset(self):
+        with self.lock:
+            self.previous = {}
+
+    def new_words(self, kind, text):
+        with self.lock:
+            seen = self.previous.get(kind, set())
+        return len(set(words(text)) - seen)
+
+    def accept(self, kind, text):
+        """True (and remember ``text``) when it is novel enough for a call"""
+        if self.new_words(kind, text) < self.min_new_words:
+            return False
+        with self.lock:
+            self.previous[kind] = set(words(text))
+        return True
@@ -1,6 +1,8 @@
 const { app, BrowserWindow, ipcMain, dialog, systemPreferences, shell } = require('electron');
 const path = require('path');
 const { spawn } = require('child_process');
+const net = require('net');
+const { FRAMED_HANDSHAKE, encodeCommand, FrameDecoder } = require('./framing');
 const { startRecording, stopRecording } = require('./macos-system-audio/recording');
 const os = require('os');
 const ffmpeg = require('fluent-ffmpeg');
@@ -13,6 +15,17 @@ const checkSystemAudioPermission = require('./macos-system-audio/permission').ch
 
 let mainWindow;
 let pythonProcess;
+// Daemon mode (default): the backend outlives the app and is reached over a Unix socket.
+// COGNITION_BACKEND=stdio spawns a private child process per app run instead.
+const backendMode = process.env.COGNITION_BACKEND || 'daemon';
+const backendSocketPath = process.env.COGNITION_SOCKET || path.join(os.tmpdir(), `cognition-${os.userInfo().uid}.sock`);
+let backendSocket = null;
+let backendConnected = false;
+let backendReconnectDelay = 250;
+let backendDaemonSpawned = false;
+// This app run started the daemon, so it also stops it on quit
+let backendDaemonOwned = false;
+let appQuitting = false;
 let isListening = false;
 let micInstance = null;
 let micStream = null;
@@ -110,12 +123,98 @@ async function createWindow() {
   // Handle window close
   mainWindow.on('closed', () => {
     mainWindow = null;
+    // The daemon keeps running (and keeps its model loaded) for the next window
     if (pythonProcess) {
       pythonProcess.kill();
     }
   });
 }
 
+function startBackend() {
+  if (backendMode === 'stdio') {
+    startPythonBackend();
+  } else {
+    connectBackend();
+  }
+}
+
+// Write one command line to whichever backend transport is active
+function sendToBackend(line) {
+  if (backendConnected) {
+    backendSocket.write(encodeCommand(line));
+    return true;
+  }
+  if (pythonProcess) {
+    pythonProcess.stdin.write(`${line}\n`);
+    return true;
+  }
+  return false;
+}
+
+function backendAvailable() {
+  return backendConnected || !!pythonProcess;
+}
+
+// Connect to the backend daemon, starting it if nobody is listening yet
+function connectBackend() {
+  const socket = net.createConnection(backendSocketPath);
+  const decoder = new FrameDecoder();
+
+  socket.on('connect', () => {
+    // Switch this connection to length-prefixed frames
+    socket.write(`${FRAMED_HANDSHAKE}\n`);
+    backendSocket = socket;
+    backendConnected = true;
+    backendDaemonSpawned = false;
+    backendReconnectDelay = 250;
+    console.log('Connected to backend daemon:', backendSocketPath);
+    sendToWindow('get-agent');
+  });
+
+  socket.on('data', (chunk) => {
+    for (const frame of decoder.push(chunk)) {
+      handleBackendFrame(frame);
+    }
+  });
+
+  socket.on('error', (err) => {
+    if (!backendConnected && (err.code === 'ENOENT' || err.code === 'ECONNREFUSED') && !backendDaemonSpawned) {
+      spawnBackendDaemon();
+    } else if (err.code !== 'ENOENT' && err.code !== 'ECONNREFUSED') {
+      console.error('Backend socket error:', err);
+    }
+  });
+
+  socket.on('close', () => {
+    if (backendSocket === socket) {
+      backendSocket = null;
+      backendConnected = false;
+      console.log('Backend daemon connection closed');
+    }
+    if (!appQuitting) {
+      setTimeout(connectBackend, backendReconnectDelay);
+      backendReconnectDelay = Math.min(backendReconnectDelay * 2, 5000);
+    }
+  });
+}
+
+function spawnBackendDaemon() {
+  backendDaemonSpawned = true;
+  backendDaemonOwned = true;
+  const pythonPath = path.join(__dirname, 'venv', 'bin', 'python');
+  const scriptPath = path.join(__dirname, 'electron_backend.py');
+  const logFd = fs.openSync(path.join(userDataPath, 'backend.log'), 'a');
+
+  // Detached so a crashed or killed app does not take it down; before-quit sends SHUTDOWN
+  const daemon = spawn(pythonPath, [scriptPath, '--daemon', '--socket', backendSocketPath], {
+    detached: true,
+    stdio: ['ignore', logFd, logFd]
+  });
+  daemon.unref();
+  fs.closeSync(logFd);
+  console.log('Backend daemon started');
+}
+
 // Start Python backend process
 function startPythonBackend() {
   const pythonPath = path.join(__dirname, 'venv', 'bin', 'python');
@@ -125,6 +224,7 @@ function startPythonBackend() {
     stdio: ['pipe', 'pipe', 'pipe']
   });
 
+  stdoutPending = '';
   pythonProcess.stdout.on('data', handlePythonStdout);
 
   pythonProcess.stderr.on('data', (data) => {
@@ -140,31 +240,31 @@ function startPythonBackend() {
 
 // IPC handlers
 ipcMain.handle('start-listening', async () => {
-  if (!isListening && pythonProcess) {
+  if (!isListening && backendAvailable()) {
     isListening = true;
     // Send current agent to backend
     if (mainWindow) {
       mainWindow.webContents.send('get-agent');
     }
-    pythonProcess.stdin.write('START\n');
+    sendToBackend('START');
     return { success: true };
   }
   return { success: false, error: 'Already listening or backend not ready' };
 });
 
 ipcMain.handle('stop-listening', async () => {
-  if (isListening && pythonProcess) {
+  if (isListening && backendAvailable()) {
     isListening = false;
-    pythonProcess.stdin.write('STOP\n');
+    sendToBackend('STOP');
     return { success: true };
   }
   return { success: false, error: 'Not listening' };
 });
 
 ipcMain.handle('set-agent', async (event, agent) => {
-  if (pythonProcess) {
+  if (backendAvailable()) {
     console.log(`[DEBUG] Sending AGENT:${agent} to Python backend`);
-    pythonProcess.stdin.write(`AGENT:${agent}\n`);
+    sendToBackend(`AGENT:${agent}`);
     return { success: true };
   }
   return { success: false };
@@ -240,13 +340,12 @@ function writeWavFile(filePath, audioData, sampleRate = 16000, channels = 1, bit
 
 // Unified listening: mic + system audio chunked, mixing, and sending to backend
 ipcMain.handle('start-unified-listening', async () => {
-  if (isListening || !pythonProcess) return { success: false, error: 'Already listening or backend not ready' };
+  if (isListening || !backendAvailable()) return { success: false, error: 'Already listening or backend not ready' };
   isListening = true;
 
   // Start system audio recording (to a temp file, will rotate)
   const sysDir = os.tmpdir();
   let sysBase = `sys-chunk-${uuidv4()}`; // Changed from const to let
-  let sysChunkIdx = 0;
   await startRecording({ filepath: sysDir, filename: sysBase });
   systemAudioActive = true;
   console.log(`System audio recording started: ${sysDir}/${sysBase}.wav`);
@@ -255,19 +354,19 @@ ipcMain.handle('start-unified-listening', async () => {
   console.log('Enabling microphone via Python backend for dual audio transcription');
   
   // Send START command to Python backend to enable microphone
-  pythonProcess.stdin.write('START\n');
+  sendToBackend('START');
   
   // The Python backend will handle microphone recording and chunking automatically
   // It already has the perfect 3-second chunking logic implemented
 
-  // System audio chunking with file rotation
-  let currentAudioPosition = 0; // in seconds
-  let sysChunkStartTime = Date.now();
-  const CHUNK_DURATION = 3000; // 3 seconds in milliseconds
+  // System audio: the backend tails the recorder's WAV itself and windows it like
+  // the mic. Each rotated file is handed over and read on from where the last ended.
+  sendToBackend(`SYS_STREAM_FILE:${sysDir}/${sysBase}.wav`);
+
   const MAX_FILE_DURATION = 10; // Rotate file every 10 seconds (before Swift recorder stops)
   let currentFileStartTime = Date.now();
   
-  console.log('Starting system audio chunking with file rotation');
+  console.log('Streaming system audio to the backend with file rotation');
   
   // Function to rotate system audio recording
   async function rotateSystemAudioRecording() {
@@ -275,13 +374,10 @@ ipcMain.handle('start-unified-listening', async () => {
       await stopRecording();
     }
     
-    const newSysBase = `sys-chunk-${uuidv4()}`;
-    await startRecording({ filepath: sysDir, filename: newSysBase });
-    
-    // Update file path and reset position
-    sysBase = newSysBase;
-    currentAudioPosition = 0;
+    sysBase = `sys-chunk-${uuidv4()}`;
+    await startRecording({ filepath: sysDir, filename: sysBase });
     currentFileStartTime = Date.now();
+    sendToBackend(`SYS_STREAM_FILE:${sysDir}/${sysBase}.wav`);
     
     console.log(`Rotated system audio recording to: ${sysDir}/${sysBase}.wav`);
   }
@@ -290,109 +386,30 @@ ipcMain.handle('start-unified-listening', async () => {
   let lastFileSize = 0;
   let noGrowthCount = 0;
   
-  // Start chunk interval - process system audio every 3 seconds
   chunkInterval = setInterval(async () => {
     if (!isListening) return;
     
-    const now = Date.now();
-    const elapsed = now - sysChunkStartTime;
-    const fileElapsed = now - currentFileStartTime;
-    
-    // Check if we need to rotate the recording file
-    if (fileElapsed >= MAX_FILE_DURATION * 1000) {
-      console.log(`Rotating system audio file after ${fileElapsed/1000}s`);
+    if (Date.now() - currentFileStartTime >= MAX_FILE_DURATION * 1000) {
       await rotateSystemAudioRecording();
-    } else {
-      console.log(`File elapsed: ${fileElapsed/1000}s / ${MAX_FILE_DURATION}s`);
+      lastFileSize = 0;
+      noGrowthCount = 0;
+      return;
     }
     
-    // Only process if we have at least 3 seconds of audio
-    if (elapsed >= CHUNK_DURATION) {
-      console.log(`Processing system audio chunk ${sysChunkIdx} (${elapsed}ms elapsed, position: ${currentAudioPosition}s)`);
-      
-      // Extract the next 3 seconds from the system audio file
-      const sysFullPath = `${sysDir}/${sysBase}.wav`;
-      const sysChunkPath = `${os.tmpdir()}/${sysBase}-${sysChunkIdx}.wav`;
-      sysChunkIdx++;
-      
-      if (fs.existsSync(sysFullPath)) {
-        const currentFileSize = fs.statSync(sysFullPath).size;
-        
-        // Check if file has stopped growing (recording stopped)
-        if (currentFileSize === lastFileSize) {
-          noGrowthCount++;
-          if (noGrowthCount >= 3) { // File hasn't grown for 3 consecutive checks
-            console.log(`File stopped growing after ${noGrowthCount} checks, rotating...`);
-            await rotateSystemAudioRecording();
-            noGrowthCount = 0;
-            lastFileSize = 0;
-            // Reset timer for next chunk
-            sysChunkStartTime = now;
-            return; // Exit this iteration
-          }
-        } else {
-          noGrowthCount = 0; // Reset counter if file is growing
-        }
-        lastFileSize = currentFileSize;
-        
-                if (currentFileSize > 100000) { // ~100KB threshold
-          try {
-            // Get the total duration of the audio file
-            const duration = await new Promise((resolve, reject) => {
-              ffmpeg.ffprobe(sysFullPath, (err, metadata) => {
-                if (err) {
-                  console.error('Error getting audio duration:', err);
-                  resolve(0);
-                } else {
-                  resolve(metadata.format.duration || 0);
-                }
-              });
-            });
-            
-            // Only extract if we have new audio content (at least 3 seconds more than current position)
-            if (duration > currentAudioPosition + 3) {
-              // Extract 3s WAV chunk starting from current position
-              await new Promise((resolve, reject) => {
-                ffmpeg(sysFullPath)
-                  .setStartTime(currentAudioPosition)
-                  .duration(3)
-                  .audioCodec('pcm_s16le')
-                  .audioChannels(1)
-                  .audioFrequency(16000)
-                  .format('wav')
-                  .on('end', () => {
-                    console.log(`System audio chunk extracted: ${sysChunkPath} (from ${currentAudioPosition}s to ${currentAudioPosition + 3}s)`);
-                    // Send system audio chunk to backend for transcription
-                    pythonProcess.stdin.write(`TRANSCRIBE_SYS:${sysChunkPath}\n`);
-                    resolve();
-                  })
-                  .on('error', (err) => {
-                    console.error('ffmpeg error extracting system chunk:', err);
-                    resolve();
-                  })
-                  .save(sysChunkPath);
-              });
-              
-              // Update position for next chunk
-              currentAudioPosition += 3;
-              console.log(`Updated audio position to: ${currentAudioPosition}s`);
-            } else {
-              console.log(`Not enough new audio content. Duration: ${duration}s, Current position: ${currentAudioPosition}s`);
-            }
-          } catch (err) {
-            console.error('Error extracting system audio chunk:', err);
-          }
-        } else {
-          console.warn(`System audio file not ready for chunk extraction (size: ${currentFileSize} bytes)`);
-        }
-      } else {
-        console.warn(`System audio file not found: ${sysFullPath}`);
+    // Restart the recorder if its file has stopped growing
+    const sysFullPath = `${sysDir}/${sysBase}.wav`;
+    if (fs.existsSync(sysFullPath)) {
+      const currentFileSize = fs.statSync(sysFullPath).size;
+      noGrowthCount = currentFileSize === lastFileSize ? noGrowthCount + 1 : 0;
+      lastFileSize = currentFileSize;
+      if (noGrowthCount >= 3) {
+        console.log(`File stopped growing after ${noGrowthCount} checks, rotating...`);
+        await rotateSystemAudioRecording();
+        lastFileSize = 0;
+        noGrowthCount = 0;
       }
-      
-      // Reset timer for next chunk
-      sysChunkStartTime = now;
     }
-  }, 1000); // Check every second, but only process every 3 seconds
+  }, 1000);
 
   console.log('Dual audio transcription enabled - both microphone and system audio will be transcribed');
 
@@ -408,7 +425,7 @@ ipcMain.handle('stop-unified-listening', async () => {
   if (systemAudioActive) await stopRecording();
   
   // Stop Python backend microphone recording
-  pythonProcess.stdin.write('STOP\n');
+  sendToBackend('STOP');
   
   // Clear buffers
   micChunks = [];
@@ -421,7 +438,7 @@ ipcMain.handle('stop-unified-listening', async () => {
 // Handle app events
 app.whenReady().then(() => {
   createWindow();
-  startPythonBackend();
+  startBackend();
 
   app.on('activate', () => {
     if (BrowserWindow.getAllWindows().length === 0) {
@@ -437,37 +454,114 @@ app.on('window-all-closed', () => {
 });
 
 app.on('before-quit', () => {
+  appQuitting = true;
+  if (backendSocket) {
+    // Never leave the daemon capturing with nobody watching
+    if (isListening) {
+      backendSocket.write(encodeCommand('STOP'));
+      isListening = false;
+    }
+    // A daemon someone else started stays warm for them; ours goes with us
+    backendSocket.end(encodeCommand(backendDaemonOwned ? 'SHUTDOWN' : 'QUIT'));
+  }
   if (pythonProcess) {
     pythonProcess.kill();
   }
 });
 
-// Listen for AGENT_OUTPUT from Python backend
+// Streamed agent pieces are single JSON lines
+const DELTA_TAGS = ['AGENT_OUTPUT_DELTA:', 'SUMMARY_DELTA:'];
+
+// Unfinished last line of the previous stdout chunk
+let stdoutPending = '';
+
+// Output of a stdio backend: text lines as they arrive on stdout
 function handlePythonStdout(data) {
-  const message = data.toString().trim();
+  // A line can be split across chunks; hold its start back until the newline arrives
+  const lines = (stdoutPending + data.toString()).split('\n');
+  stdoutPending = lines.pop();
+  // Deltas arrive in bursts, several per chunk; peel them off and hand the rest on as before
+  const rest = [];
+  for (const line of lines) {
+    if (DELTA_TAGS.some(tag => line.startsWith(tag))) {
+      handleBackendMessage(line);
+    } else {
+      rest.push(line);
+    }
+  }
+  const remaining = rest.join('\n').trim();
+  if (remaining) {
+    handleBackendMessage(remaining);
+  }
+}
+
+// One message from the daemon; frames keep multi-line payloads (AGENT_OUTPUT) in one piece
+function handleBackendFrame({ header }) {
+  // Other sessions (batch jobs, other calls) share the daemon; this window shows the default one
+  if (header.session) return;
+  if (header.reply_to !== undefined && header.latency_ms !== undefined) {
+    console.log(`Backend reply to audio frame ${header.reply_to}: ${header.latency_ms}ms`);
+  }
+  const message = header.data === undefined || header.data === null ? header.type : `${header.type}:${header.data}`;
+  handleBackendMessage(message);
+}
+
+// Messages can still arrive after the window is closed (the daemon outlives it)
+function sendToWindow(channel, ...args) {
+  if (mainWindow && !mainWindow.isDestroyed()) {
+    mainWindow.webContents.send(channel, ...args);
+  }
+}
+
+// Listen for AGENT_OUTPUT from Python backend
+function handleBackendMessage(message) {
   console.log('Python backend message:', message);
   
   if (message.startsWith('TRANSCRIPTION:')) {
     const transcription = message.replace('TRANSCRIPTION:', '').trim();
     console.log('Sending transcription to frontend:', transcription);
-    mainWindow.webContents.send('transcription-result', transcription);
+    sendToWindow('transcription-result', transcription);
+  } else if (message.startsWith('TRANSCRIPTION_PARTIAL:')) {
+    // Unconfirmed tail of the streaming transcription; replaced on every update
+    const partial = message.replace('TRANSCRIPTION_PARTIAL:', '').trim();
+    sendToWindow('transcription-partial', partial);
   } else if (message.startsWith('TRANSCRIPTION_MIC:')) {
     const transcription = message.replace('TRANSCRIPTION_MIC:', '').trim();
     console.log('Sending MIC transcription to frontend:', transcription);
-    mainWindow.webContents.send('transcription-result', `[Rep] ${transcription}`);
+    sendToWindow('transcription-result', `[Rep] ${transcription}`);
   } else if (message.startsWith('TRANSCRIPTION_SYS:')) {
     const transcription = message.replace('TRANSCRIPTION_SYS:', '').trim();
     console.log('Sending SYS transcription to frontend:', transcription);
-    mainWindow.webContents.send('transcription-result', `[Prospect] ${transcription}`);
+    sendToWindow('transcription-result', `[Prospect] ${transcription}`);
   } else if (message.startsWith('SENTIMENT:')) {
     const sentiment = message.replace('SENTIMENT:', '').trim();
-    mainWindow.webContents.send('sentiment-result', sentiment);
+    sendToWindow('sentiment-result', sentiment);
+  } else if (message.startsWith('AGENT_OUTPUT_DELTA:')) {
+    // {seq, text} for the meeting summary, {seq, suggestion} per finished sales suggestion
+    sendToWindow('agent-output-delta', message.replace('AGENT_OUTPUT_DELTA:', ''));
+  } else if (message.startsWith('SUMMARY_DELTA:')) {
+    sendToWindow('summary-delta', message.replace('SUMMARY_DELTA:', ''));
   } else if (message.startsWith('AGENT_OUTPUT:')) {
     const agentOutput = message.replace('AGENT_OUTPUT:', '').trim();
-    mainWindow.webContents.send('agent-output', agentOutput);
+    sendToWindow('agent-output', agentOutput);
+  } else if (message.startsWith('BACKPRESSURE:')) {
+    // Transcription is lagging behind real time (or has caught up again)
+    const status = message.replace('BACKPRESSURE:', '').trim();
+    sendToWindow('backpressure-status', status);
+  } else if (message.startsWith('SESSION:')) {
+    // Sent by the daemon on connect: pick up a session that outlived the previous window
+    const session = JSON.parse(message.replace('SESSION:', '').split('\n')[0]);
+    isListening = session.listening;
+  } else if (message.startsWith('LOADING:')) {
+    // Backend is up and accepting commands but the model is still loading
+    const status = message.replace('LOADING:', '').split('\n')[0];
+    sendToWindow('backend-status', JSON.stringify({ state: 'loading', ...JSON.parse(status) }));
+  } else if (message.startsWith('READY:')) {
+    const status = message.replace('READY:', '').split('\n')[0];
+    sendToWindow('backend-status', JSON.stringify({ state: 'ready', ...JSON.parse(status) }));
   } else if (message.startsWith('SUMMARY_UPDATE:')) {
     const summary = message.replace('SUMMARY_UPDATE:', '').trim();
-    mainWindow.webContents.send('summary-update', summary);
+    sendToWindow('summary-update', summary);
   }
 } 
 
@@ -530,8 +624,8 @@ ipcMain.handle('open-system-settings', (event, type) => {
 });
 
 ipcMain.handle('set-openai-key', async (event, key) => {
-  if (pythonProcess && key && key.startsWith('sk-')) {
-    pythonProcess.stdin.write(`OPENAI_KEY:${key}\n`);
+  if (backendAvailable() && key && key.startsWith('sk-')) {
+    sendToBackend(`OPENAI_KEY:${key}`);
     return { success: true };
   }
   return { success: false, error: 'Invalid key or backend not ready' };
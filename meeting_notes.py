@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Incremental map-reduce notes for the general agent
+While the meeting runs, every few minutes of transcript is summarised into
+partial notes in the background, and groups of partials are merged into
+higher-level notes; at STOP only the few remaining notes and the short
+untreated tail go into the final Minutes of Meeting request
+"""
+
+import asyncio
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class MeetingNotes:
+    """
+    Notes for one meeting (a new instance per START, so late jobs of an old
+    meeting never touch the next one).
+    add_turn() cuts the transcript into chunks of ``chunk_seconds`` (or
+    ``chunk_tokens``, whichever comes first) and maps each one to notes;
+    every ``fan_in`` consecutive notes of a level are reduced into one note
+    of the level above. final_input() waits for the jobs still running and
+    returns the notes plus the unsummarised tail, in meeting order.
+    """
+
+    def __init__(self, agents, prompts, counter, chunk_seconds=300, chunk_tokens=2000, fan_in=4):
+        self.agents = agents
+        self.prompts = prompts
+        self.counter = counter
+        self.chunk_seconds = chunk_seconds
+        self.chunk_tokens = chunk_tokens
+        self.fan_in = fan_in
+
+        self.lock = threading.Lock()
+        self.pending = []  # turns not yet in a chunk
+        self.pending_tokens = 0
+        self.chunk_started = None
+        self.chunks = 0
+        self.levels = [{}]  # level -> {index: notes}; a level-L index covers fan_in**L chunks
+        self.jobs = set()
+        self.closed = False
+
+    def add_turn(self, text):
+        with self.lock:
+            if self.closed:
+                return
+            if self.chunk_started is None:
+                self.chunk_started = time.time()
+            self.pending.append(text)
+            self.pending_tokens += self.counter.count(text)
+            if self.pending_tokens < self.chunk_tokens and time.time() - self.chunk_started < self.chunk_seconds:
+                return
+            chunk, index = "\n".join(self.pending), self.chunks
+            self.pending, self.pending_tokens, self.chunk_started = [], 0, None
+            self.chunks += 1
+        self.submit(lambda: self.map_chunk(index, chunk))
+
+    def submit(self, job):
+        future = self.agents.submit("notes", job)
+        with self.lock:
+            self.jobs.add(future)
+        future.add_done_callback(self.job_finished)
+
+    def job_finished(self, future):
+        with self.lock:
+            self.jobs.discard(future)
+
+    async def map_chunk(self, index, transcript):
+        notes = await self.summarise("notes", {"transcript": transcript}, transcript, max_tokens=400)
+        self.store(0, index, notes)
+
+    async def reduce_group(self, level, group, parts):
+        joined = "\n\n".join(parts)
+        notes = await self.summarise("notes_merge", {"notes": joined}, joined, max_tokens=600)
+        self.store(level + 1, group, notes)
+
+    async def summarise(self, template, values, fallback, **options):
+        try:
+            return await self.agents.chat(
+                [
+                    {"role": "system", "content": "You are a helpful meeting assistant."},
+                    {"role": "user", "content": self.prompts.render(template, **values)}
+                ],
+                temperature=0.3,
+                **options
+            )
+        except Exception as e:
+            # Keep the material itself so the final minutes still cover this part
+            logger.error(f"OpenAI error (meeting notes): {e}")
+            return fallback
+
+    def store(self, level, index, notes):
+        """Record a note; start the merge of its group once the whole group is there"""
+        with self.lock:
+            self.levels[level][index] = notes
+            group = index // self.fan_in
+            members = range(group * self.fan_in, (group + 1) * self.fan_in)
+            if not all(i in self.levels[level] for i in members):
+                return
+            if len(self.levels) == level + 1:
+                self.levels.append({})
+            parts = [self.levels[level][i] for i in members]
+        logger.info(f"Merging meeting notes: level {level} group {group}")
+        self.submit(lambda: self.reduce_group(level, group, parts))
+
+    async def final_input(self):
+        """Text for the final minutes: merged notes in meeting order, then the tail transcript"""
+        with self.lock:
+            self.closed = True
+            tail = "\n".join(self.pending)
+        # Merges can be started by the jobs being waited for, so look again until none are left
+        while True:
+            with self.lock:
+                jobs = list(self.jobs)
+            if not jobs:
+                break
+            await asyncio.gather(*(asyncio.wrap_future(job) for job in jobs), return_exceptions=True)
+
+        with self.lock:
+            if not self.chunks:
+                return tail  # short meeting: just the transcript, as before
+            # Highest levels first; a note is left out when a merged note already covers its chunks
+            covered = set()
+            notes = []
+            for level in range(len(self.levels) - 1, -1, -1):
+                span = self.fan_in ** level
+                for index in sorted(self.levels[level]):
+                    chunks = range(index * span, (index + 1) * span)
+                    if covered.isdisjoint(chunks):
+                        covered.update(chunks)
+                        notes.append((index * span, self.levels[level][index]))
+        sections = ["Notes from the earlier parts of the meeting, in order:\n" + "\n\n".join(text for _, text in sorted(notes))]
+        if tail:
+            sections.append("Transcript of the last part:\n" + tail)
+        logger.info(f"Final minutes from {len(notes)} notes covering {self.chunks} chunks")
+        return "\n\n".join(sections)
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Backend metrics: histograms, counters and gauges
+Recording a value is a bisect and a few adds under a lock, cheap enough for
+the audio and decode paths; snapshots go out as METRICS: JSON lines and, when
+a port is configured, as Prometheus text on a local HTTP endpoint
+"""
+
+import bisect
+import json
+import threading
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Seconds, from a few ms (one ring-buffer hop) to a stalled LLM call
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Decode time / audio time; above 1 decoding cannot keep up
+RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0)
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+
+def metric_name(name, labels):
+    """``name{k="v",...}`` as Prometheus writes a labelled series"""
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+class Histogram:
+    """Cumulative-bucket histogram; quantiles are interpolated within a bucket"""
+    __slots__ = ("bounds", "counts", "count", "total", "max")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else 0.0,
+            "p50": round(self.quantile(0.5), 4),
+            "p95": round(self.quantile(0.95), 4),
+            "p99": round(self.quantile(0.99), 4),
+            "max": round(self.max, 4),
+        }
+
+class Metrics:
+    """
+    Registry of labelled series. Gauges are callables read at snapshot time,
+    so values the backend already tracks (queue depth, dropped samples) cost
+    nothing on the hot path.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}  # (name, labels) -> Histogram
+        self.counters = {}    # (name, labels) -> number
+        self.gauges = {}      # (name, labels) -> callable
+        self.bounds = {}      # histogram name -> bucket bounds
+
+    def define(self, name, bounds):
+        """Buckets for a histogram (LATENCY_BUCKETS unless defined)"""
+        self.bounds[name] = tuple(bounds)
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.bounds.get(name, LATENCY_BUCKETS))
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def gauge(self, name, read, **labels):
+        """Register ``read()`` as the current value of a gauge"""
+        with self.lock:
+            self.gauges[(name, tuple(sorted(labels.items())))] = read
+
+    def reset(self):
+        """Clear histograms and counters (gauges stay registered)"""
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def read_gauges(self):
+        values = {}
+        for key, read in list(self.gauges.items()):
+            try:
+                values[key] = read()
+            except Exception as e:
+                logger.error(f"Gauge {metric_name(*key)} failed: {e}")
+        return values
+
+    def snapshot(self):
+        """JSON-friendly view: series name -> summary (histograms) or value"""
+        with self.lock:
+            histograms = {metric_name(*key): h.summary() for key, h in self.histograms.items()}
+            counters = {metric_name(*key): value for key, value in self.counters.items()}
+        return {
+            "histograms": histograms,
+            "counters": counters,
+            "gauges": {metric_name(*key): value for key, value in self.read_gauges().items()},
+        }
+
+    def prometheus(self, prefix="cognition_"):
+        """Prometheus text exposition format (version 0.0.4)"""
+        lines = []
+        typed = set()
+
+        def type_line(name, kind):
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+
+        with self.lock:
+            for (name, labels), h in sorted(self.histograms.items()):
+                name = prefix + name
+                type_line(name, "histogram")
+                cumulative = 0
+                for bound, n in zip(list(h.bounds) + ["+Inf"], h.counts):
+                    cumulative += n
+                    lines.append(f"{metric_name(name + '_bucket', labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{metric_name(name + '_sum', labels)} {h.total}")
+                lines.append(f"{metric_name(name + '_count', labels)} {h.count}")
+            for (name, labels), value in sorted(self.counters.items()):
+                type_line(prefix + name + "_total", "counter")
+                lines.append(f"{metric_name(prefix + name + '_total', labels)} {value}")
+        for (name, labels), value in sorted(self.read_gauges().items()):
+            type_line(prefix + name, "gauge")
+            lines.append(f"{metric_name(prefix + name, labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+class MetricsServer:
+    """GET /metrics on 127.0.0.1:<port>, served from a daemon thread"""
+
+    def __init__(self, metrics, port, host="127.0.0.1"):
+        registry = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] == "/metrics":
+                    body, content_type = registry.prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+                elif self.path.split("?")[0] == "/metrics.json":
+                    body, content_type = json.dumps(registry.snapshot()).encode("utf-8"), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # scrapes every few seconds would flood the log
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, name="metrics-http")
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+        host, port = self.server.server_address[:2]
+        logger.info(f"Metrics on http://{host}:{port}/metrics")
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
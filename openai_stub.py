@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the OpenAI chat completions endpoint
+Answers every request with a canned reply after a fixed delay (streamed in
+small pieces when the request asks for stream=True), so the agent path can be
+exercised offline:
+
+    python openai_stub.py --port 8765 --delay 2 --token-delay 0.05
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python electron_backend.py
+
+``python openai_stub.py --check`` runs AgentExecutor against it once (a
+completion and a streamed completion), checks that turns spoken while the
+sales agent was active make no notes of their own yet still reach the
+minutes input, and exits non-zero if any
+of it fails.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SALES_REPLY = json.dumps([
+    {"phrasing": "What happens if nothing changes this quarter?", "because_of": "They said 'we'll revisit it later'"},
+    {"phrasing": "Who else would need to sign off on a change like this?", "because_of": "They mentioned a platform team"},
+], indent=2)
+SUMMARY_REPLY = "- Prospect is evaluating options this quarter\n- Main concern is onboarding time"
+PIECE_SIZE = 4  # characters per streamed chunk, roughly a token
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(self.server.delay)
+
+        system = " ".join(m.get("content", "") for m in body.get("messages", []) if m.get("role") == "system")
+        content = SALES_REPLY if "sales assistant" in system else SUMMARY_REPLY
+        try:
+            if body.get("stream"):
+                self.stream_reply(body, content)
+                return
+            reply = json.dumps({
+                "id": f"chatcmpl-stub-{self.server.requests}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+            }).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(reply)))
+            self.end_headers()
+            self.wfile.write(reply)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client cancelled the request
+
+    def stream_reply(self, body, content):
+        """Server-sent events in the chat.completion.chunk format, ended by [DONE]"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        pieces = [content[i:i + PIECE_SIZE] for i in range(0, len(content), PIECE_SIZE)]
+        for piece in pieces + [None]:
+            chunk = {
+                "id": f"chatcmpl-stub-{self.server.requests}",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": piece} if piece is not None else {},
+                    "finish_reason": None if piece is not None else "stop",
+                }],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            if piece is not None:
+                time.sleep(self.server.token_delay)
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass
+
+def serve(port=8765, delay=1.0, token_delay=0.02):
+    """Start the stub in a background thread; returns the server (call shutdown() to stop)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.delay = delay
+    server.token_delay = token_delay
+    server.requests = 0
+    server.lock = threading.Lock()
+    thread = threading.Thread(target=server.serve_forever, name="openai-stub")
+    thread.daemon = True
+    thread.start()
+    return server
+
+def check(timeout=30.0):
+    """Round trip through AgentExecutor (a completion, a streamed completion) plus the minutes input; True if all pass"""
+    from agent_executor import AgentExecutor
+    from prompts import PromptRegistry
+    from sales_context import TokenCounter
+    from session import Session
+
+    server = serve(0, delay=0.0, token_delay=0.0)
+    executor = AgentExecutor(base_url=f"http://127.0.0.1:{server.server_port}/v1")
+    executor.set_api_key("stub")
+    try:
+        sales = [{"role": "system", "content": "You are a sales assistant."},
+                 {"role": "user", "content": "Prospect: we'll revisit it later"}]
+        reply = asyncio.run_coroutine_threadsafe(executor.chat(sales), executor.loop).result(timeout)
+        print(f"completion: {'ok' if reply == SALES_REPLY else 'unexpected reply'}")
+
+        pieces = []
+        summary = [{"role": "user", "content": "Summarize the meeting so far"}]
+        streamed = asyncio.run_coroutine_threadsafe(
+            executor.chat_stream(summary, pieces.append), executor.loop).result(timeout)
+        print(f"stream: {len(pieces)} pieces, {'ok' if streamed == SUMMARY_REPLY else 'unexpected reply'}")
+
+        # The minutes made at STOP cover the whole meeting, including a stretch on the sales agent
+        counter = TokenCounter()
+        session = Session("check", executor, PromptRegistry(counter=counter, check_interval=0), counter)
+        session.agent = "sales"
+        session.add_turn(0.0, 3.0, "SYS", "We'll revisit the budget next quarter")
+        # Nobody reads notes under the sales agent, so they take nothing (and call nothing) yet
+        idle = not session.meeting_notes.pending
+        session.agent = "general"
+        session.add_turn(3.0, 5.0, "MIC", "Let's recap the action items")
+        minutes_input = asyncio.run_coroutine_threadsafe(
+            session.meeting_notes.final_input(), executor.loop).result(timeout)
+        covered = idle and all(text in minutes_input for text in ("revisit the budget", "recap the action items"))
+        print(f"minutes input: {'ok' if covered else 'notes fed under sales' if not idle else 'missing turns'}")
+        return reply == SALES_REPLY and streamed == SUMMARY_REPLY and len(pieces) > 1 and covered
+    finally:
+        executor.shutdown()
+        server.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub OpenAI chat completions server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=1.0, help="seconds before each reply")
+    parser.add_argument("--token-delay", type=float, default=0.02, help="seconds between streamed pieces")
+    parser.add_argument("--check", action="store_true", help="round-trip AgentExecutor against the stub and exit")
+    args = parser.parse_args()
+
+    if args.check:
+        sys.exit(0 if check() else 1)
+
+    server = serve(args.port, args.delay, args.token_delay)
+    print(f"Stub OpenAI API on http://127.0.0.1:{args.port}/v1 (delay {args.delay}s)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Sampling profiler with Chrome trace output
+A background thread samples every thread's Python stack at a fixed interval
+and turns stack changes into begin/end events per thread; per-thread CPU time
+is recorded alongside as a counter, so a thread that shows a Python stack but
+burns no CPU is waiting (on a lock, the GIL or I/O). The result opens in
+chrome://tracing or ui.perfetto.dev.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+MAX_DEPTH = 64
+STAGE_TID_BASE = 1 << 30  # synthetic thread IDs for the explicit stage spans
+
+class SamplingProfiler:
+    """
+    start()/stop() may be called more than once; each stop() writes the
+    events recorded since the matching start(). ``span()`` adds explicit
+    stage timings (shown on a "<thread> stages" track next to the thread).
+    """
+
+    def __init__(self, interval=0.01, cpu_interval=0.1):
+        self.interval = interval
+        self.cpu_interval = cpu_interval
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+        self.path = None
+
+    def start(self, path):
+        with self.lock:
+            if self.running:
+                return False
+            self.path = path
+            self.events = []
+            self.frame_names = {}  # code object -> "function (file:line)"
+            self.stacks = {}  # thread ident -> tuple of frame names, outermost first
+            self.thread_names = {}
+            self.stage_tids = {}
+            self.cpu_times = {}
+            self.samples = 0
+            self.origin = time.perf_counter()
+            self.running = True
+        self.thread = threading.Thread(target=self.run, name="profiler")
+        self.thread.daemon = True
+        self.thread.start()
+        logger.info(f"Profiling every {self.interval * 1000:.0f}ms to {path}")
+        return True
+
+    def now(self):
+        """Current trace timestamp (microseconds since start)"""
+        return (time.perf_counter() - self.origin) * 1e6
+
+    def run(self):
+        own = threading.get_ident()
+        next_cpu = 0.0
+        while self.running:
+            started = time.perf_counter()
+            ts = (started - self.origin) * 1e6
+            names = {t.ident: t.name for t in threading.enumerate()}
+            frames = sys._current_frames()
+            with self.lock:
+                if not self.running:
+                    break
+                for ident, frame in frames.items():
+                    if ident != own:
+                        self.sample(ident, names.get(ident, f"thread-{ident}"), frame, ts)
+                # Threads that have exited close their open frames
+                for ident in [i for i in self.stacks if i not in frames]:
+                    self.transition(ident, (), ts)
+                    del self.stacks[ident]
+                if started >= next_cpu:
+                    self.sample_cpu(names, ts)
+                    next_cpu = started + self.cpu_interval
+                self.samples += 1
+            del frames
+            time.sleep(max(0.0, self.interval - (time.perf_counter() - started)))
+
+    def sample(self, ident, name, frame, ts):
+        if self.thread_names.get(ident) != name:
+            self.thread_names[ident] = name
+            self.events.append({"ph": "M", "name": "thread_name", "pid": os.getpid(), "tid": ident,
+                                "args": {"name": name}})
+        stack = []
+        while frame is not None and len(stack) < MAX_DEPTH:
+            code = frame.f_code
+            label = self.frame_names.get(code)
+            if label is None:
+                label = self.frame_names[code] = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+            stack.append(label)
+            frame = frame.f_back
+        stack.reverse()
+        self.transition(ident, tuple(stack), ts)
+
+    def transition(self, ident, stack, ts):
+        """Emit E for the frames that returned and B for the ones entered since the last sample"""
+        previous = self.stacks.get(ident, ())
+        common = 0
+        for old, new in zip(previous, stack):
+            if old != new:
+                break
+            common += 1
+        pid = os.getpid()
+        for name in reversed(previous[common:]):
+            self.events.append({"ph": "E", "name": name, "pid": pid, "tid": ident, "ts": ts})
+        for name in stack[common:]:
+            self.events.append({"ph": "B", "name": name, "pid": pid, "tid": ident, "ts": ts})
+        self.stacks[ident] = stack
+
+    def sample_cpu(self, names, ts):
+        """Per-thread CPU use since the last reading, as a percentage (Linux and most Unixes)"""
+        if not hasattr(time, "pthread_getcpuclockid"):
+            return
+        usage = {}
+        for ident, name in names.items():
+            try:
+                cpu = time.clock_gettime(time.pthread_getcpuclockid(ident))
+            except (OSError, OverflowError):
+                continue
+            last = self.cpu_times.get(ident)
+            self.cpu_times[ident] = (cpu, ts)
+            if last is not None and ts > last[1]:
+                usage[name] = round((cpu - last[0]) / ((ts - last[1]) / 1e6) * 100, 1)
+        if usage:
+            self.events.append({"ph": "C", "name": "thread cpu %", "pid": os.getpid(), "ts": ts, "args": usage})
+
+    def span(self, name, start, duration, **args):
+        """Record a stage that ran on the current thread from perf_counter ``start`` for ``duration`` s"""
+        if not self.running:
+            return
+        current = threading.current_thread()
+        with self.lock:
+            if not self.running:
+                return
+            tid = self.stage_tids.get(current.ident)
+            if tid is None:
+                tid = self.stage_tids[current.ident] = STAGE_TID_BASE + len(self.stage_tids)
+                self.events.append({"ph": "M", "name": "thread_name", "pid": os.getpid(), "tid": tid,
+                                    "args": {"name": f"{current.name} stages"}})
+            self.events.append({"ph": "X", "name": name, "pid": os.getpid(), "tid": tid,
+                                "ts": (start - self.origin) * 1e6, "dur": duration * 1e6, "args": args})
+
+    def stop(self):
+        """Stop sampling and write the trace; returns its path (None if not running)"""
+        with self.lock:
+            if not self.running:
+                return None
+            self.running = False
+        if self.thread is not threading.current_thread():
+            self.thread.join()
+        with self.lock:
+            ts = self.now()
+            for ident in list(self.stacks):
+                self.transition(ident, (), ts)
+            trace = {
+                "traceEvents": [{"ph": "M", "name": "process_name", "pid": os.getpid(),
+                                 "args": {"name": "cognition backend"}}] + self.events,
+                "displayTimeUnit": "ms",
+                "otherData": {
+                    "interval_ms": self.interval * 1000,
+                    "samples": self.samples,
+                    "duration_s": round(ts / 1e6, 2),
+                    "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(time.time() - ts / 1e6)),
+                },
+            }
+            path, self.events = self.path, []
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+        logger.info(f"Profile written to {path} ({trace['otherData']['samples']} samples)")
+        return path
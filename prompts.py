@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Prompt template registry
+Templates are read and checked once, compiled into literal/placeholder parts
+and rendered in one pass; a watcher thread reloads a file when it changes, so
+rendering never touches the disk
+"""
+
+import os
+import re
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+PROMPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (file, required placeholders, optional placeholders)
+PROMPTS = {
+    "general": ("prompt_general.txt", {"transcript"}, set()),
+    "sales": ("prompt_sales.txt", {"summary", "last_utterance"}, {"metadata"}),
+    "summary": ("prompt_summary.txt", {"previous_summary", "new_transcript"}, set()),
+    "notes": ("prompt_notes.txt", {"transcript"}, set()),
+    "notes_merge": ("prompt_notes_merge.txt", {"notes"}, set()),
+}
+
+# Only {identifier} is a placeholder; the JSON examples' braces are literal text
+PLACEHOLDER = re.compile(r"\{([a-z_][a-z0-9_]*)\}")
+
+class PromptError(ValueError):
+    pass
+
+class CompiledTemplate:
+    """Template text split at its placeholders, so render() is a single join"""
+
+    def __init__(self, text):
+        self.parts = []  # literal text and placeholder names, alternating
+        self.names = set()
+        position = 0
+        for match in PLACEHOLDER.finditer(text):
+            self.parts.append(text[position:match.start()])
+            self.parts.append(match.group(1))
+            self.names.add(match.group(1))
+            position = match.end()
+        self.parts.append(text[position:])
+
+    def render(self, values):
+        # Values are never scanned again, so a transcript containing "{summary}" stays as it is
+        return "".join(part if i % 2 == 0 else values.get(part, "") for i, part in enumerate(self.parts))
+
+class PromptRegistry:
+    """
+    Loads the PROMPTS templates from ``directory`` (the source directory by
+    default, whatever the working directory) and checks their placeholders.
+    A template that fails to load or check keeps its previous version; one
+    that never loaded raises PromptError on render.
+    """
+
+    def __init__(self, directory=None, prompts=None, counter=None, check_interval=2.0):
+        self.directory = directory or os.environ.get("COGNITION_PROMPT_DIR") or PROMPT_DIR
+        self.prompts = prompts or PROMPTS
+        self.counter = counter  # optional TokenCounter for the token stats
+        self.check_interval = check_interval
+
+        self.lock = threading.Lock()
+        self.templates = {}
+        self.mtimes = {}
+        self.template_stats = {
+            name: {"renders": 0, "tokens_total": 0, "tokens_max": 0, "loads": 0}
+            for name in self.prompts
+        }
+        for name in self.prompts:
+            self.load(name)
+
+        self.watcher = None
+        if check_interval:
+            self.watcher = threading.Thread(target=self.watch, name="prompt-watcher")
+            self.watcher.daemon = True
+            self.watcher.start()
+
+    def path(self, name):
+        return os.path.join(self.directory, self.prompts[name][0])
+
+    def load(self, name):
+        filename, required, optional = self.prompts[name]
+        path = self.path(name)
+        try:
+            mtime = os.stat(path).st_mtime
+            with open(path, 'r', encoding='utf-8') as f:
+                template = CompiledTemplate(f.read())
+        except OSError as e:
+            logger.error(f"Could not read prompt file {path}: {e}")
+            return False
+        missing = required - template.names
+        unknown = template.names - required - optional
+        with self.lock:
+            # Remember the mtime either way, so a broken file is reported once, not every check
+            self.mtimes[name] = mtime
+        if missing or unknown:
+            logger.error(f"Prompt {filename} rejected: missing {sorted(missing)}, unknown {sorted(unknown)}")
+            return False
+        with self.lock:
+            self.templates[name] = template
+            self.template_stats[name]["loads"] += 1
+        return True
+
+    def watch(self):
+        while True:
+            time.sleep(self.check_interval)
+            for name in self.prompts:
+                try:
+                    mtime = os.stat(self.path(name)).st_mtime
+                except OSError:
+                    continue
+                if mtime != self.mtimes.get(name) and self.load(name):
+                    logger.info(f"Reloaded prompt {self.prompts[name][0]}")
+
+    def render(self, name, **values):
+        with self.lock:
+            template = self.templates.get(name)
+        if template is None:
+            raise PromptError(f"Prompt {name} is not available")
+        text = template.render(values)
+        tokens = self.counter.count(text) if self.counter else 0
+        with self.lock:
+            stats = self.template_stats[name]
+            stats["renders"] += 1
+            stats["tokens_total"] += tokens
+            stats["tokens_max"] = max(stats["tokens_max"], tokens)
+        return text
+
+    def stats(self):
+        with self.lock:
+            return {
+                name: {
+                    "renders": s["renders"],
+                    "avg_tokens": round(s["tokens_total"] / s["renders"], 1) if s["renders"] else 0.0,
+                    "max_tokens": s["tokens_max"],
+                    "loads": s["loads"],
+                }
+                for name, s in self.template_stats.items()
+            }
@@ -11,6 +11,7 @@ import numpy as np
 import sounddevice as sd
 from faster_whisper import WhisperModel
 import logging
+from audio_buffer import AudioRingBuffer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,8 +29,8 @@ class QuickTranscriber:
         self.chunk_duration = 3.0
         self.chunk_size = int(self.sample_rate * self.chunk_duration)
         
-        # Queues
-        self.audio_queue = queue.Queue()
+        # Capture ring buffer and output queue
+        self.audio_buffer = AudioRingBuffer(self.sample_rate * 60)
         self.transcription_queue = queue.Queue()
         
         # Control flags
@@ -46,32 +47,21 @@ class QuickTranscriber:
         if status:
             logger.warning(f"Audio callback status: {status}")
         
-        audio_data = indata.copy().astype(np.float32)
-        self.audio_queue.put(audio_data)
+        self.audio_buffer.write(indata[:, 0])
     
     def process_audio_chunks(self):
         """Process audio chunks and transcribe"""
-        audio_buffer = []
+        hop_size = self.chunk_size // 2
         
         while self.is_processing:
             try:
-                audio_chunk = self.audio_queue.get(timeout=0.1)
-                audio_buffer.append(audio_chunk)
+                window = self.audio_buffer.next_window(self.chunk_size, hop_size)
+                if window is None:
+                    self.audio_buffer.wait(self.chunk_size, timeout=0.1)
+                    continue
                 
-                total_samples = sum(len(chunk) for chunk in audio_buffer)
+                self.transcribe_chunk(window)
                 
-                if total_samples >= self.chunk_size:
-                    combined_audio = np.concatenate(audio_buffer)
-                    
-                    if len(combined_audio) > self.chunk_size:
-                        combined_audio = combined_audio[-self.chunk_size:]
-                    
-                    audio_buffer = [combined_audio[-self.chunk_size//2:]]
-                    
-                    self.transcribe_chunk(combined_audio)
-                    
-            except queue.Empty:
-                continue
             except Exception as e:
                 logger.error(f"Error processing audio: {e}")
     
@@ -80,20 +70,10 @@ class QuickTranscriber:
         try:
             start_time = time.time()
             
-            import tempfile
-            import wave
-            
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_filename = temp_file.name
-            
-            with wave.open(temp_filename, 'wb') as wav_file:
-                wav_file.setnchannels(1)
-                wav_file.setsampwidth(2)
-                wav_file.setframerate(self.sample_rate)
-                wav_file.writeframes((audio_data * 32767).astype(np.int16).tobytes())
+            audio_data = np.asarray(audio_data, dtype=np.float32).reshape(-1)
             
             segments, info = self.model.transcribe(
-                temp_filename,
+                audio_data,
                 beam_size=5,
                 language="en",
                 condition_on_previous_text=False,
@@ -111,9 +91,6 @@ class QuickTranscriber:
                     'timestamp': time.time()
                 })
             
-            import os
-            os.unlink(temp_filename)
-            
         except Exception as e:
             logger.error(f"Error transcribing chunk: {e}")
     
@@ -11,6 +11,7 @@ import numpy as np
 import sounddevice as sd
 from faster_whisper import WhisperModel
 import logging
+from audio_buffer import AudioRingBuffer
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -35,8 +36,8 @@ class RealtimeTranscriber:
         self.chunk_duration = 3.0  # Process 3 seconds at a time
         self.chunk_size = int(self.sample_rate * self.chunk_duration)
         
-        # Queues for audio processing
-        self.audio_queue = queue.Queue()
+        # Capture ring buffer (written by the audio callback) and output queue
+        self.audio_buffer = AudioRingBuffer(self.sample_rate * 60)
         self.transcription_queue = queue.Queue()
         
         # Control flags
@@ -53,39 +54,23 @@ class RealtimeTranscriber:
         if status:
             logger.warning(f"Audio callback status: {status}")
         
-        # Convert to float32 and add to queue
-        audio_data = indata.copy().astype(np.float32)
-        self.audio_queue.put(audio_data)
+        # indata is already float32 mono; copy it straight into the ring buffer
+        self.audio_buffer.write(indata[:, 0])
     
     def process_audio_chunks(self):
         """Process audio chunks and transcribe"""
-        audio_buffer = []
+        hop_size = self.chunk_size // 2  # Keep half for overlap
         
         while self.is_processing:
             try:
-                # Get audio data from queue
-                audio_chunk = self.audio_queue.get(timeout=0.1)
-                audio_buffer.append(audio_chunk)
+                window = self.audio_buffer.next_window(self.chunk_size, hop_size)
+                if window is None:
+                    self.audio_buffer.wait(self.chunk_size, timeout=0.1)
+                    continue
                 
-                # Check if we have enough audio for a chunk
-                total_samples = sum(len(chunk) for chunk in audio_buffer)
+                # Transcribe the audio chunk
+                self.transcribe_chunk(window)
                 
-                if total_samples >= self.chunk_size:
-                    # Combine audio chunks
-                    combined_audio = np.concatenate(audio_buffer)
-                    
-                    # Keep only the last chunk_size samples
-                    if len(combined_audio) > self.chunk_size:
-                        combined_audio = combined_audio[-self.chunk_size:]
-                    
-                    # Reset buffer
-                    audio_buffer = [combined_audio[-self.chunk_size//2:]]  # Keep half for overlap
-                    
-                    # Transcribe the audio chunk
-                    self.transcribe_chunk(combined_audio)
-                    
-            except queue.Empty:
-                continue
             except Exception as e:
                 logger.error(f"Error processing audio: {e}")
     
@@ -94,23 +79,12 @@ class RealtimeTranscriber:
         try:
             start_time = time.time()
             
-            # Save audio to temporary file (Whisper expects a file)
-            import tempfile
-            import wave
-            
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_filename = temp_file.name
-            
-            # Save as WAV file
-            with wave.open(temp_filename, 'wb') as wav_file:
-                wav_file.setnchannels(1)  # Mono
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(self.sample_rate)
-                wav_file.writeframes((audio_data * 32767).astype(np.int16).tobytes())
+            # Whisper takes 16kHz mono float32 directly, no temp WAV file needed
+            audio_data = np.asarray(audio_data, dtype=np.float32).reshape(-1)
             
             # Transcribe
             segments, info = self.model.transcribe(
-                temp_filename,
+                audio_data,
                 beam_size=5,
                 language="en",
                 condition_on_previous_text=False,
@@ -132,10 +106,6 @@ class RealtimeTranscriber:
                     'timestamp': time.time()
                 })
             
-            # Clean up temp file
-            import os
-            os.unlink(temp_filename)
-            
         except Exception as e:
             logger.error(f"Error transcribing chunk: {e}")
     
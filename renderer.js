@@ -38,9 +38,11 @@ const settingsSavedMsg = document.getElementById('settingsSavedMsg');
 // State
 let isListening = false;
 let transcriptionHistory = [];
+let partialTranscription = '';
 let salesActionItems = [];
 let expandedIndex = null;
 let aiSummary = ""; // Store AI-generated summary
+let streamingAgentText = ''; // Meeting summary while it streams in
 let salesLeftPaneMode = 'summary'; // Default
 let currentAgent = 'general'; // Added for the new agent dropdown logic
 
@@ -182,9 +184,14 @@ function setupEventListeners() {
     
     // IPC listeners
     ipcRenderer.on('transcription-result', handleTranscriptionResult);
+    ipcRenderer.on('transcription-partial', handleTranscriptionPartial);
+    ipcRenderer.on('backpressure-status', handleBackpressureStatus);
+    ipcRenderer.on('backend-status', handleBackendStatus);
     ipcRenderer.on('sentiment-result', handleSentimentResult);
     ipcRenderer.on('agent-output', handleAgentOutput);
     ipcRenderer.on('summary-update', handleSummaryUpdate);
+    ipcRenderer.on('agent-output-delta', handleAgentOutputDelta);
+    ipcRenderer.on('summary-delta', handleSummaryDelta);
     ipcRenderer.on('get-agent', () => {
         sendAgentToBackend();
     });
@@ -262,6 +269,44 @@ function handleTranscriptionResult(event, transcription) {
     }
 }
 
+function handleTranscriptionPartial(event, partial) {
+    // Tentative words from the streaming transcriber, shown after the confirmed entries
+    partialTranscription = partial || '';
+    updateTranscriptionDisplay();
+}
+
+function handleBackpressureStatus(event, statusData) {
+    try {
+        const status = JSON.parse(statusData);
+        if (!isListening) return;
+        if (status.state === 'lagging') {
+            statusText.textContent = `Catching up (${status.lag_seconds.toFixed(1)}s behind)...`;
+        } else if (status.state === 'recovered') {
+            statusText.textContent = 'Listening...';
+        }
+    } catch (error) {
+        console.error('Error parsing backpressure status:', error);
+    }
+}
+
+function handleBackendStatus(event, statusData) {
+    try {
+        const status = JSON.parse(statusData);
+        if (status.state === 'loading') {
+            // Commands are accepted while loading; START just buffers audio until the model is ready
+            if (status.stage === 'error') {
+                statusText.textContent = 'Model failed to load';
+            } else if (!isListening) {
+                statusText.textContent = status.stage === 'calibrating' ? 'Calibrating...' : 'Loading model...';
+            }
+        } else if (status.state === 'ready' && !isListening) {
+            statusText.textContent = 'Ready';
+        }
+    } catch (error) {
+        console.error('Error parsing backend status:', error);
+    }
+}
+
 function addTranscriptionEntry(text) {
     const timestamp = new Date().toLocaleTimeString();
     const entry = {
@@ -280,7 +325,7 @@ function addTranscriptionEntry(text) {
 }
 
 function updateTranscriptionDisplay() {
-    if (transcriptionHistory.length === 0) {
+    if (transcriptionHistory.length === 0 && !partialTranscription) {
         transcriptionText.innerHTML = '<div class="placeholder-text">Your speech will appear here in real-time...</div>';
         return;
     }
@@ -292,7 +337,13 @@ function updateTranscriptionDisplay() {
         </div>
     `).join('');
     
-    transcriptionText.innerHTML = entries;
+    const partialEntry = partialTranscription ? `
+        <div class="transcription-entry transcription-partial">
+            <div class="transcription-content-text">${partialTranscription}</div>
+        </div>
+    ` : '';
+    
+    transcriptionText.innerHTML = entries + partialEntry;
     
     // Scroll to bottom
     const transcriptionContent = document.querySelector('.transcription-content');
@@ -536,6 +587,46 @@ function handleAgentOutput(event, output) {
     }
 }
 
+// Streamed pieces of an agent response; seq 0 starts a new one, the final AGENT_OUTPUT replaces it
+function handleAgentOutputDelta(event, payload) {
+    let delta;
+    try {
+        delta = JSON.parse(payload);
+    } catch (e) {
+        // A malformed piece is skipped; the final AGENT_OUTPUT still replaces the whole response
+        console.warn('Ignoring malformed agent output delta:', payload);
+        return;
+    }
+    if (delta.suggestion !== undefined) {
+        // Sales agent: one finished suggestion card at a time
+        if (delta.seq === 0) salesActionItems = [];
+        const suggestion = typeof delta.suggestion === 'string'
+            ? { phrasing: delta.suggestion, because_of: "" }
+            : delta.suggestion;
+        salesActionItems.push(suggestion);
+        renderSalesActionItems();
+    } else if (agentDropdown.value === 'general') {
+        if (delta.seq === 0) streamingAgentText = '';
+        streamingAgentText += delta.text;
+        momContent.textContent = streamingAgentText;
+    }
+}
+
+function handleSummaryDelta(event, payload) {
+    let delta;
+    try {
+        delta = JSON.parse(payload);
+    } catch (e) {
+        console.warn('Ignoring malformed summary delta:', payload);
+        return;
+    }
+    if (delta.seq === 0) aiSummary = '';
+    aiSummary += delta.text;
+    if (currentAgent === 'sales' && salesLeftPaneMode === 'summary') {
+        renderSalesLeftPaneSummary();
+    }
+}
+
 function handleSummaryUpdate(event, summary) {
     console.log('[DEBUG] handleSummaryUpdate called, summary:', summary);
     if (!summary || summary.trim() === '') return;
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Bounded prompt context for the sales agent
+Combines the rolling AI summary, the most recent utterances and a few earlier
+turns relevant to them into a context of fixed maximum token size, so prompt
+size stays flat however long the call runs
+"""
+
+import math
+import re
+import threading
+from collections import Counter
+import logging
+
+logger = logging.getLogger(__name__)
+
+# gpt-4o's encoding; tiktoken is optional, without it tokens are estimated
+TOKEN_ENCODING = "o200k_base"
+CHARS_PER_TOKEN = 4
+
+STOPWORDS = frozenset("""
+the and for that this with you your are was were have has had but not what when where which who will
+would could should can just like about there their they them then than from into our out all any how
+its it's yeah okay right know think going really well also been being some more very get got
+""".split())
+
+class TokenCounter:
+    """Token counts with tiktoken when it is installed, a character estimate otherwise"""
+
+    def __init__(self, encoding=TOKEN_ENCODING):
+        self.encoding_name = encoding
+        self.encoding = None
+        self.loaded = False
+
+    def load(self):
+        self.loaded = True
+        try:
+            import tiktoken
+            self.encoding = tiktoken.get_encoding(self.encoding_name)
+        except Exception as e:
+            logger.warning(f"tiktoken unavailable ({e}); estimating tokens as {CHARS_PER_TOKEN} characters each")
+
+    @property
+    def name(self):
+        if not self.loaded:
+            self.load()
+        return self.encoding_name if self.encoding else "estimate"
+
+    def count(self, text):
+        if not self.loaded:
+            self.load()
+        if not text:
+            return 0
+        if self.encoding:
+            return len(self.encoding.encode(text))
+        return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+    def truncate(self, text, max_tokens):
+        """Leading part of ``text`` that fits in ``max_tokens``, cut at a line or word boundary"""
+        if self.count(text) <= max_tokens:
+            return text
+        if self.encoding:
+            cut = self.encoding.decode(self.encoding.encode(text)[:max_tokens])
+        else:
+            cut = text[:max_tokens * CHARS_PER_TOKEN]
+        boundary = max(cut.rfind("\n"), cut.rfind(" "))
+        return cut[:boundary] if boundary > 0 else cut
+
+def terms(text):
+    return {word for word in re.findall(r"[a-z0-9']+", text.lower()) if len(word) > 2 and word not in STOPWORDS}
+
+class SalesContextBuilder:
+    """
+    Keeps the call's turns (with cached token counts and terms) and builds the
+    sales prompt's {summary} section from three parts, within ``max_tokens``:
+    the rolling AI summary (up to ``summary_share``), a window of the latest
+    turns, and earlier turns that share the most rare words with that window
+    (``retrieval_share`` is kept free for them).
+    """
+
+    def __init__(self, max_tokens=1200, summary_share=0.35, retrieval_share=0.2, query_turns=3, counter=None):
+        self.max_tokens = max_tokens
+        self.summary_share = summary_share
+        self.retrieval_share = retrieval_share
+        self.query_turns = query_turns  # latest turns whose words drive retrieval
+        self.counter = counter or TokenCounter()
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.turns = []
+            self.turn_tokens = []
+            self.turn_terms = []
+            self.document_frequency = Counter()
+            self.requests = 0
+            self.prompt_tokens_total = 0
+            self.prompt_tokens_max = 0
+            self.last_prompt_tokens = 0
+            self.last_parts = {}
+
+    def add_turn(self, text):
+        words = terms(text)
+        tokens = self.counter.count(text)
+        with self.lock:
+            self.turns.append(text)
+            self.turn_tokens.append(tokens)
+            self.turn_terms.append(words)
+            self.document_frequency.update(words)
+
+    def build(self, ai_summary=""):
+        """Context text for the prompt; never more than ``max_tokens`` tokens"""
+        with self.lock:
+            turns = list(self.turns)
+            turn_tokens = list(self.turn_tokens)
+            turn_terms = list(self.turn_terms)
+            document_frequency = self.document_frequency.copy()
+
+        sections = []
+        summary = self.counter.truncate(ai_summary.strip(), int(self.max_tokens * self.summary_share)) if ai_summary else ""
+        summary_tokens = self.counter.count(summary)
+        # Headers and bullets are small; reserve a little for them
+        remaining = self.max_tokens - summary_tokens - 16
+
+        # Latest turns, newest first, leaving room for retrieval when there is history
+        recent_budget = remaining - int(self.max_tokens * self.retrieval_share)
+        recent_start = len(turns)
+        used = 0
+        while recent_start > 0:
+            cost = turn_tokens[recent_start - 1] + 2
+            if used + cost > recent_budget and recent_start < len(turns):
+                break
+            used += cost
+            recent_start -= 1
+        recent = turns[recent_start:]
+        if len(recent) == 1 and used > recent_budget:
+            recent = [self.counter.truncate(recent[0], recent_budget)]
+            used = self.counter.count(recent[0]) + 2
+        remaining -= used
+
+        # Earlier turns ranked by the idf-weighted words they share with the latest ones
+        retrieved = []
+        if recent_start > 0 and remaining > 0:
+            query = set().union(*turn_terms[-self.query_turns:])
+            total = len(turns)
+            scored = []
+            for index in range(recent_start):
+                shared = turn_terms[index] & query
+                if shared:
+                    score = sum(math.log(total / document_frequency[term]) for term in shared)
+                    # Long rambling turns share many words by chance
+                    score /= math.sqrt(len(turn_terms[index]))
+                    scored.append((score, index))
+            chosen = []
+            for score, index in sorted(scored, reverse=True):
+                cost = turn_tokens[index] + 2
+                if cost <= remaining:
+                    chosen.append(index)
+                    remaining -= cost
+            retrieved = [turns[index] for index in sorted(chosen)]
+
+        if summary:
+            sections.append("Rolling summary:\n" + summary)
+        if retrieved:
+            sections.append("Relevant earlier moments:" + "".join(f"\n- {turn}" for turn in retrieved))
+        if recent:
+            sections.append("Most recent exchange:" + "".join(f"\n- {turn}" for turn in recent))
+        context = "\n\n".join(sections)
+
+        with self.lock:
+            self.last_parts = {
+                "summary_tokens": summary_tokens,
+                "recent_turns": len(recent),
+                "retrieved_turns": len(retrieved),
+                "context_tokens": self.counter.count(context),
+                "total_turns": len(turns),
+            }
+        return context
+
+    def record_prompt(self, prompt):
+        """Count the final prompt's tokens for the metrics; returns the count"""
+        tokens = self.counter.count(prompt)
+        with self.lock:
+            self.requests += 1
+            self.prompt_tokens_total += tokens
+            self.prompt_tokens_max = max(self.prompt_tokens_max, tokens)
+            self.last_prompt_tokens = tokens
+            parts = dict(self.last_parts)
+        logger.info(f"Sales prompt: {tokens} tokens {parts}")
+        return tokens
+
+    def stats(self):
+        with self.lock:
+            return {
+                "tokenizer": self.counter.name,
+                "max_context_tokens": self.max_tokens,
+                "requests": self.requests,
+                "avg_prompt_tokens": round(self.prompt_tokens_total / self.requests, 1) if self.requests else 0.0,
+                "max_prompt_tokens": self.prompt_tokens_max,
+                "last_prompt_tokens": self.last_prompt_tokens,
+                **self.last_parts,
+            }
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Per-meeting state for the backend
+One backend process (and its one loaded model) serves several meetings at a
+time; everything that belongs to a single meeting lives on its Session
+"""
+
+import threading
+import time
+import logging
+from audio_buffer import AudioRingBuffer
+from system_audio import SystemAudioCapture
+from vad import VoiceActivityGate
+from sales_context import SalesContextBuilder
+from meeting_notes import MeetingNotes
+from llm_cache import NoveltyGate
+from transcript_store import TranscriptStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION = "default"
+
+class Session:
+    """
+    One meeting: its agent, transcript, agent timers and context, and its own
+    system-audio stream. The microphone belongs to the default session (the
+    Electron window); other sessions are fed by files or AUDIO frames.
+    The agent executor, prompts and token counter are shared.
+    """
+
+    def __init__(self, session_id, agents, prompts, counter, sample_rate=16000, vad_mode="model"):
+        self.session_id = session_id
+        self.agents = agents
+        self.prompts = prompts
+        self.agent = "general"  # default
+        self.lock = threading.Lock()  # guards decodes
+        self.decodes = set()  # scheduler futures of this session's chunks, until handled
+
+        # System audio as one continuous stream, windowed like the mic
+        self.sys_buffer = AudioRingBuffer(sample_rate * 60)
+        self.sys_capture = SystemAudioCapture(self.sys_buffer, sample_rate)
+        self.sys_vad = VoiceActivityGate(sample_rate, mode=vad_mode)
+        self.sys_thread = None
+        self.listening = False
+
+        self.sales_suggestion_interval = 10  # seconds
+        self.summary_update_interval = 30  # seconds
+        # Bounded {summary} context: rolling summary + recent window + retrieved turns
+        self.sales_context = SalesContextBuilder(counter=counter)
+        # Skips agent calls whose new transcript adds (almost) nothing
+        self.novelty = NoveltyGate()
+        # Every turn with its session time; what the agents read from
+        self.transcript = TranscriptStore()
+        self.notes_lock = threading.Lock()  # keeps the notes fed in transcript order
+        self.reset()
+
+    @property
+    def is_default(self):
+        return self.session_id == DEFAULT_SESSION
+
+    def reset(self):
+        """Clear the meeting for a new START"""
+        self.started_at = time.time()  # session time 0, where both audio streams start
+        self.transcript.reset()
+        self.last_agent_output = ""
+        self.sales_summary = []  # running summary bullets
+        self.sales_metadata = {}  # optional metadata
+        self.sales_last_suggestion_time = 0
+        self.sales_context.reset()
+        # Partial notes for the general agent's minutes, built during the meeting, merged at STOP
+        self.meeting_notes = MeetingNotes(self.agents, self.prompts, self.sales_context.counter)
+        self.notes_fed = 0  # transcript turns the notes have taken
+        self.novelty.reset()
+        # AI Summary tracking
+        self.ai_summary = ""  # current AI-generated summary
+        self.summary_last_update_time = 0
+        self.last_summary_transcription_count = 0  # Track how many turns were in last summary
+        self.sys_buffer.reset()
+        self.sys_capture.reset()
+        self.sys_vad.reset()
+
+    def add_turn(self, start, end, source, text, words=None):
+        """Store a turn and feed it to the agent context; returns its transcript line
+
+        The meeting notes (and their LLM calls) only run while the general agent
+        is active; turns from stretches on another agent are caught up with
+        feed_notes() when the session comes back to it, at the latest at STOP.
+        """
+        index = self.transcript.add(start, end, source, text, words)
+        # Agents see each turn with its speaker and time into the meeting: "[12:03] [Prospect] ..."
+        line = self.transcript.turn(index).line()
+        self.sales_context.add_turn(line)
+        if self.agent == "general":
+            self.feed_notes()
+        return line
+
+    def feed_notes(self):
+        """Give the meeting notes every transcript turn they have not taken yet"""
+        with self.notes_lock:
+            turns = self.transcript.turns(self.notes_fed)
+            self.notes_fed += len(turns)
+            for turn in turns:
+                self.meeting_notes.add_turn(turn.line())
+
+    def session_time(self):
+        return time.time() - self.started_at
+
+    def describe(self):
+        return {"id": self.session_id, "listening": self.listening, "agent": self.agent,
+                "turns": len(self.transcript)}
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Soak test for the live pipeline without a microphone
+Drives ElectronBackend from a synthetic or replayed audio source for a long
+session (an hour of audio by default, as fast as decoding allows), samples
+memory, CPU and backlog as it goes and fails if memory keeps growing
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import logging
+import numpy as np
+from benchmark_e2e import current_rss
+
+logger = logging.getLogger(__name__)
+
+def cpu_seconds():
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+def rss_growth(samples, warmup=0.1):
+    """MB per hour of audio, fitted after the first ``warmup`` fraction (model and caches settling)"""
+    samples = samples[int(len(samples) * warmup):]
+    if len(samples) < 3:
+        return 0.0
+    hours = np.array([s["audio_seconds"] for s in samples]) / 3600
+    rss = np.array([s["rss_mb"] for s in samples])
+    if np.ptp(hours) == 0:
+        return 0.0
+    return float(np.polyfit(hours, rss, 1)[0])
+
+def run_soak(backend, duration, interval, output):
+    """Listen until ``duration`` seconds of audio went through; writes a JSON line per interval"""
+    samples = []
+    started = time.perf_counter()
+    cpu_start = cpu_seconds()
+    last_wall, last_cpu = started, cpu_start
+    backend.start_listening()
+    source = backend.audio_stream  # the BlockSource the backend opened
+    try:
+        while not source.done.wait(interval):
+            now, cpu = time.perf_counter(), cpu_seconds()
+            sample = {
+                "wall_seconds": round(now - started, 1),
+                "audio_seconds": round(source.position / backend.sample_rate, 1),
+                "rss_mb": round(current_rss() / 2**20, 1),
+                "cpu_utilization": round((cpu - last_cpu) / (now - last_wall), 2),
+                "backlog_seconds": round(backend.audio_buffer.available() / backend.sample_rate, 2),
+                "dropped_seconds": round(backend.audio_buffer.dropped_samples / backend.sample_rate, 1),
+                "queue_depth": backend.inference.queue_depth(),
+                "turns": len(backend.session.transcript),
+                "transcript_bytes": backend.session.transcript.memory_bytes(),
+            }
+            last_wall, last_cpu = now, cpu
+            samples.append(sample)
+            output.write(json.dumps(sample) + "\n")
+            output.flush()
+            if sample["audio_seconds"] >= duration:
+                break
+    finally:
+        backend.stop_listening()
+
+    wall = time.perf_counter() - started
+    audio = source.position / backend.sample_rate
+    return {
+        "audio_hours": round(audio / 3600, 3),
+        "wall_hours": round(wall / 3600, 3),
+        "speed": round(audio / wall, 2) if wall else 0.0,  # x real time
+        "cpu_utilization": round((cpu_seconds() - cpu_start) / wall, 2) if wall else 0.0,
+        "rss_mb_start": samples[0]["rss_mb"] if samples else None,
+        "rss_mb_end": samples[-1]["rss_mb"] if samples else None,
+        "rss_mb_peak": max((s["rss_mb"] for s in samples), default=None),
+        "rss_growth_mb_per_audio_hour": round(rss_growth(samples), 1),
+        "dropped_seconds": round(backend.audio_buffer.dropped_samples / backend.sample_rate, 1),
+        "inference": backend.inference.stats(),
+        "metrics": backend.metrics.snapshot()["histograms"],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Long-session soak test of the live pipeline")
+    parser.add_argument("--source", default="synthetic:2",
+                        help="synthetic[:speakers] or replay:<file> (looped)")
+    parser.add_argument("--speed", default="max", help="1 = real time, N = N x faster, max = decode pace")
+    parser.add_argument("--minutes", type=float, default=60.0, help="minutes of audio to push through")
+    parser.add_argument("--interval", type=float, default=10.0, help="seconds between samples")
+    parser.add_argument("--max-growth", type=float, default=None, metavar="MB",
+                        help="fail if RSS grows more than this many MB per hour of audio")
+    parser.add_argument("-o", "--output", default="-", help="JSON lines of samples (default stdout)")
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--compute-type", default="int8", help="CTranslate2 compute type")
+    parser.add_argument("--beam-size", type=int, default=5)
+    parser.add_argument("--agent", default="none", help="agent to run alongside (needs an OpenAI key or stub)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, stream=sys.stderr)
+    from audio_sources import ReplaySource, SyntheticSpeechSource, parse_speed
+    from electron_backend import ElectronBackend
+
+    speed = parse_speed(args.speed)
+    duration = args.minutes * 60
+    kind, _, argument = args.source.partition(":")
+
+    def make_source(callback, sample_rate, block_size):
+        if kind == "replay":
+            return ReplaySource(argument, callback, sample_rate, block_size, speed, loop=True)
+        return SyntheticSpeechSource(callback, sample_rate, block_size, speakers=int(argument or 2),
+                                     duration=duration, speed=speed)
+
+    if kind not in ("synthetic", "replay") or (kind == "replay" and not os.path.exists(argument)):
+        parser.error(f"bad --source: {args.source}")
+    backend = ElectronBackend(model_size=args.model, compute_type=args.compute_type, beam_size=args.beam_size,
+                              stdio=False, audio_source=make_source)
+    backend.session.agent = args.agent
+    if not backend.ready.wait(600):
+        sys.exit("Model did not load within 10 minutes")
+
+    if args.output == "-":
+        summary = run_soak(backend, duration, args.interval, sys.stdout)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            summary = run_soak(backend, duration, args.interval, output)
+    print(json.dumps(summary, indent=2), file=sys.stderr)
+    if args.max_growth is not None and summary["rss_growth_mb_per_audio_hour"] > args.max_growth:
+        sys.exit(f"RSS grew {summary['rss_growth_mb_per_audio_hour']:.1f} MB per audio hour "
+                 f"(limit {args.max_growth:.1f})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+In-process system-audio capture
+Turns the Swift recorder's growing WAV files (or a raw PCM stream) into one
+continuous 16 kHz mono stream in a ring buffer, across file rotations
+"""
+
+import os
+import struct
+import threading
+import time
+from collections import deque
+import logging
+import numpy as np
+from audio_buffer import StreamingResampler
+from framing import PCM_DTYPES
+
+logger = logging.getLogger(__name__)
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+class WavTailReader:
+    """
+    Reads a WAV file while it is still being written.
+    The data chunk size in the header is not final during recording, so the
+    file size decides how much audio there is; read() returns whole frames only.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.encoding = None
+        self.sample_rate = None
+        self.channels = None
+        self.frame_bytes = None
+        self.position = None
+
+    def open(self):
+        """Parse the header; False while the file or its header is not there yet"""
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        header = file.read(4096)
+        fmt = self.parse_header(header)
+        if fmt is None:
+            file.close()
+            return False
+        self.file = file
+        self.encoding, self.sample_rate, self.channels, self.position = fmt
+        self.frame_bytes = self.channels * np.dtype(PCM_DTYPES[self.encoding]).itemsize
+        return True
+
+    @staticmethod
+    def parse_header(header):
+        """(encoding, sample_rate, channels, data_offset) or None if incomplete"""
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            return None
+        offset = 12
+        fmt = None
+        while offset + 8 <= len(header):
+            chunk_id = header[offset:offset + 4]
+            size = struct.unpack_from("<I", header, offset + 4)[0]
+            if chunk_id == b"fmt ":
+                if offset + 24 > len(header):
+                    return None
+                audio_format, channels, sample_rate = struct.unpack_from("<HHI", header, offset + 8)
+                bits = struct.unpack_from("<H", header, offset + 22)[0]
+                if audio_format == WAVE_FORMAT_EXTENSIBLE:
+                    audio_format = WAVE_FORMAT_IEEE_FLOAT if bits == 32 else WAVE_FORMAT_PCM
+                if (audio_format, bits) == (WAVE_FORMAT_PCM, 16):
+                    encoding = "s16le"
+                elif (audio_format, bits) == (WAVE_FORMAT_IEEE_FLOAT, 32):
+                    encoding = "f32le"
+                else:
+                    raise ValueError(f"Unsupported WAV format {audio_format} ({bits} bit)")
+                fmt = (encoding, sample_rate, channels)
+            elif chunk_id == b"data":
+                return fmt + (offset + 8,) if fmt else None
+            offset += 8 + size + (size % 2)
+        return None
+
+    def read(self):
+        """Bytes appended since the last read (whole frames), possibly empty"""
+        self.file.seek(self.position)
+        data = self.file.read()
+        usable = len(data) - len(data) % self.frame_bytes
+        self.position += usable
+        return data[:usable]
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+class SystemAudioCapture:
+    """
+    Feeds system audio into ``buffer`` as 16 kHz mono float32.
+    Either tail recorder files (add_file; each new file is appended after the
+    previous one has been read to the end, so rotation loses nothing) or push
+    raw PCM from a pipe/socket with write_pcm().
+    """
+
+    def __init__(self, buffer, sample_rate=16000, poll_interval=0.05, settle_time=0.3, delete_files=True):
+        self.buffer = buffer
+        self.sample_rate = sample_rate
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time  # a rotated-out file must stop growing this long before we move on
+        self.delete_files = delete_files
+
+        self.files = deque()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+        self.resampler = None
+        self.stream_format = None
+        self.received_seconds = 0.0
+
+    def add_file(self, path):
+        """Queue the next recorder file and make sure the tail thread is running"""
+        with self.lock:
+            self.files.append(path)
+            if self.thread is None or not self.thread.is_alive():
+                self.running = True
+                self.thread = threading.Thread(target=self.tail_loop, name="system-audio")
+                self.thread.daemon = True
+                self.thread.start()
+
+    def stop(self, timeout=5.0):
+        """Read what is already on disk (every queued file, each deleted once read), then stop tailing"""
+        self.running = False
+        if self.thread:
+            self.thread.join(timeout)
+            if self.thread.is_alive():
+                # Still draining; it exits on its own once the queue is empty
+                with self.lock:
+                    pending = len(self.files)
+                logger.warning(f"System audio still draining {pending} file(s) after {timeout}s")
+            self.thread = None
+
+    def reset(self):
+        self.resampler = None
+        self.stream_format = None
+        self.received_seconds = 0.0
+
+    def write_pcm(self, data, encoding, sample_rate, channels):
+        """Append raw interleaved PCM to the stream"""
+        audio = np.frombuffer(data, dtype=PCM_DTYPES[encoding]).astype(np.float32)
+        if encoding == "s16le":
+            audio /= 32768.0
+        if channels > 1:
+            audio = audio[:len(audio) - len(audio) % channels].reshape(-1, channels).mean(axis=1)
+        if len(audio) == 0:
+            return
+
+        # One resampler for the whole stream keeps its filter state across
+        # writes and file rotations, so chunk edges leave no clicks
+        if self.stream_format != (sample_rate, channels):
+            self.stream_format = (sample_rate, channels)
+            self.resampler = StreamingResampler(sample_rate, self.sample_rate)
+        self.received_seconds += len(audio) / sample_rate
+        self.buffer.write(self.resampler.process(audio))
+
+    def tail_loop(self):
+        reader = None
+        last_growth = time.time()
+        while True:
+            if reader is None:
+                with self.lock:
+                    path = self.files[0] if self.files else None
+                if path is None:
+                    if not self.running:
+                        return
+                    time.sleep(self.poll_interval)
+                    continue
+                reader = WavTailReader(path)
+                try:
+                    opened = reader.open()
+                except ValueError as e:
+                    logger.error(f"Skipping system audio file {path}: {e}")
+                    self.finish_file(reader, remove=False)
+                    reader = None
+                    continue
+                if not opened:
+                    if not self.running:
+                        # Stopped before the recorder wrote a header; nothing to read
+                        self.finish_file(reader)
+                        reader = None
+                        continue
+                    # Recorder has not written the header yet
+                    reader = None
+                    time.sleep(self.poll_interval)
+                    continue
+                logger.info(f"Tailing system audio: {path} ({reader.sample_rate} Hz, {reader.channels} ch)")
+                last_growth = time.time()
+
+            data = reader.read()
+            if data:
+                self.write_pcm(data, reader.encoding, reader.sample_rate, reader.channels)
+                last_growth = time.time()
+                continue
+
+            # Move on once a newer file exists and this one has settled, or at
+            # stop, where the files queued behind this one are read out too
+            with self.lock:
+                rotated = len(self.files) > 1
+            if not self.running or (rotated and time.time() - last_growth >= self.settle_time):
+                self.finish_file(reader)
+                reader = None
+                continue
+            time.sleep(self.poll_interval)
+
+    def finish_file(self, reader, remove=True):
+        reader.close()
+        with self.lock:
+            if self.files and self.files[0] == reader.path:
+                self.files.popleft()
+        if remove and self.delete_files:
+            try:
+                os.unlink(reader.path)
+            except OSError:
+                pass
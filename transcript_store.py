@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Time-indexed transcript of a session
+Turns (and their words, when the decoder gave word timestamps) are kept in
+flat typed arrays with absolute session times, so a multi-hour meeting stays
+small in memory and a time range is found by binary search
+"""
+
+import bisect
+import sys
+import threading
+from array import array
+
+SPEAKERS = {"MIC": "Rep", "SYS": "Prospect"}  # mic is the rep, system audio is the prospect
+
+def format_time(seconds):
+    """Session time as m:ss, or h:mm:ss past the first hour"""
+    seconds = int(max(0, seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+class Turn:
+    """One transcribed turn as returned by queries (built on demand, not stored)"""
+    __slots__ = ("index", "start", "end", "source", "speaker", "text")
+
+    def __init__(self, index, start, end, source, speaker, text):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.source = source
+        self.speaker = speaker
+        self.text = text
+
+    def line(self):
+        """Transcript line for prompts: ``[m:ss] [Speaker] text``"""
+        return f"[{format_time(self.start)}] [{self.speaker}] {self.text}"
+
+    def as_dict(self):
+        return {"start": round(self.start, 2), "end": round(self.end, 2), "source": self.source,
+                "speaker": self.speaker, "text": self.text}
+
+class TranscriptStore:
+    """
+    Append-only transcript in arrival order (turn index = order added).
+    Columns are typed arrays; a second pair of arrays keeps the turns sorted
+    by start time, and with the longest turn's duration that is the interval
+    index: turns overlapping [t0, t1) start in [t0 - longest, t1).
+    Word text is not stored separately, only its character span in the turn.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.starts = array('d')
+            self.ends = array('d')
+            self.source_codes = array('B')
+            self.sources = []  # code -> source name
+            self.texts = []
+            # Interval index: start times sorted, with the turn index of each
+            self.sorted_starts = array('d')
+            self.sorted_turns = array('I')
+            self.longest = 0.0
+            # Words: turn i owns words word_offsets[i]:word_offsets[i + 1]
+            self.word_offsets = array('I', [0])
+            self.word_starts = array('f')
+            self.word_ends = array('f')
+            self.word_spans = array('I')  # character end of each word in its turn's text
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, start, end, source, text, words=None):
+        """Store a turn; ``words`` are (start, end, text) in session seconds. Returns the turn index"""
+        if words:
+            # Keep the decoder's spacing so the spans line up with the stored text
+            text = "".join(word for _, _, word in words)
+        end = max(end, start)
+        with self.lock:
+            index = len(self.texts)
+            if source not in self.sources:
+                self.sources.append(source)
+            self.starts.append(start)
+            self.ends.append(end)
+            self.source_codes.append(self.sources.index(source))
+            self.texts.append(text)
+            self.longest = max(self.longest, end - start)
+
+            # Turns arrive nearly in time order (system audio can lag the mic a little)
+            position = bisect.bisect_right(self.sorted_starts, start)
+            self.sorted_starts.insert(position, start)
+            self.sorted_turns.insert(position, index)
+
+            span = 0
+            for word_start, word_end, word in words or ():
+                span += len(word)
+                self.word_starts.append(word_start)
+                self.word_ends.append(word_end)
+                self.word_spans.append(span)
+            self.word_offsets.append(len(self.word_starts))
+        return index
+
+    def turn(self, index):
+        with self.lock:
+            return self.make_turn(index)
+
+    def make_turn(self, index):
+        source = self.sources[self.source_codes[index]]
+        return Turn(index, self.starts[index], self.ends[index], source,
+                    SPEAKERS.get(source, source), self.texts[index].strip())
+
+    def turns(self, first=0, last=None):
+        """Turns in arrival order, by index range"""
+        with self.lock:
+            last = len(self.texts) if last is None else min(last, len(self.texts))
+            return [self.make_turn(i) for i in range(first, last)]
+
+    def latest(self, count):
+        with self.lock:
+            return [self.make_turn(i) for i in range(max(0, len(self.texts) - count), len(self.texts))]
+
+    def between(self, t0, t1):
+        """Turns overlapping [t0, t1) seconds, in time order"""
+        with self.lock:
+            low = bisect.bisect_left(self.sorted_starts, t0 - self.longest)
+            high = bisect.bisect_left(self.sorted_starts, t1)
+            return [self.make_turn(i) for i in self.sorted_turns[low:high] if self.ends[i] > t0 or self.starts[i] >= t0]
+
+    def words(self, index):
+        """(start, end, text) of a turn's words; empty when it was stored without them"""
+        with self.lock:
+            first, last = self.word_offsets[index], self.word_offsets[index + 1]
+            text = self.texts[index]
+            words = []
+            span = 0
+            for w in range(first, last):
+                words.append((self.word_starts[w], self.word_ends[w], text[span:self.word_spans[w]]))
+                span = self.word_spans[w]
+            return words
+
+    def words_between(self, t0, t1):
+        """Words starting in [t0, t1), in time order"""
+        return [word for turn in self.between(t0, t1) for word in self.words(turn.index) if t0 <= word[0] < t1]
+
+    def duration(self):
+        with self.lock:
+            return max(self.ends, default=0.0)
+
+    def memory_bytes(self):
+        """Approximate size of the stored transcript"""
+        with self.lock:
+            columns = (self.starts, self.ends, self.source_codes, self.sorted_starts, self.sorted_turns,
+                       self.word_offsets, self.word_starts, self.word_ends, self.word_spans)
+            return (sum(column.itemsize * len(column) for column in columns)
+                    + sum(sys.getsizeof(text) for text in self.texts) + sys.getsizeof(self.texts))
+
+    def stats(self):
+        with self.lock:
+            turns, words = len(self.texts), len(self.word_starts)
+        return {"turns": turns, "words": words, "duration_seconds": round(self.duration(), 1),
+                "memory_bytes": self.memory_bytes()}
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Voice-activity gate in front of the inference queue
+A cheap energy check rejects obvious silence; only windows with some energy
+go on to the Silero VAD model (loaded once, cached by faster-whisper)
+"""
+
+import threading
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# "model": energy then Silero, "energy": energy only, "off": no gating
+VAD_MODES = ("model", "energy", "off")
+
+class VoiceActivityGate:
+    """
+    Finds speech in float32 mono audio and keeps count of what was skipped.
+    speech_segments() returns (start, end) sample ranges; is_speech() and
+    last_boundary() are the shortcuts the capture loops need.
+    """
+
+    def __init__(self, sample_rate=16000, mode="model", frame_ms=30, min_energy_db=-55.0,
+                 energy_margin_db=10.0, min_silence=0.5, speech_pad=0.2, threshold=0.5):
+        if mode not in VAD_MODES:
+            raise ValueError(f"Unknown VAD mode: {mode}")
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.frame_size = int(sample_rate * frame_ms / 1000)
+        self.min_energy_db = min_energy_db
+        self.energy_margin_db = energy_margin_db
+        self.min_silence = int(sample_rate * min_silence)
+        self.speech_pad = int(sample_rate * speech_pad)
+        self.threshold = threshold
+
+        self.noise_floor_db = None
+        self.seen_until = 0  # stream position up to which frames have fed the noise floor
+        self.vad_options = None
+        self.lock = threading.Lock()
+        self.total_seconds = 0.0
+        self.skipped_seconds = 0.0
+
+    def load_model(self):
+        """Load Silero (once); call at startup so the first speech window does not pay for it"""
+        if self.mode != "model" or self.vad_options is not None:
+            return
+        try:
+            from faster_whisper.vad import VadOptions, get_vad_model
+            get_vad_model()
+            self.vad_options = VadOptions(
+                threshold=self.threshold,
+                min_silence_duration_ms=int(self.min_silence * 1000 / self.sample_rate),
+                speech_pad_ms=int(self.speech_pad * 1000 / self.sample_rate),
+            )
+        except Exception as e:
+            logger.warning(f"Silero VAD unavailable, using energy gating only: {e}")
+            self.mode = "energy"
+
+    def energy_frames(self, audio, position=None):
+        """Boolean per frame: loud enough to possibly be speech
+        
+        ``position`` is where ``audio`` starts in the stream; frames before the
+        furthest position seen so far (a re-peeked window) do not move the
+        noise floor again. Without it every frame counts as new.
+        """
+        n_frames = len(audio) // self.frame_size
+        if n_frames == 0:
+            return np.zeros(0, dtype=bool)
+        frames = audio[:n_frames * self.frame_size].reshape(n_frames, self.frame_size)
+        rms = np.sqrt(np.mean(frames * frames, axis=1)) + 1e-10
+        db = 20 * np.log10(rms)
+
+        # Track the noise floor slowly so a fan or room tone does not count as speech
+        with self.lock:
+            new = db
+            if position is not None:
+                first_new = max(0, -(-(self.seen_until - position) // self.frame_size))
+                new = db[first_new:]
+                self.seen_until = max(self.seen_until, position + n_frames * self.frame_size)
+            if len(new):
+                quiet = float(np.percentile(new, 10))
+                if self.noise_floor_db is None or quiet < self.noise_floor_db:
+                    self.noise_floor_db = quiet
+                else:
+                    # Rise 5% of the way per second of new audio, however it was sliced
+                    weight = 1 - 0.95 ** (len(new) * self.frame_size / self.sample_rate)
+                    self.noise_floor_db += weight * (quiet - self.noise_floor_db)
+            threshold = max(self.min_energy_db, self.noise_floor_db + self.energy_margin_db)
+        return db > threshold
+
+    def speech_segments(self, audio, position=None):
+        """(start, end) sample ranges containing speech, padded and merged"""
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        if self.mode == "off":
+            return [(0, len(audio))] if len(audio) else []
+
+        active = self.energy_frames(audio, position)
+        if not active.any():
+            return []
+
+        if self.mode == "model":
+            self.load_model()
+        if self.vad_options is not None:
+            from faster_whisper.vad import get_speech_timestamps
+            return [(c["start"], c["end"]) for c in
+                    get_speech_timestamps(audio, self.vad_options, sampling_rate=self.sample_rate)]
+
+        # Energy only: merge loud frames across gaps shorter than min_silence
+        segments = []
+        for index in np.flatnonzero(active):
+            start = int(index) * self.frame_size
+            end = start + self.frame_size
+            if segments and start - segments[-1][1] < self.min_silence:
+                segments[-1][1] = end
+            else:
+                segments.append([start, end])
+        return [(max(0, s - self.speech_pad), min(len(audio), e + self.speech_pad)) for s, e in segments]
+
+    def is_speech(self, audio):
+        return bool(self.speech_segments(audio))
+
+    def last_boundary(self, segments, length):
+        """End of the last speech segment followed by at least min_silence, or None"""
+        boundary = None
+        for i, (start, end) in enumerate(segments):
+            next_start = segments[i + 1][0] if i + 1 < len(segments) else length
+            if next_start - end >= self.min_silence:
+                boundary = end
+        return boundary
+
+    def record(self, seconds, skipped):
+        with self.lock:
+            self.total_seconds += seconds
+            if skipped:
+                self.skipped_seconds += seconds
+
+    def reset_stats(self):
+        with self.lock:
+            self.total_seconds = 0.0
+            self.skipped_seconds = 0.0
+
+    def reset(self):
+        """New stream (its positions start at 0 again); the noise floor carries over"""
+        self.reset_stats()
+        with self.lock:
+            self.seen_until = 0
+
+    def stats(self):
+        with self.lock:
+            return {
+                "mode": self.mode,
+                "total_seconds": round(self.total_seconds, 1),
+                "skipped_seconds": round(self.skipped_seconds, 1),
+                "skipped_fraction": round(self.skipped_seconds / self.total_seconds, 3) if self.total_seconds else 0.0,
+            }